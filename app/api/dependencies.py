@@ -1,28 +1,22 @@
 from uuid import UUID
-from fastapi import APIRouter
 from datetime import datetime, timezone
 from typing import Annotated
 from jose import jwt, JWTError
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from passlib.context import CryptContext
-from sqlmodel import Session
-from app.database import get_session
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.database import get_session, replica_client
 from app.models import User
 from app.services.auth_service import AuthService
 from app.settings import Settings
-
-router = APIRouter()
+from app.utils.security import ALGORITHM
 
 settings = Settings.get_instance()
-ALGORITHM = "HS256"
-
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="login")
 
 
-async def get_current_user(token: Annotated[str, Depends(oauth2_scheme)] , session: Session = Depends(get_session)):
+async def get_current_user(token: Annotated[str, Depends(oauth2_scheme)] , session: AsyncSession = Depends(get_session)):
     auth_service = AuthService(session)
     try:
         payload = jwt.decode(token, settings.secret_key, algorithms=[ALGORITHM])
@@ -48,11 +42,13 @@ async def get_current_user(token: Annotated[str, Depends(oauth2_scheme)] , sessi
             detail="Could not validate credentials",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    user = auth_service.get_user_by_id(user_id)
+    user = await auth_service.get_principal(user_id)
     if user is None:
         raise HTTPException(status_code=404, detail="User not found")
     if not user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
+    # Read-replica stickiness follows this user's writes for the rest of the request.
+    replica_client.set(str(user.id))
     return user
 
 
@@ -1,6 +1,6 @@
 from fastapi import APIRouter
 
-from app.api.routes import product, user, login, status, order
+from app.api.routes import admin, product, user, login, status, order, order_status
 from app.api.routes.status import router as status_router
 
 
@@ -9,4 +9,6 @@ api_router.include_router(login.router, prefix="/login", tags=["login"])
 api_router.include_router(user.router, prefix="/users", tags=["users"])
 api_router.include_router(order.router, prefix="/orders", tags=["orders"])
 api_router.include_router(status_router, prefix="/statuses", tags=["statuses"])
+api_router.include_router(order_status.router, prefix="/statuses", tags=["statuses"])
 api_router.include_router(product.router, prefix="/products", tags=["products"])
+api_router.include_router(admin.router, prefix="/admin", tags=["admin"])
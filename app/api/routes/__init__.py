@@ -1,9 +0,0 @@
-from app.api.routes.login import *
-from app.api.routes.order import *
-from app.api.routes.status import *
-from app.api.routes.user import *
-from app.api.routes.product import *
-
-
-
-
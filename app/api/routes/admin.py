@@ -0,0 +1,120 @@
+from datetime import date
+from typing import List, Literal
+from uuid import UUID
+from fastapi import APIRouter, Depends, Query, UploadFile
+from fastapi.responses import StreamingResponse
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.api.dependencies import get_current_admin
+from app.database import get_pool_status, get_read_session, get_session
+from app.models import User
+from app.schemas.admin_schema import (
+    CacheStatsResponse,
+    InventoryResponse,
+    LowStockRow,
+    PoolStatusResponse,
+    RevenueReportRow,
+    StockBucketsRequest,
+    TopProductRow,
+)
+from app.schemas.product_schema import BulkImportResponse
+from app.services.auth_service import principal_cache
+from app.services.export_service import ExportService
+from app.services.inventory_service import InventoryService
+from app.services.product_services import ProductService, iter_import_rows
+from app.services.report_service import ReportService
+
+router = APIRouter()
+
+
+# Live connection pool statistics (only admin)
+@router.get("/pool", response_model=PoolStatusResponse)
+async def pool_status(current_admin: User = Depends(get_current_admin)):
+    return get_pool_status()
+
+
+# Hit/miss counters of the authenticated-principal cache (only admin)
+@router.get("/caches/principals", response_model=CacheStatsResponse)
+async def principal_cache_stats(current_admin: User = Depends(get_current_admin)):
+    return principal_cache.stats()
+
+
+EXPORT_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+
+def _export_response(stream, name: str, format: str) -> StreamingResponse:
+    return StreamingResponse(
+        stream,
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{name}.{format}"'},
+    )
+
+
+# Stream every product as NDJSON or CSV (only admin)
+@router.get("/export/products")
+async def export_products(format: Literal["ndjson", "csv"] = "ndjson",
+                          current_admin: User = Depends(get_current_admin)):
+    return _export_response(ExportService.stream_products(format), "products", format)
+
+
+# Stream every order with its product lines as NDJSON or CSV (only admin)
+@router.get("/export/orders")
+async def export_orders(format: Literal["ndjson", "csv"] = "ndjson",
+                        current_admin: User = Depends(get_current_admin)):
+    return _export_response(ExportService.stream_orders(format), "orders", format)
+
+
+# Bulk-create products from an NDJSON or CSV upload (only admin). The format is taken
+# from ?format=, falling back to the file name / content type.
+@router.post("/import/products", response_model=BulkImportResponse)
+async def import_products(file: UploadFile,
+                          format: Literal["ndjson", "csv"] | None = None,
+                          current_admin: User = Depends(get_current_admin),
+                          session: AsyncSession = Depends(get_session)):
+    if format is None:
+        is_csv = (file.filename or "").lower().endswith(".csv") or file.content_type == "text/csv"
+        format = "csv" if is_csv else "ndjson"
+    product_service = ProductService(session)
+    return await product_service.import_products(iter_import_rows(file.file, format))
+
+
+# Revenue and order count per day and status, from the daily_sales rollup; defaults
+# to the last 30 days (only admin)
+@router.get("/reports/revenue", response_model=List[RevenueReportRow])
+async def revenue_report(date_from: date | None = None, date_to: date | None = None,
+                         status: str | None = None,
+                         current_admin: User = Depends(get_current_admin),
+                         session: AsyncSession = Depends(get_read_session)):
+    return await ReportService(session).revenue_by_day(date_from, date_to, status)
+
+
+# Best-selling products by quantity, from the product_sales rollup (only admin)
+@router.get("/reports/top-products", response_model=List[TopProductRow])
+async def top_products_report(limit: int = Query(10, ge=1, le=100),
+                              current_admin: User = Depends(get_current_admin),
+                              session: AsyncSession = Depends(get_read_session)):
+    return await ReportService(session).top_products(limit)
+
+
+# Products with stock at or below the threshold, lowest first (only admin)
+@router.get("/reports/low-stock", response_model=List[LowStockRow])
+async def low_stock_report(threshold: int = Query(10, ge=0), limit: int = Query(50, ge=1, le=500),
+                           current_admin: User = Depends(get_current_admin),
+                           session: AsyncSession = Depends(get_read_session)):
+    return await ReportService(session).low_stock(threshold, limit)
+
+
+# Live stock of a product, per bucket if it is sharded (only admin)
+@router.get("/products/{product_id}/inventory", response_model=InventoryResponse)
+async def product_inventory(product_id: UUID,
+                            current_admin: User = Depends(get_current_admin),
+                            session: AsyncSession = Depends(get_read_session)):
+    return await InventoryService(session).get_inventory(product_id)
+
+
+# Spread a hot product's stock over N bucket rows so concurrent orders write different
+# rows; 0 folds it back into the product row (only admin)
+@router.put("/products/{product_id}/stock-buckets", response_model=InventoryResponse)
+async def set_stock_buckets(product_id: UUID, request: StockBucketsRequest,
+                            current_admin: User = Depends(get_current_admin),
+                            session: AsyncSession = Depends(get_session)):
+    return await InventoryService(session).set_stock_buckets(product_id, request.buckets)
@@ -1,26 +1,48 @@
 from datetime import timedelta
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 from app.settings import Settings
 from app.schemas.user_schema import Token
 from app.database import get_session
 from app.utils.security import create_access_token
 from app.services.auth_service import AuthService
+from app.utils.rate_limit import ConcurrencyCap, TokenBucketLimiter, client_address, too_many_requests
 from jose import JWTError
 
 router = APIRouter()
 settings = Settings.get_instance()
 
+# Credential stuffing is throttled per source and per target account, and bcrypt work
+# for logins is capped so a burst cannot take every CPU from the rest of the API.
+ip_limiter = TokenBucketLimiter(settings.login_ip_burst, settings.login_ip_per_minute, settings.login_limiter_max_keys)
+username_limiter = TokenBucketLimiter(
+    settings.login_username_burst, settings.login_username_per_minute, settings.login_limiter_max_keys
+)
+verification_cap = ConcurrencyCap(
+    settings.login_max_concurrent_verifications, "Too many concurrent login attempts, try again shortly"
+)
+
+
+def check_login_rate(request: Request, username: str):
+    # The username bucket is only charged for attempts the IP limit let through.
+    client_ip = client_address(request, settings.forwarded_for_header, settings.trusted_proxy_count)
+    retry_after = ip_limiter.acquire(client_ip) or username_limiter.acquire(username.strip().lower())
+    if retry_after:
+        raise too_many_requests(retry_after, "Too many login attempts, try again later")
+
 @router.post("/")
 async def login_for_access_token(
+    request: Request,
     form_data: OAuth2PasswordRequestForm = Depends(),
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_session)
 ):
     auth_service = AuthService(session)
     
     try:
-        user = await auth_service.authenticate_user(form_data.username, form_data.password)
+        check_login_rate(request, form_data.username)
+        with verification_cap.slot():
+            user = await auth_service.authenticate_user(form_data.username, form_data.password)
         
         if not user:
             raise HTTPException(
@@ -37,6 +59,8 @@ async def login_for_access_token(
         
         return Token(access_token=access_token, token_type="bearer")
 
+    except HTTPException as http_exc:
+        raise http_exc
     except JWTError as e:
         print("JWT error:", e)
         raise HTTPException(
@@ -0,0 +1,15 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from app.database import get_pool_status, pool_stats
+from app.utils.metrics import render_metrics
+
+router = APIRouter()
+
+
+# Prometheus scrape endpoint; served outside /api/v1 and without auth, like /metrics usually is
+@router.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def prometheus_metrics():
+    return PlainTextResponse(
+        render_metrics(pool_stats, get_pool_status()),
+        media_type="text/plain; version=0.0.4; charset=utf-8",
+    )
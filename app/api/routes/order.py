@@ -1,54 +1,123 @@
 
 
-from fastapi import APIRouter, HTTPException, Depends, status
+from fastapi import APIRouter, HTTPException, Depends, Header, status
+from fastapi.responses import JSONResponse
 from uuid import UUID
 from typing import List
 from datetime import datetime
 from decimal import Decimal
 from app.api.dependencies import get_current_admin, get_current_user
 from app.models import Order, OrderProduct, Product, User, OrderStatus
-from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 from app.database import engine, get_session
-from app.schemas.order_schema import CreateOrderRequest, OrderResponse, UpdateOrderStatusRequest
+from app.schemas.order_schema import (
+    BulkUpdateOrderStatusRequest,
+    BulkUpdateOrderStatusResponse,
+    CreateOrderRequest,
+    OrderIntakeResponse,
+    OrderResponse,
+    UpdateOrderStatusRequest,
+)
+from app.services.order_intake import IntakeRequest, order_intake
 from app.services.order_service import OrderService  # Assuming you have an engine set up
+from app.utils.idempotency import fingerprint, idempotency_store
 
 router = APIRouter()
 
 
 
-@router.post("/orders/", response_model=OrderResponse, status_code=status.HTTP_201_CREATED)
+# With an Idempotency-Key header a retried request gets the first response back
+# (marked Idempotent-Replayed: true) instead of creating a second order. When an
+# order intake queue is configured the order is validated and queued, and the 202
+# response points at GET /orders/intake/{id} to follow it.
+@router.post("/orders/", response_model=OrderResponse, status_code=status.HTTP_201_CREATED,
+             responses={202: {"model": OrderIntakeResponse}})
 async def create_order(
     order_data: CreateOrderRequest, 
     current_user: User = Depends(get_current_user), 
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_session),
+    idempotency_key: str | None = Header(None, alias="Idempotency-Key", min_length=1, max_length=255),
 ):
     order_service = OrderService(session)
-    return order_service.create_order(order_data, current_user.id)
+    if idempotency_key is None and order_intake is None:
+        return await order_service.create_order(order_data, current_user.id)
 
+    async def create():
+        if order_intake is None:
+            order = await order_service.create_order(order_data, current_user.id)
+            return order.model_dump(mode="json")
+        request = IntakeRequest(current_user.id, OrderService.cart_quantities(order_data))
+        intake = await order_intake.submit(session, request)
+        return OrderIntakeResponse(**intake).model_dump(mode="json")
+
+    status_code = status.HTTP_201_CREATED if order_intake is None else status.HTTP_202_ACCEPTED
+    if idempotency_key is None:
+        body, replayed = await create(), False
+    else:
+        # Keys are scoped to the user, so two clients choosing the same key never collide.
+        stored, replayed = await idempotency_store.run(
+            f"orders:{current_user.id}:{idempotency_key}",
+            fingerprint(order_data.model_dump(mode="json")),
+            create,
+            status_code=status_code,
+        )
+        body, status_code = stored.body, stored.status_code
+    headers = {"Idempotent-Replayed": "true"} if replayed else {}
+    if status_code == status.HTTP_202_ACCEPTED:
+        headers["Location"] = f"/api/v1/orders/orders/intake/{body['id']}"
+    return JSONResponse(body, status_code=status_code, headers=headers)
+
+# Progress of a queued order; includes the order once it has been created. Read from the
+# primary: the intake worker writes outside the request, so no replica stickiness covers it.
+@router.get("/orders/intake/{intake_id}", response_model=OrderIntakeResponse)
+async def get_order_intake(
+    intake_id: UUID,
+    current_user: User = Depends(get_current_user),
+    session: AsyncSession = Depends(get_session)
+):
+    intake = await order_intake.get_status(session, intake_id) if order_intake else None
+    if not intake or intake["user_id"] != current_user.id:
+        raise HTTPException(status_code=404, detail="Queued order not found")
+    response = OrderIntakeResponse(id=intake["id"], status=intake["status"], error=intake["error"])
+    if intake["status"] == "completed":
+        response.order = await OrderService(session).get_order_by_id(intake_id, current_user.id)
+    return response
+
+# Primary as well: a queued order is created by the intake worker.
 @router.get("/orders/{order_id}", response_model=OrderResponse)
 async def get_order(
     order_id: UUID, 
     current_user: User = Depends(get_current_user), 
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_session)
+):
+    order_service = OrderService(session)
+    return await order_service.get_order_by_id(order_id, current_user.id)
+
+# Move many orders to one status with a single UPDATE (only admin)
+@router.put("/orders/status", response_model=BulkUpdateOrderStatusResponse)
+async def bulk_update_order_status(
+    status_data: BulkUpdateOrderStatusRequest,
+    current_admin: User = Depends(get_current_admin),
+    session: AsyncSession = Depends(get_session)
 ):
     order_service = OrderService(session)
-    return order_service.get_order_by_id(order_id, current_user.id)
+    return await order_service.bulk_update_order_status(status_data.order_ids, status_data.status)
 
 @router.put("/orders/{order_id}/status", response_model=OrderResponse)
 async def update_order_status(
     order_id: UUID, 
     status_data: UpdateOrderStatusRequest, 
     current_admin: User = Depends(get_current_admin), 
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_session)
 ):
     order_service = OrderService(session)
-    return order_service.update_order_status(order_id, status_data.status)
+    return await order_service.update_order_status(order_id, status_data.status)
 
 @router.delete("/orders/{order_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def cancel_order(
     order_id: UUID, 
     current_user: User = Depends(get_current_user), 
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_session)
 ):
     order_service = OrderService(session)
-    order_service.cancel_order(order_id, current_user.id)
\ No newline at end of file
+    await order_service.cancel_order(order_id, current_user.id)
\ No newline at end of file
@@ -1,27 +1,45 @@
 from datetime import datetime
-from typing import List
+from typing import List, Literal, Union
 from uuid import UUID
-from fastapi import APIRouter, HTTPException, Depends, status
-from sqlmodel import Session
+from fastapi import APIRouter, HTTPException, Depends, Query, Request, Response, status
+from sqlmodel.ext.asyncio.session import AsyncSession
 from app.api.dependencies import get_current_admin
-from app.database import get_session
+from app.database import get_read_session, get_session
 
 from app.models import User
-from app.schemas.product_schema import CreateProductRequest, Product, UpdateProductRequest
+from app.schemas.product_schema import (
+    CreateProductRequest,
+    Product,
+    ProductPage,
+    ProductSearchResponse,
+    UpdateProductRequest,
+)
 from app.services.product_services import ProductService
+from app.settings import Settings
+from app.utils.http_cache import cache_headers, is_not_modified, make_etag, not_modified_response
+from app.utils.responses import FastJSONAdapter
 
 router = APIRouter()
+settings = Settings.get_instance()
+
+# Emits the same JSON as the Product schema (isAvailable is always defaulted there).
+product_json = FastJSONAdapter(
+    {"id": "id", "name": "name", "description": "description", "price": "price", "stock": "stock",
+     "created_at": "created_at", "updated_at": "updated_at"},
+    converters={"price": float},
+    constants={"isAvailable": True},
+)
 
 # Create product (only admin)
 @router.post("/products", response_model=Product, status_code=status.HTTP_201_CREATED)
 async def create_product(
     product: CreateProductRequest,
     current_admin: User = Depends(get_current_admin),
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_session)
 ):
     product_service = ProductService(session)
     try:
-        return product_service.create_product(product)
+        return await product_service.create_product(product)
     except HTTPException as http_exc:
         raise http_exc
     except Exception as e:
@@ -30,28 +48,92 @@ async def create_product(
             detail="An unexpected error occurred while creating the product."
         )
 
-# Get all products
-@router.get("/products", response_model=List[Product], status_code=status.HTTP_200_OK)
+# Get all products. Offset pagination by default; pass paginate=cursor (or a cursor
+# from a previous page) for keyset pagination, which returns a ProductPage.
+@router.get("/products", response_model=Union[List[Product], ProductPage], status_code=status.HTTP_200_OK)
 async def get_all_products(
-    skip: int = 0, limit: int = 10, session: Session = Depends(get_session)
+    request: Request, response: Response,
+    skip: int = Query(0, ge=0), limit: int = Query(10, ge=1, le=1000),
+    paginate: Literal["offset", "cursor"] = "offset", cursor: str | None = None,
+    session: AsyncSession = Depends(get_read_session)
 ):
     product_service = ProductService(session)
     try:
-        return product_service.get_all_products(skip, limit)
+        next_cursor = None
+        cursor_mode = paginate == "cursor" or bool(cursor)
+        if cursor_mode:
+            items, next_cursor = await product_service.get_products_page(limit, cursor)
+        else:
+            items = await product_service.get_all_products(skip, limit)
+
+        # Revalidation is decided from the rows' ids and versions, before serializing anything.
+        etag = make_etag(
+            "products", cursor_mode, skip, limit, cursor, next_cursor,
+            *(f"{item.id}@{item.version.isoformat()}" for item in items),
+        )
+        # No Last-Modified: deleting a row leaves the newest remaining version unchanged,
+        # so If-Modified-Since would answer 304 for a page that lost an item.
+        headers = cache_headers(etag, None)
+        if is_not_modified(request, etag, None):
+            return not_modified_response(headers)
+        response.headers.update(headers)
+
+        if settings.fast_json_responses:
+            envelope = {"next_cursor": next_cursor} if cursor_mode else None
+            return product_json.response(items, envelope, headers=headers)
+        if cursor_mode:
+            return ProductPage(items=[item.model_dump() for item in items], next_cursor=next_cursor)
+        return items
+    except HTTPException as http_exc:
+        raise http_exc
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="An unexpected error occurred while fetching the products."
         )
 
+# Search products by name and description, with optional price / availability filters
+@router.get("/products/search", response_model=ProductSearchResponse, status_code=status.HTTP_200_OK)
+async def search_products(
+    q: str = Query(..., min_length=1, max_length=200),
+    mode: Literal["prefix", "substring", "fulltext"] = "fulltext",
+    min_price: float | None = Query(None, ge=0),
+    max_price: float | None = Query(None, ge=0),
+    is_available: bool | None = None,
+    skip: int = Query(0, ge=0), limit: int = Query(10, ge=1, le=100),
+    session: AsyncSession = Depends(get_read_session)
+):
+    product_service = ProductService(session)
+    try:
+        items, total = await product_service.search_products(
+            q, mode, min_price, max_price, is_available, skip, limit
+        )
+        return ProductSearchResponse(
+            items=[item.model_dump() for item in items], total=total, skip=skip, limit=limit
+        )
+    except HTTPException as http_exc:
+        raise http_exc
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="An unexpected error occurred while searching the products."
+        )
+
 # Get product by ID
 @router.get("/products/{product_id}", response_model=Product, status_code=status.HTTP_200_OK)
 async def get_product(
-    product_id: UUID, session: Session = Depends(get_session)
+    product_id: UUID, request: Request, response: Response,
+    session: AsyncSession = Depends(get_read_session)
 ):
     product_service = ProductService(session)
     try:
-        return product_service.get_product_by_id(product_id)
+        product = await product_service.get_product_by_id(product_id)
+        etag = make_etag("product", product.id, product.version.isoformat())
+        headers = cache_headers(etag, product.version)
+        if is_not_modified(request, etag, product.version):
+            return not_modified_response(headers)
+        response.headers.update(headers)
+        return product
     except HTTPException as http_exc:
         raise http_exc
     except Exception as e:
@@ -66,11 +148,11 @@ async def update_product(
     product_id: UUID,
     updated_data: UpdateProductRequest,
     current_admin: User = Depends(get_current_admin),
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_session)
 ):
     product_service = ProductService(session)
     try:
-        return product_service.update_product(product_id, updated_data)
+        return await product_service.update_product(product_id, updated_data)
     except HTTPException as http_exc:
         raise http_exc
     except Exception as e:
@@ -84,11 +166,11 @@ async def update_product(
 async def delete_product(
     product_id: UUID, 
     current_admin: User = Depends(get_current_admin),
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_session)
 ):
     product_service = ProductService(session)
     try:
-        product_service.delete_product(product_id)
+        await product_service.delete_product(product_id)
     except HTTPException as http_exc:
         raise http_exc
     except Exception as e:
@@ -1,10 +1,10 @@
 from datetime import datetime
-from typing import List
+from typing import List, Literal, Union
 from uuid import UUID, uuid4
 from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 from app.api.dependencies import get_current_admin, get_current_user
-from app.database import get_session
+from app.database import get_read_session, get_session
 from app.models import User
 from app.schemas.user_schema import (
     GetUserDetailsResponse,
@@ -13,28 +13,51 @@ from app.schemas.user_schema import (
     CreateUserResponse,
     UpdateUserDetailsResponse,
     UpdateUserRequest,
+    UserOrdersPage,
     UserOrdersResponse,
+    UserPage,
     )
 from app.services.order_service import OrderService
 from app.services.user_services import UserService
+from app.settings import Settings
+from app.utils.responses import FastJSONAdapter
 from app.utils.security import get_password_hash
 
 
 router = APIRouter()
+settings = Settings.get_instance()
+
+# Emits the same JSON as GetUserDetailsResponse straight from User rows (links default to []).
+user_details_json = FastJSONAdapter(
+    {name: name for name in ("id", "username", "email", "is_admin", "is_active", "created_at", "updated_at")},
+    constants={"links": []},
+)
 
 # Get All Users Endpoint
+# (paginate=cursor or a cursor from a previous page switches to keyset pagination)
 @router.get("/",
-    response_model=List[GetUserDetailsResponse],
+    response_model=Union[List[GetUserDetailsResponse], UserPage],
     status_code=status.HTTP_200_OK,
 )
 async def get_all_users(
-    current_admin: User = Depends(get_current_admin), skip: int = 0, limit: int = 10,
-    session: Session = Depends(get_session) 
+    current_admin: User = Depends(get_current_admin),
+    skip: int = Query(0, ge=0), limit: int = Query(10, ge=1, le=1000),
+    paginate: Literal["offset", "cursor"] = "offset", cursor: str | None = None,
+    session: AsyncSession = Depends(get_read_session) 
 
 ):
     user_service = UserService(session)
     try:
-      return user_service.get_users(skip=skip, limit=limit)
+      cursor_mode = paginate == "cursor" or bool(cursor)
+      if settings.fast_json_responses:
+          if cursor_mode:
+              rows, next_cursor = await user_service.get_user_rows_page(limit=limit, cursor=cursor)
+              return user_details_json.response(rows, {"next_cursor": next_cursor})
+          return user_details_json.response(await user_service.get_user_rows(skip=skip, limit=limit))
+      if cursor_mode:
+          items, next_cursor = await user_service.get_users_page(limit=limit, cursor=cursor)
+          return UserPage(items=items, next_cursor=next_cursor)
+      return await user_service.get_users(skip=skip, limit=limit)
     except HTTPException as http_exc:
             raise http_exc
     except Exception as e:
@@ -48,12 +71,12 @@ async def get_all_users(
 
 #  create user
 @router.post("/", response_model=CreateUserResponse, status_code=status.HTTP_201_CREATED)
-def create_user(user: CreateUserRequest ,
-                 session: Session = Depends(get_session) ):
+async def create_user(user: CreateUserRequest ,
+                 session: AsyncSession = Depends(get_session) ):
     user_service = UserService(session)
     try:
   # Create user record
-        return user_service.create_user(user)
+        return await user_service.create_user(user)
     except HTTPException as http_exc:
             raise http_exc
     except Exception as e:
@@ -66,17 +89,17 @@ def create_user(user: CreateUserRequest ,
 
 # get user details
 @router.get("/{user_id}", response_model=GetUserDetailsResponse)
-def get_user_details(user_id: UUID, current_user: User = Depends(get_current_user),
-                      session: Session = Depends(get_session)):
+async def get_user_details(user_id: UUID, current_user: User = Depends(get_current_user),
+                      session: AsyncSession = Depends(get_read_session)):
     user_service = UserService(session)
     # Let the user access if they are an admin, otherwise only allow access to their own resource
-    if current_user.user_id != user_id and not current_user.get("is_admin", False):
+    if current_user.id != user_id and not current_user.is_admin:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="You are not allowed to access this resource",
         )
     try:
-        user = user_service.get_user_by_id(user_id)
+        user = await user_service.get_user_by_id(user_id)
         user.links = GetUserDetailsResponse.create_hateoas_links(user_id)
         return user
     except HTTPException as http_exc:
@@ -90,15 +113,14 @@ def get_user_details(user_id: UUID, current_user: User = Depends(get_current_use
 
 # allows administrators to update the role of a user
 @router.put("/change_role", status_code=status.HTTP_200_OK)
-def change_user_role(
+async def change_user_role(
     change_role_data: ChangeRoleRequest, 
     current_admin: User = Depends(get_current_admin),
-    session: Session = Depends(get_session) 
+    session: AsyncSession = Depends(get_session) 
 ):
     user_service = UserService(session)
     try:
-        user_to_change = user_service.get_user_by_id(change_role_data.id)
-        user_to_change.is_admin = change_role_data.is_admin
+        await user_service.change_user_role(change_role_data.id, change_role_data.is_admin)
         return {"message": "User role updated successfully."}
     except HTTPException as http_exc:
             raise http_exc
@@ -110,21 +132,21 @@ def change_user_role(
     
 # to update user info
 @router.put("/{user_id}", response_model=UpdateUserDetailsResponse)
-def update_user(
+async def update_user(
     user_id: UUID,
     update_data: UpdateUserRequest,
     current_user: User = Depends(get_current_user),
-    session: Session = Depends(get_session) 
+    session: AsyncSession = Depends(get_session) 
 
 ):
     user_service = UserService(session)
     # Ensure the authenticated user matches the requested user_id
-    if current_user.user_id != user_id:
+    if current_user.id != user_id:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="You are not allowed to update this resource")
     try :
-        updated_user = user_service.update_user(user_id ,update_data)
+        updated_user = await user_service.update_user(user_id ,update_data)
         updated_user.links = UpdateUserDetailsResponse.create_hateoas_links(user_id)
         return updated_user
     except HTTPException as http_exc:
@@ -138,33 +160,43 @@ def update_user(
    
 
 #    List Orders for User Endpoint
-@router.get("/{user_id}/orders", response_model=List[UserOrdersResponse], status_code=status.HTTP_200_OK)
-def list_user_orders(user_id: UUID,
-                     session: Session = Depends(get_session),
-                     current_user: User = Depends(get_current_user)):
+# Oldest first, optionally within [created_from, created_to); paginate=cursor (or a
+# cursor from a previous page) switches to keyset pagination and returns a UserOrdersPage.
+@router.get("/{user_id}/orders",
+    response_model=Union[List[UserOrdersResponse], UserOrdersPage],
+    status_code=status.HTTP_200_OK,
+)
+async def list_user_orders(user_id: UUID,
+                     skip: int = Query(0, ge=0), limit: int = Query(50, ge=1, le=500),
+                     paginate: Literal["offset", "cursor"] = "offset", cursor: str | None = None,
+                     created_from: datetime | None = None, created_to: datetime | None = None,
+                     current_user: User = Depends(get_current_user),
+                     session: AsyncSession = Depends(get_read_session)):
     
     order_service = OrderService(session)
     if current_user.id != user_id:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="You are not allowed to access this resource.")    
-    orders = order_service.get_orders_by_user(user_id)    
-    if not orders:
-        return []
-    return orders
+    if paginate == "cursor" or cursor:
+        items, next_cursor = await order_service.get_orders_by_user_page(
+            user_id, limit, cursor, created_from, created_to
+        )
+        return UserOrdersPage(items=[item.model_dump() for item in items], next_cursor=next_cursor)
+    return await order_service.get_orders_by_user(user_id, skip, limit, created_from, created_to)
 
 #    Delete User Endpoint
 @router.delete("/users/{user_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_user(user_id: UUID, 
-                session: Session = Depends(get_session), 
+async def delete_user(user_id: UUID, 
+                session: AsyncSession = Depends(get_session), 
                 current_user: User = Depends(get_current_user)):
     
     user_service = UserService(session)    
     if current_user.id != user_id:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="You are not allowed to access this resource")
-    user = user_service.get_user_by_id(user_id)
+    user = await user_service.get_user_by_id(user_id)
     if not user:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found.")
-    if user_service.user_has_active_orders(user_id):
+    if await user_service.user_has_active_orders(user_id):
         raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="User has active orders and cannot be deleted.")
-    user_service.delete_user(user)
+    await user_service.delete_user(user)
     return None
 
@@ -1,26 +1,268 @@
-from sqlmodel import Field, Session, SQLModel, create_engine, select
+import asyncio
+import logging
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from sqlalchemy import event, exc
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.migrations import latest_version, run_migrations, stamped_version
 from app.settings import Settings
+from app.utils.cache import TTLCache
+from app.utils.metrics import instrument_engine
+from app.utils.sql_profiler import profile_engine
 
 
 settings = Settings.get_instance()
-engine = create_engine(settings.database_url)
+logger = logging.getLogger(__name__)
+
+# Async drivers used for each backend; URLs in .env can keep the plain
+# "postgresql://" / "sqlite://" form and are upgraded here.
+ASYNC_DRIVERS = {
+    "postgresql": "asyncpg",
+    "sqlite": "aiosqlite",
+}
+
+
+def to_async_url(database_url: str):
+    url = make_url(database_url)
+    backend = url.get_backend_name()
+    if backend in ASYNC_DRIVERS and url.get_driver_name() != ASYNC_DRIVERS[backend]:
+        url = url.set(drivername=f"{backend}+{ASYNC_DRIVERS[backend]}")
+    return url
+
+
+@dataclass
+class PoolStats:
+    checkouts: int = 0
+    checkout_timeouts: int = 0
+    total_wait_seconds: float = 0.0
+    max_wait_seconds: float = 0.0
+
+    def record(self, waited: float):
+        self.checkouts += 1
+        self.total_wait_seconds += waited
+        if waited > self.max_wait_seconds:
+            self.max_wait_seconds = waited
+
+
+pool_stats = PoolStats()
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool that records how long each checkout waited and how many timed out."""
+
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            pool_stats.checkout_timeouts += 1
+            raise
+        pool_stats.record(time.perf_counter() - started)
+        return connection
+
+
+def engine_options(url) -> dict:
+    if url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:"):
+        return {}
+    return {
+        "poolclass": InstrumentedQueuePool,
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout,
+        "pool_recycle": settings.db_pool_recycle,
+        "pool_pre_ping": settings.db_pool_pre_ping,
+    }
+
+
+def _instrument(engine):
+    if settings.metrics_enabled:
+        instrument_engine(engine.sync_engine)
+    if settings.sql_profiling or settings.slow_query_ms:
+        profile_engine(engine.sync_engine)
+
+
+database_url = to_async_url(settings.database_url)
+engine = create_async_engine(database_url, **engine_options(database_url))
+_instrument(engine)
+
+# Users remembered as recent writers, per process.
+REPLICA_STICKY_MAX_CLIENTS = 100000
+
+# Id of the user the current request authenticated as, set by the auth dependency.
+# None for anonymous requests and work outside a request.
+replica_client: ContextVar[str | None] = ContextVar("replica_client", default=None)
+
+
+class ReadReplica:
+    """Decides per request whether a read-only session may use the replica.
+
+    Reads of a user go to the primary instead for ``sticky_seconds`` after one of their
+    sessions committed a write (read-your-writes despite replication lag), and for
+    everyone for ``retry_seconds`` after the replica failed to connect. The user is the
+    one in ``replica_client``; anonymous requests are not tracked, so they always read from
+    the replica. Writers are tracked per process, so with several workers a user is sticky
+    on the worker that served the write; keep ``sticky_seconds`` above the usual
+    replication lag.
+    """
+
+    def __init__(self, engine, sticky_seconds: float, retry_seconds: float):
+        self.engine = engine
+        self.retry_seconds = retry_seconds
+        self._recent_writers = TTLCache(REPLICA_STICKY_MAX_CLIENTS, sticky_seconds)
+        self._down_until = 0.0
+
+    def track_writes(self):
+        """Record the current user as a recent writer whenever one of their sessions commits
+        a write: an ORM flush with changes, or an INSERT / UPDATE / DELETE run through it."""
+        event.listen(Session, "after_flush", _note_flush)
+        event.listen(Session, "do_orm_execute", _note_execute)
+        event.listen(Session, "after_commit", self._after_commit)
+        event.listen(Session, "after_rollback", _after_rollback)
+
+    def stop_tracking(self):
+        event.remove(Session, "after_flush", _note_flush)
+        event.remove(Session, "do_orm_execute", _note_execute)
+        event.remove(Session, "after_commit", self._after_commit)
+        event.remove(Session, "after_rollback", _after_rollback)
+
+    def _after_commit(self, session):
+        if session.info.pop("replica_wrote", False):
+            self.record_write(session.info.pop("replica_client"))
+
+    def record_write(self, client: str):
+        self._recent_writers.set(client, True)
+
+    def use_for(self, client: str | None) -> bool:
+        if time.monotonic() < self._down_until:
+            return False
+        return client is None or self._recent_writers.get(client) is None
+
+    def mark_down(self, error: Exception):
+        self._down_until = time.monotonic() + self.retry_seconds
+        logger.warning("Read replica unavailable, using the primary for %.0fs: %s", self.retry_seconds, error)
+
+
+def _replica_engine(url):
+    options = engine_options(url)
+    if "poolclass" in options:
+        # pool_stats and get_pool_status describe the primary's pool.
+        options["poolclass"] = AsyncAdaptedQueuePool
+    replica_engine = create_async_engine(url, **options)
+    _instrument(replica_engine)
+    return replica_engine
+
+
+# Writes are noted with the user that made them; a session may outlive the request
+# context by the time it commits.
+def _note_write(info: dict):
+    client = replica_client.get()
+    if client is not None:
+        info["replica_wrote"] = True
+        info["replica_client"] = client
+
+
+def _note_flush(session, flush_context):
+    _note_write(session.info)
+
+
+def _note_execute(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        _note_write(orm_execute_state.session.info)
+
+
+def _after_rollback(session):
+    session.info.pop("replica_wrote", None)
+    session.info.pop("replica_client", None)
+
+
+read_replica = (
+    ReadReplica(
+        _replica_engine(to_async_url(settings.read_replica_url)),
+        settings.replica_sticky_seconds,
+        settings.replica_retry_seconds,
+    )
+    if settings.read_replica_url else None
+)
+if read_replica is not None:
+    read_replica.track_writes()
+
 
 async def init_db():
     try:
-       SQLModel.metadata.create_all(engine)
-    except Exception:
-      raise RuntimeError("Failed to initialize the database.") 
+        if settings.db_startup_mode != "migrate":
+            # Usual boot: the schema is current, so one SELECT replaces the migration pass.
+            async with engine.connect() as conn:
+                version = await conn.run_sync(stamped_version)
+            if version >= latest_version():
+                return
+            if settings.db_startup_mode == "check":
+                raise RuntimeError(
+                    f"Database schema is at version {version}, expected {latest_version()}; "
+                    "run python -m app.migrations"
+                )
+        async with engine.begin() as conn:
+            await conn.run_sync(run_migrations)
+    except Exception as e:
+      raise RuntimeError("Failed to initialize the database.") from e
+
 
 
+async def get_session():
+    # expire_on_commit=False keeps loaded attributes usable after commit;
+    # with AsyncSession an expired attribute would need an implicit (blocking) refresh.
+    async with AsyncSession(engine, expire_on_commit=False) as session:
+        yield session
+
+
+async def get_read_session():
+    """Session for routes that only read: on the replica when one is configured and usable
+    for this client, otherwise the same primary session as ``get_session``.
 
-def get_session():
-    with Session(engine) as session:
+    Routes that authenticate must declare the user dependency before this one, so that
+    ``replica_client`` is set when the replica is chosen.
+    """
+    if read_replica is not None and read_replica.use_for(replica_client.get()):
+        async with AsyncSession(read_replica.engine, expire_on_commit=False) as session:
+            try:
+                # Connect now, while falling back to the primary is still possible.
+                await session.connection()
+            except (exc.DBAPIError, OSError, asyncio.TimeoutError) as e:
+                read_replica.mark_down(e)
+            else:
+                yield session
+                return
+    async with AsyncSession(engine, expire_on_commit=False) as session:
         yield session
 
+
+def get_pool_status() -> dict:
+    pool = engine.pool
+    instrumented = isinstance(pool, InstrumentedQueuePool)
+    checkouts = pool_stats.checkouts
+    return {
+        "pool_class": type(pool).__name__,
+        "size": pool.size() if instrumented else None,
+        "checked_out": pool.checkedout() if instrumented else None,
+        "checked_in": pool.checkedin() if instrumented else None,
+        # QueuePool counts overflow from -pool_size; negative values mean unused base capacity.
+        "overflow": max(pool.overflow(), 0) if instrumented else None,
+        "max_overflow": settings.db_max_overflow if instrumented else None,
+        "checkouts": checkouts,
+        "checkout_timeouts": pool_stats.checkout_timeouts,
+        "avg_wait_ms": round(pool_stats.total_wait_seconds / checkouts * 1000, 3) if checkouts else 0.0,
+        "max_wait_ms": round(pool_stats.max_wait_seconds * 1000, 3),
+    }
+
 async def close_db_connection():
     try:
-      engine.dispose()
+      await engine.dispose()
+      if read_replica is not None:
+          await read_replica.engine.dispose()
     except Exception:
-        raise RuntimeError("Failed to close the database connection.") 
-
+        raise RuntimeError("Failed to close the database connection.")
 
@@ -1,17 +1,37 @@
 from fastapi import FastAPI
+from sqlmodel.ext.asyncio.session import AsyncSession
 from app.api import api_router
+from app.api.routes import metrics
 from contextlib import asynccontextmanager
-from app.database import close_db_connection, init_db
+from app.database import close_db_connection, engine, init_db
+from app.services.order_intake import order_intake
+from app.services.order_status_service import status_cache
+from app.settings import Settings
+from app.utils.metrics import MetricsMiddleware
+from app.utils.sql_profiler import SqlProfilerMiddleware
+
+settings = Settings.get_instance()
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     await init_db()  
+    async with AsyncSession(engine) as session:
+        await status_cache.load(session)
+    if order_intake:
+        await order_intake.start()
     try:
         yield
     finally:
+        if order_intake:
+            await order_intake.stop()
         await close_db_connection() 
 
 app = FastAPI(lifespan=lifespan)
 
 app.include_router(api_router, prefix="/api/v1")
+if settings.sql_profiling:
+    app.add_middleware(SqlProfilerMiddleware)
+if settings.metrics_enabled:
+    app.add_middleware(MetricsMiddleware)
+    app.include_router(metrics.router)
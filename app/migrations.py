@@ -0,0 +1,227 @@
+"""Ordered, versioned schema migrations.
+
+``init_db`` runs every migration newer than the version stamped in the
+``schema_version`` table, so existing databases pick up new indexes and
+columns in place instead of relying on ``create_all`` (which never alters a
+table that already exists). Migrations must be idempotent: a database created
+before this module existed has tables but no stamp, and starts at version 0.
+
+With ``DB_STARTUP_MODE=auto`` (the default) boot only reads the stamp and skips
+the migration pass when it is current; ``check`` never migrates on boot.
+
+Add a migration by appending a function decorated with ``@migration(n, ...)``
+using the next version number. Run pending migrations by hand with:
+
+    python -m app.migrations
+"""
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, func, inspect, select, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.schema import CreateIndex
+from sqlmodel import SQLModel
+from app import models
+from app.services.report_service import rebuild_daily_statements, rebuild_product_statements, rebuild_statements
+
+
+@dataclass
+class Migration:
+    version: int
+    description: str
+    upgrade: Callable[[Connection], None]
+
+
+MIGRATIONS: list[Migration] = []
+
+# Kept out of SQLModel.metadata so create_all never touches it.
+schema_version_table = Table(
+    "schema_version",
+    MetaData(),
+    Column("version", Integer, primary_key=True),
+    Column("description", String, nullable=False),
+    Column("applied_at", DateTime, nullable=False),
+)
+
+
+def migration(version: int, description: str):
+    def register(upgrade: Callable[[Connection], None]):
+        if MIGRATIONS and version <= MIGRATIONS[-1].version:
+            raise ValueError(f"Migration {version} is out of order")
+        MIGRATIONS.append(Migration(version, description, upgrade))
+        return upgrade
+    return register
+
+
+def latest_version() -> int:
+    return MIGRATIONS[-1].version if MIGRATIONS else 0
+
+
+def current_version(conn: Connection) -> int:
+    if not inspect(conn).has_table(schema_version_table.name):
+        return 0
+    return conn.execute(select(func.max(schema_version_table.c.version))).scalar() or 0
+
+
+def stamped_version(conn: Connection) -> int:
+    """Current version from a single query, without the reflection ``current_version`` does;
+    0 when the stamp table does not exist yet. On Postgres a missing table aborts the
+    transaction, so run this on a connection of its own."""
+    try:
+        return conn.execute(select(func.max(schema_version_table.c.version))).scalar() or 0
+    except DBAPIError:
+        return 0
+
+
+def run_migrations(conn: Connection) -> list[Migration]:
+    """Apply pending migrations on ``conn`` (inside the caller's transaction) and return them."""
+    if conn.dialect.name == "postgresql":
+        # Serialize concurrently booting workers; released when the transaction ends.
+        conn.execute(text("SELECT pg_advisory_xact_lock(hashtext('schema_version'))"))
+    schema_version_table.create(conn, checkfirst=True)
+    version = current_version(conn)
+    applied = []
+    for pending in MIGRATIONS:
+        if pending.version <= version:
+            continue
+        pending.upgrade(conn)
+        conn.execute(schema_version_table.insert().values(
+            version=pending.version, description=pending.description, applied_at=datetime.utcnow()
+        ))
+        applied.append(pending)
+    return applied
+
+
+def _create_indexes(conn: Connection, *indexes):
+    # IF NOT EXISTS rather than checkfirst: SQLite reflection cannot see expression indexes.
+    for index in indexes:
+        conn.execute(CreateIndex(index, if_not_exists=True))
+
+
+def _index(table, name: str):
+    return next(index for index in table.indexes if index.name == name)
+
+
+@migration(1, "Initial schema")
+def _initial_schema(conn: Connection):
+    SQLModel.metadata.create_all(conn, checkfirst=True)
+
+
+@migration(2, "Indexes for hot lookup and pagination columns")
+def _lookup_indexes(conn: Connection):
+    users, products = models.User.__table__, models.Product.__table__
+    orders, order_product = models.Order.__table__, models.OrderProduct.__table__
+    _create_indexes(
+        conn,
+        _index(users, "ix_users_username"),
+        _index(users, "ix_users_created_at_id"),
+        _index(products, "ix_products_name_lower"),
+        _index(products, "ix_products_created_at_id"),
+        _index(orders, "ix_orders_user_id_created_at"),
+        _index(orders, "ix_orders_status_id"),
+        _index(order_product, "ix_order_product_order_id"),
+    )
+
+
+
+@migration(3, "Product search indexes (Postgres only)")
+def _search_indexes(conn: Connection):
+    # SQLite searches through the in-process index in app.services.search_index instead.
+    if conn.dialect.name != "postgresql":
+        return
+    conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+    conn.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_products_name_trgm ON products USING gin (name gin_trgm_ops)"
+    ))
+    conn.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_products_description_trgm "
+        "ON products USING gin (description gin_trgm_ops)"
+    ))
+    # Must stay in sync with search_document() in app.services.search_index.
+    conn.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_products_search_document ON products USING gin "
+        "((to_tsvector('english'::regconfig, coalesce(name, '') || ' ' || coalesce(description, ''))))"
+    ))
+
+
+
+@migration(4, "products.updated_at")
+def _product_updated_at(conn: Connection):
+    columns = {column["name"] for column in inspect(conn).get_columns("products")}
+    if "updated_at" not in columns:
+        column = models.Product.__table__.c.updated_at
+        conn.execute(text(
+            f"ALTER TABLE products ADD COLUMN updated_at {column.type.compile(conn.dialect)}"
+        ))
+
+
+@migration(5, "Sales rollups and low-stock index")
+def _sales_rollups(conn: Connection):
+    for model in (models.DailySales, models.ProductSales):
+        model.__table__.create(conn, checkfirst=True)
+    _create_indexes(
+        conn,
+        _index(models.ProductSales.__table__, "ix_product_sales_quantity_sold"),
+        _index(models.Product.__table__, "ix_products_stock"),
+    )
+    # Backfill from the existing order history; OrderService keeps them current from here on.
+    for statement in rebuild_statements():
+        conn.execute(statement)
+
+
+@migration(6, "Sharded stock buckets for hot products")
+def _stock_buckets(conn: Connection):
+    columns = {column["name"] for column in inspect(conn).get_columns("products")}
+    if "stock_buckets" not in columns:
+        conn.execute(text("ALTER TABLE products ADD COLUMN stock_buckets INTEGER NOT NULL DEFAULT 0"))
+    models.ProductStockBucket.__table__.create(conn, checkfirst=True)
+
+
+@migration(7, "Durable order intake queue")
+def _order_intake(conn: Connection):
+    models.OrderIntake.__table__.create(conn, checkfirst=True)
+
+
+@migration(8, "product_stock_buckets.updated_at")
+def _stock_bucket_updated_at(conn: Connection):
+    columns = {column["name"] for column in inspect(conn).get_columns("product_stock_buckets")}
+    if "updated_at" not in columns:
+        column = models.ProductStockBucket.__table__.c.updated_at
+        conn.execute(text(
+            f"ALTER TABLE product_stock_buckets ADD COLUMN updated_at {column.type.compile(conn.dialect)}"
+        ))
+
+
+@migration(9, "Slotted daily_sales rows")
+def _daily_sales_slots(conn: Connection):
+    # Derived data: recreate with the slot in the primary key and rebuild from the orders.
+    table = models.DailySales.__table__
+    table.drop(conn, checkfirst=True)
+    table.create(conn)
+    for statement in rebuild_daily_statements():
+        conn.execute(statement)
+
+
+@migration(10, "Slotted product_sales rows")
+def _product_sales_slots(conn: Connection):
+    table = models.ProductSales.__table__
+    table.drop(conn, checkfirst=True)
+    table.create(conn)
+    for statement in rebuild_product_statements():
+        conn.execute(statement)
+
+
+if __name__ == "__main__":
+    from app.database import to_async_url, settings
+    from sqlalchemy import create_engine
+
+    url = to_async_url(settings.database_url)
+    sync_url = url.set(drivername=url.get_backend_name())
+    engine = create_engine(sync_url)
+    with engine.begin() as conn:
+        before = current_version(conn)
+        applied = run_migrations(conn)
+    for done in applied:
+        print(f"applied {done.version}: {done.description}")
+    print(f"schema version {before} -> {latest_version()}")
@@ -1,16 +1,18 @@
 from decimal import Decimal
-from sqlalchemy import Column, Numeric
+from sqlalchemy import JSON, Column, Index, Numeric, func
 from sqlmodel import SQLModel, Field, Relationship
 from uuid import UUID, uuid4
-from datetime import datetime
+from datetime import date, datetime
 from pydantic import EmailStr
 from typing import List, Optional 
 
 # User Model
 class User(SQLModel, table=True):
     __tablename__ = "users"
+    # Keyset pagination order for GET /users
+    __table_args__ = (Index("ix_users_created_at_id", "created_at", "id"),)
     id: UUID = Field(default_factory=uuid4, primary_key=True)
-    username: str = Field(nullable=False)
+    username: str = Field(nullable=False, index=True)
     email: EmailStr = Field(nullable=False, unique=True)
     hashed_password: str = Field(nullable=False)
     is_admin: bool = Field(default=False)
@@ -23,23 +25,40 @@ class User(SQLModel, table=True):
 
 class Product(SQLModel, table=True):
     __tablename__ = "products"
+    # Keyset pagination order for GET /products
+    __table_args__ = (Index("ix_products_created_at_id", "created_at", "id"),)
     id: UUID = Field(default_factory=uuid4, primary_key=True)
     name: str = Field(nullable=False)
     description: Optional[str] = None  
     price: Decimal = Field(sa_column=Column(Numeric(10, 2), nullable=False))
-    stock: int = Field(default=0)
+    # Low-stock report
+    stock: int = Field(default=0, index=True)
     is_available: bool = Field(default=True)
+    # 0: stock is this row's ``stock``. N > 0: stock is split across N ProductStockBucket
+    # rows (hot products), and ``stock`` is only the total as of the last redistribution;
+    # reads present the bucket sum instead (InventoryService.with_live_stock).
+    stock_buckets: int = Field(default=0)
     created_at: datetime = Field(default_factory=datetime.utcnow)
+    # Bumped on every change (including stock decrements); drives catalog ETags
+    updated_at: Optional[datetime] = Field(default=None, nullable=True)
 
     # One-to-Many relationship with OrderProduct
     order_products: List["OrderProduct"] = Relationship(back_populates="product")  
 
+    @property
+    def version(self) -> datetime:
+        return self.updated_at or self.created_at
+
 class Order(SQLModel, table=True):
     __tablename__ = "orders"
+    __table_args__ = (
+        # Per-user order listing, optionally filtered / ordered by date
+        Index("ix_orders_user_id_created_at", "user_id", "created_at"),
+    )
 
     id: UUID = Field(default_factory=uuid4, primary_key=True)
     user_id: Optional[UUID] = Field(foreign_key="users.id", nullable=True)  
-    status_id: Optional[UUID] = Field(foreign_key="order_status.id", nullable=True)  
+    status_id: Optional[UUID] = Field(foreign_key="order_status.id", nullable=True, index=True)  
     total_price: Decimal = Field(sa_column=Column(Numeric(10, 2), nullable=False))
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: Optional[datetime] = Field(default=None, nullable=True)  
@@ -64,7 +83,7 @@ class OrderProduct(SQLModel, table=True):
     __tablename__ = "order_product"
 
     id: UUID = Field(default_factory=uuid4, primary_key=True)
-    order_id: UUID = Field(foreign_key="orders.id", nullable=False)
+    order_id: UUID = Field(foreign_key="orders.id", nullable=False, index=True)
     product_id: Optional[UUID] = Field(foreign_key="products.id", nullable=True)  
     quantity: int = Field(nullable=False, default=1) 
     created_at: datetime = Field(default_factory=datetime.utcnow)
@@ -72,4 +91,61 @@ class OrderProduct(SQLModel, table=True):
 
     # Many-to-One relationships
     order: Order = Relationship(back_populates="order_products")
-    product: Optional[Product] = Relationship(back_populates="order_products")  
\ No newline at end of file
+    product: Optional[Product] = Relationship(back_populates="order_products")
+
+
+# One shard of a hot product's stock; orders decrement a random bucket so concurrent
+# orders for the same product rarely wait on the same row.
+class ProductStockBucket(SQLModel, table=True):
+    __tablename__ = "product_stock_buckets"
+
+    product_id: UUID = Field(foreign_key="products.id", primary_key=True)
+    bucket: int = Field(primary_key=True)
+    stock: int = Field(default=0)
+    # Bumped by every decrement, so reads can advance the product's version (and ETag)
+    # without writing the hot product row.
+    updated_at: Optional[datetime] = Field(default=None, nullable=True)
+
+
+# Durable order intake queue (ORDER_INTAKE_MODE=database). The row id becomes the
+# order id; workers move rows from "queued" to "completed" or "failed".
+class OrderIntake(SQLModel, table=True):
+    __tablename__ = "order_intake"
+    __table_args__ = (Index("ix_order_intake_status_created_at", "status", "created_at"),)
+
+    id: UUID = Field(default_factory=uuid4, primary_key=True)
+    user_id: UUID = Field(nullable=False)
+    # {"<product id>": quantity}
+    items: dict = Field(sa_column=Column(JSON, nullable=False))
+    status: str = Field(default="queued", nullable=False)
+    error: Optional[str] = None
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: Optional[datetime] = Field(default=None, nullable=True)
+
+
+# Reporting rollups, kept current by OrderService in the same transaction as the order
+# change (see app.services.report_service). No foreign keys: these are derived data and
+# must not block deleting a status or product.
+class DailySales(SQLModel, table=True):
+    __tablename__ = "daily_sales"
+
+    day: date = Field(primary_key=True)  # UTC date the order was placed
+    status_id: UUID = Field(primary_key=True)
+    # One of ROLLUP_SLOTS rows per (day, status); reports sum them.
+    slot: int = Field(default=0, primary_key=True)
+    order_count: int = Field(default=0)
+    revenue: Decimal = Field(default=0, sa_column=Column(Numeric(14, 2), nullable=False))
+
+class ProductSales(SQLModel, table=True):
+    __tablename__ = "product_sales"
+    __table_args__ = (Index("ix_product_sales_quantity_sold", "quantity_sold"),)
+
+    product_id: UUID = Field(primary_key=True)
+    # One of ROLLUP_SLOTS rows per product, like the stock buckets; reports sum them.
+    slot: int = Field(default=0, primary_key=True)
+    quantity_sold: int = Field(default=0)
+    order_count: int = Field(default=0)
+
+
+# Case-insensitive product name lookups (duplicate checks) use lower(name)
+Index("ix_products_name_lower", func.lower(Product.name))
@@ -0,0 +1,57 @@
+from datetime import date
+from decimal import Decimal
+from uuid import UUID
+from pydantic import BaseModel, Field
+
+
+class PoolStatusResponse(BaseModel):
+    pool_class: str
+    size: int | None = None
+    checked_out: int | None = None
+    checked_in: int | None = None
+    overflow: int | None = None
+    max_overflow: int | None = None
+    checkouts: int
+    checkout_timeouts: int
+    avg_wait_ms: float
+    max_wait_ms: float
+
+
+class CacheStatsResponse(BaseModel):
+    size: int
+    maxsize: int
+    ttl_seconds: float
+    hits: int
+    misses: int
+    hit_ratio: float
+
+
+class RevenueReportRow(BaseModel):
+    day: date
+    status: str
+    order_count: int
+    revenue: Decimal
+
+
+class TopProductRow(BaseModel):
+    product_id: UUID
+    name: str | None = None
+    quantity_sold: int
+    order_count: int
+
+
+class LowStockRow(BaseModel):
+    product_id: UUID
+    name: str
+    stock: int
+    is_available: bool
+
+
+class StockBucketsRequest(BaseModel):
+    buckets: int = Field(..., ge=0, le=64)
+
+
+class InventoryResponse(BaseModel):
+    product_id: UUID
+    stock: int
+    buckets: list[int] = []
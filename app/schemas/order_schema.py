@@ -2,7 +2,7 @@ from uuid import UUID, uuid4
 from pydantic import BaseModel, Field
 from datetime import datetime
 from decimal import Decimal
-from typing import List, Optional
+from typing import List, Literal, Optional
 
 class OrderProduct(BaseModel):
     product_id: UUID
@@ -14,6 +14,21 @@ class CreateOrderRequest(BaseModel):
 class UpdateOrderStatusRequest(BaseModel):
     status: str
 
+class BulkUpdateOrderStatusRequest(BaseModel):
+    order_ids: List[UUID] = Field(..., min_length=1, max_length=5000)
+    status: str
+
+class BulkOrderStatusResult(BaseModel):
+    order_id: UUID
+    result: Literal["updated", "unchanged", "not_found"]
+
+class BulkUpdateOrderStatusResponse(BaseModel):
+    status: str
+    updated: int
+    unchanged: int
+    not_found: int
+    results: List[BulkOrderStatusResult]
+
 class OrderResponse(BaseModel):
     id: UUID
     user_id: Optional[UUID]
@@ -25,4 +40,10 @@ class OrderResponse(BaseModel):
 
     class Config:
         orm_mode = True
-        from_attributes=True
\ No newline at end of file
+        from_attributes=True
+
+class OrderIntakeResponse(BaseModel):
+    id: UUID  # the id the order gets once created
+    status: Literal["queued", "completed", "failed"]
+    error: Optional[str] = None
+    order: Optional[OrderResponse] = None
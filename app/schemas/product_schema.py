@@ -1,6 +1,7 @@
 from uuid import UUID, uuid4
 from pydantic import BaseModel, Field
 from datetime import datetime
+from typing import List
 
 class Product(BaseModel):
     id: UUID = Field(default_factory=uuid4)  
@@ -26,5 +27,28 @@ class UpdateProductRequest(BaseModel):
     isAvailable: bool | None = None
   
 class ProductResponse(Product):
-    pass 
- 
\ No newline at end of file
+    pass
+
+
+class ProductPage(BaseModel):
+    items: List[Product]
+    next_cursor: str | None = None
+
+
+class ProductSearchResponse(BaseModel):
+    items: List[Product]
+    total: int
+    skip: int
+    limit: int
+
+
+class ImportRowError(BaseModel):
+    row: int
+    error: str
+
+
+class BulkImportResponse(BaseModel):
+    total_rows: int
+    imported: int
+    failed: int
+    errors: List[ImportRowError] = []
@@ -57,7 +57,7 @@ class CreateUserResponse(BaseModel):
            from_attributes=True
 
 class GetUserDetailsResponse(CreateUserResponse):
-    updated_at: datetime
+    updated_at: datetime | None = None
     links: List[Dict[str, str]] = []  # HATEOAS links
 
     class Config:
@@ -91,6 +91,11 @@ class UpdateUserDetailsResponse(CreateUserResponse):
         ]
 
 
+class UserPage(BaseModel):
+    items: List[GetUserDetailsResponse]
+    next_cursor: str | None = None
+
+
 class UpdateUserRequest(BaseModel):
     username: str | None = None
     email: EmailStr | None = None
@@ -108,13 +113,24 @@ class ChangeRoleRequest(BaseModel):
     is_admin: bool
 
 
+class UserOrderProduct(BaseModel):
+    product_id: UUID
+    quantity: int
+
+
 class UserOrdersResponse(BaseModel):
     id: UUID
     status: str
     total_price: Decimal
     created_at: datetime
-    updated_at: datetime
+    updated_at: datetime | None = None
+    products: List[UserOrderProduct] = []
 
     class Config:
         orm_mode = True
         from_attributes=True
+
+
+class UserOrdersPage(BaseModel):
+    items: List[UserOrdersResponse]
+    next_cursor: str | None = None
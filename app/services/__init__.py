@@ -1,2 +0,0 @@
-from app.services.user_services import *
-from app.services.auth_service import *
\ No newline at end of file
@@ -1,32 +1,49 @@
 from uuid import UUID
-from sqlmodel import Session, select
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
 from app.models import User
 from app.settings import Settings
-from app.utils.security import verify_password
+from app.utils.cache import TTLCache
+from app.utils.security import verify_password_async
 
 
 settings = Settings.get_instance()
 
+# Users resolved by get_current_user, keyed by id. Entries are dropped by UserService
+# whenever a user is changed or deleted; the TTL bounds staleness across workers.
+principal_cache = TTLCache(settings.principal_cache_size, settings.principal_cache_ttl)
+
 class AuthService:
-    def __init__(self, session: Session):
+    def __init__(self, session: AsyncSession):
         self.session = session
 
-    def get_user_by_username(self, username: str) -> User | None:
-        user = self.session.exec(select(User).where(User.username == username)).first()
+    async def get_user_by_username(self, username: str) -> User | None:
+        user = (await self.session.exec(select(User).where(User.username == username))).first()
         if user:
             return user
         return None
     
-    def get_user_by_id(self, id: UUID) -> User | None:
-        user = self.session.exec(select(User).where(User.id == id)).first()
+    async def get_user_by_id(self, id: UUID) -> User | None:
+        user = (await self.session.exec(select(User).where(User.id == id))).first()
         if user :
             return user
         return None
+
+    async def get_principal(self, id: UUID) -> User | None:
+        user = principal_cache.get(id)
+        if user is not None:
+            return user
+        user = await self.get_user_by_id(id)
+        if user is not None:
+            # Detach so the cached instance outlives this request's session.
+            self.session.expunge(user)
+            principal_cache.set(id, user)
+        return user
     
 
     async def authenticate_user(self, username: str, password: str) -> User | None:
-        user = self.get_user_by_username(username)
-        if user and verify_password(password, user.hashed_password):
+        user = await self.get_user_by_username(username)
+        if user and await verify_password_async(password, user.hashed_password):
             return user
         return None
-     
\ No newline at end of file
+     
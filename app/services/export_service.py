@@ -0,0 +1,131 @@
+import csv
+import io
+import json
+from datetime import datetime
+from decimal import Decimal
+from typing import AsyncIterator
+from uuid import UUID
+from sqlalchemy import func
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.database import engine
+from app.models import Order, OrderProduct, OrderStatus, Product
+from app.services.inventory_service import bucket_totals
+
+# Rows fetched per round trip from the server-side cursor, and rows written per chunk.
+EXPORT_BATCH_SIZE = 500
+
+PRODUCT_COLUMNS = ["id", "name", "description", "price", "stock", "is_available", "created_at"]
+ORDER_COLUMNS = ["id", "user_id", "status", "total_price", "created_at", "updated_at"]
+ORDER_LINE_COLUMNS = ["product_id", "quantity"]
+
+
+def _json_default(value):
+    if isinstance(value, (UUID, Decimal)):
+        return str(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+
+def _ndjson(record: dict) -> str:
+    return json.dumps(record, default=_json_default, separators=(",", ":")) + "\n"
+
+
+class _CsvBuffer:
+    def __init__(self):
+        self._buffer = io.StringIO()
+        self._writer = csv.writer(self._buffer)
+
+    def write(self, values):
+        self._writer.writerow(["" if value is None else value for value in values])
+
+    def drain(self) -> str:
+        data = self._buffer.getvalue()
+        self._buffer.seek(0)
+        self._buffer.truncate()
+        return data
+
+
+class ExportService:
+    """Streams whole tables as NDJSON or CSV.
+
+    Each export opens its own session: the generator outlives the request-scoped
+    session dependency once FastAPI starts sending the StreamingResponse. Rows are
+    read through a server-side cursor in EXPORT_BATCH_SIZE batches, so memory use
+    does not grow with the table size.
+    """
+
+    @staticmethod
+    async def stream_products(fmt: str) -> AsyncIterator[str]:
+        # Sharded products export the sum of their stock buckets.
+        totals = bucket_totals()
+        columns = [
+            func.coalesce(totals.c.stock, Product.stock).label(name) if name == "stock" else getattr(Product, name)
+            for name in PRODUCT_COLUMNS
+        ]
+        statement = (
+            select(*columns)
+            .outerjoin(totals, totals.c.product_id == Product.id)
+            .order_by(Product.created_at, Product.id)
+        )
+        csv_buffer = _CsvBuffer()
+        if fmt == "csv":
+            # Sent before any row, so an empty table still exports its header.
+            csv_buffer.write(PRODUCT_COLUMNS)
+            yield csv_buffer.drain()
+
+        async with AsyncSession(engine) as session:
+            result = await session.stream(statement.execution_options(yield_per=EXPORT_BATCH_SIZE))
+            async for rows in result.mappings().partitions():
+                if fmt == "csv":
+                    for row in rows:
+                        csv_buffer.write(row[name] for name in PRODUCT_COLUMNS)
+                    yield csv_buffer.drain()
+                else:
+                    yield "".join(_ndjson(dict(row)) for row in rows)
+
+    @staticmethod
+    async def stream_orders(fmt: str) -> AsyncIterator[str]:
+        # One row per order line (orders without lines appear once with empty line
+        # columns), ordered by order so lines of the same order arrive together.
+        statement = (
+            select(
+                Order.id, Order.user_id, OrderStatus.name.label("status"), Order.total_price,
+                Order.created_at, Order.updated_at, OrderProduct.product_id, OrderProduct.quantity,
+            )
+            .outerjoin(OrderStatus, OrderStatus.id == Order.status_id)
+            .outerjoin(OrderProduct, OrderProduct.order_id == Order.id)
+            .order_by(Order.id, OrderProduct.id)
+        )
+        csv_buffer = _CsvBuffer()
+        if fmt == "csv":
+            # Sent before any row, so an empty table still exports its header.
+            csv_buffer.write(ORDER_COLUMNS + ORDER_LINE_COLUMNS)
+            yield csv_buffer.drain()
+
+        current = None
+        async with AsyncSession(engine) as session:
+            result = await session.stream(statement.execution_options(yield_per=EXPORT_BATCH_SIZE))
+            async for rows in result.mappings().partitions():
+                if fmt == "csv":
+                    for row in rows:
+                        csv_buffer.write(row[name] for name in ORDER_COLUMNS + ORDER_LINE_COLUMNS)
+                    yield csv_buffer.drain()
+                    continue
+
+                chunk = []
+                for row in rows:
+                    if current is None or current["id"] != row["id"]:
+                        if current is not None:
+                            chunk.append(_ndjson(current))
+                        current = {name: row[name] for name in ORDER_COLUMNS}
+                        current["products"] = []
+                    if row["product_id"] is not None:
+                        current["products"].append(
+                            {"product_id": row["product_id"], "quantity": row["quantity"]}
+                        )
+                if chunk:
+                    yield "".join(chunk)
+        if current is not None:
+            yield _ndjson(current)
@@ -0,0 +1,172 @@
+import random
+from datetime import datetime
+from uuid import UUID
+from fastapi import HTTPException
+from sqlalchemy import case, delete, func, insert, update
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.models import Product, ProductStockBucket
+
+# Upper bound on buckets per product; more buckets spread writes wider but make the
+# slow path (an order larger than any single bucket) lock more rows.
+MAX_STOCK_BUCKETS = 64
+
+
+def bucket_totals():
+    """Subquery of (product_id, stock, updated_at) per sharded product, to outer-join
+    against products: ``coalesce(stock, Product.stock)`` is then every product's live stock."""
+    return (
+        select(
+            ProductStockBucket.product_id,
+            func.sum(ProductStockBucket.stock).label("stock"),
+            func.max(ProductStockBucket.updated_at).label("updated_at"),
+        )
+        .group_by(ProductStockBucket.product_id)
+        .subquery()
+    )
+
+
+class InventoryService:
+    """Stock decrements for orders, and the sharded stock-bucket scheme for hot products.
+
+    Every decrement is an atomic conditional UPDATE (``stock = stock - q WHERE stock >= q``),
+    so stock can never go negative and no row is locked before it is written. Products with
+    ``stock_buckets > 0`` keep their stock in that many ProductStockBucket rows: each order
+    decrements one randomly chosen bucket, so concurrent orders for the same product mostly
+    write different rows instead of queueing on one. Those decrements leave the product row
+    alone; reads go through ``with_live_stock`` to see the current total.
+    """
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def reserve(self, products_by_id: dict[UUID, Product], quantities: dict[UUID, int]) -> bool:
+        """Take ``quantities`` out of stock. False if a product runs short; the caller
+        must then roll back, as earlier lines may already have been decremented."""
+        plain = {pid: q for pid, q in quantities.items() if not products_by_id[pid].stock_buckets}
+        if plain:
+            # All plain lines in one statement; rows are written in the same scan order by
+            # every transaction, so multi-product carts do not deadlock each other. The
+            # stock_buckets check rejects a product that was sharded since it was read.
+            ordered_quantity = case(*((Product.id == pid, q) for pid, q in plain.items()))
+            result = await self.session.execute(
+                update(Product)
+                .where(Product.id.in_(plain), Product.stock_buckets == 0, Product.stock >= ordered_quantity)
+                .values(stock=Product.stock - ordered_quantity, updated_at=datetime.utcnow())
+                .execution_options(synchronize_session=False)
+            )
+            if result.rowcount != len(plain):
+                return False
+
+        for product_id in sorted(set(quantities) - set(plain), key=str):
+            product = products_by_id[product_id]
+            if not await self._take_from_buckets(product_id, quantities[product_id], product.stock_buckets):
+                return False
+        return True
+
+    async def _take_from_buckets(self, product_id: UUID, quantity: int, buckets: int) -> bool:
+        # Fast path: one bucket that holds the whole quantity, starting from a random one.
+        start = random.randrange(buckets)
+        for offset in range(buckets):
+            result = await self.session.execute(
+                update(ProductStockBucket)
+                .where(
+                    ProductStockBucket.product_id == product_id,
+                    ProductStockBucket.bucket == (start + offset) % buckets,
+                    ProductStockBucket.stock >= quantity,
+                )
+                .values(stock=ProductStockBucket.stock - quantity, updated_at=datetime.utcnow())
+                .execution_options(synchronize_session=False)
+            )
+            if result.rowcount:
+                return True
+
+        # Slow path: no single bucket is large enough, so drain several, locking them in
+        # bucket order.
+        rows = (await self.session.exec(
+            select(ProductStockBucket)
+            .where(ProductStockBucket.product_id == product_id)
+            .order_by(ProductStockBucket.bucket)
+            .with_for_update()
+        )).all()
+        if sum(row.stock for row in rows) < quantity:
+            return False
+        remaining = quantity
+        now = datetime.utcnow()
+        for row in rows:
+            taken = min(row.stock, remaining)
+            row.stock -= taken
+            row.updated_at = now
+            remaining -= taken
+            if not remaining:
+                break
+        return True
+
+    async def with_live_stock(self, products: list[Product]) -> list[Product]:
+        """Show sharded ``products`` with the sum of their buckets as ``stock`` and their
+        last decrement as ``updated_at`` (so ETags follow it). Loaded values are replaced
+        without marking the objects dirty; no query when none of them is sharded."""
+        sharded = {product.id: product for product in products if product.stock_buckets}
+        if not sharded:
+            return products
+        rows = (await self.session.exec(
+            select(
+                ProductStockBucket.product_id,
+                func.sum(ProductStockBucket.stock),
+                func.max(ProductStockBucket.updated_at),
+            )
+            .where(ProductStockBucket.product_id.in_(sharded))
+            .group_by(ProductStockBucket.product_id)
+        )).all()
+        for product_id, stock, changed_at in rows:
+            product = sharded[product_id]
+            set_committed_value(product, "stock", stock)
+            if changed_at is not None and changed_at > product.version:
+                set_committed_value(product, "updated_at", changed_at)
+        return products
+
+    async def get_inventory(self, product_id: UUID) -> dict:
+        product = await self.session.get(Product, product_id)
+        if not product:
+            raise HTTPException(status_code=404, detail="Product not found")
+        if not product.stock_buckets:
+            return {"product_id": product_id, "stock": product.stock, "buckets": []}
+        buckets = (await self.session.exec(
+            select(ProductStockBucket.stock)
+            .where(ProductStockBucket.product_id == product_id)
+            .order_by(ProductStockBucket.bucket)
+        )).all()
+        return {"product_id": product_id, "stock": sum(buckets), "buckets": list(buckets)}
+
+    async def set_stock_buckets(self, product_id: UUID, buckets: int) -> dict:
+        """Redistribute a product's stock over ``buckets`` rows (0 folds it back into the product row)."""
+        if not 0 <= buckets <= MAX_STOCK_BUCKETS:
+            raise HTTPException(status_code=400, detail=f"buckets must be between 0 and {MAX_STOCK_BUCKETS}")
+        product = (await self.session.exec(
+            select(Product).where(Product.id == product_id).with_for_update()
+        )).first()
+        if not product:
+            raise HTTPException(status_code=404, detail="Product not found")
+
+        total = product.stock
+        if product.stock_buckets:
+            total = sum((await self.session.exec(
+                select(ProductStockBucket.stock)
+                .where(ProductStockBucket.product_id == product_id)
+                .with_for_update()
+            )).all())
+            await self.session.execute(
+                delete(ProductStockBucket).where(ProductStockBucket.product_id == product_id)
+            )
+        if buckets:
+            share, extra = divmod(total, buckets)
+            await self.session.execute(insert(ProductStockBucket), [
+                {"product_id": product_id, "bucket": bucket, "stock": share + (bucket < extra)}
+                for bucket in range(buckets)
+            ])
+        product.stock = total
+        product.stock_buckets = buckets
+        product.updated_at = datetime.utcnow()
+        await self.session.commit()
+        return await self.get_inventory(product_id)
@@ -0,0 +1,250 @@
+import asyncio
+import logging
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from datetime import datetime
+from uuid import UUID, uuid4
+from fastapi import HTTPException, status
+from sqlalchemy import update
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.database import engine
+from app.models import OrderIntake as OrderIntakeRow
+from app.services.order_service import OrderService
+from app.settings import Settings
+from app.utils.cache import TTLCache
+
+settings = Settings.get_instance()
+logger = logging.getLogger(__name__)
+
+# Seconds the in-memory queue gets at shutdown to create what is still queued.
+DRAIN_TIMEOUT = 10.0
+
+
+@dataclass
+class IntakeRequest:
+    user_id: UUID
+    quantities: dict[UUID, int]
+    id: UUID = field(default_factory=uuid4)  # also the id of the order it becomes
+
+
+class _AlreadyTaken(Exception):
+    """Another worker already handled this request."""
+
+
+class OrderIntake(ABC):
+    """Accepts orders for background creation and reports on their progress.
+
+    ``submit`` validates the cart against current stock (a plain read, so obviously
+    bad orders still fail fast) and queues it. Worker tasks take up to ``batch_size``
+    requests at a time and create them in one transaction, one SAVEPOINT per order, so
+    a failing order is rolled back on its own while the rest share a single commit.
+    """
+
+    def __init__(self, workers: int, batch_size: int):
+        self.workers = workers
+        self.batch_size = batch_size
+        self._tasks: list[asyncio.Task] = []
+
+    async def start(self):
+        # SQLite has a single writer: concurrent worker transactions would only fail
+        # each other with "database is locked".
+        workers = 1 if engine.dialect.name == "sqlite" else self.workers
+        self._tasks = [asyncio.create_task(self._run()) for _ in range(workers)]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def submit(self, session: AsyncSession, request: IntakeRequest) -> dict:
+        await OrderService(session).price_cart(request.quantities)
+        await self._enqueue(session, request)
+        return {"id": request.id, "status": "queued", "error": None}
+
+    @abstractmethod
+    async def _enqueue(self, session: AsyncSession, request: IntakeRequest):
+        ...
+
+    @abstractmethod
+    async def get_status(self, session: AsyncSession, intake_id: UUID) -> dict | None:
+        """{"id", "user_id", "status", "error"} for a submitted request, if known."""
+
+    @abstractmethod
+    async def _run(self):
+        ...
+
+    async def _create_orders(self, session: AsyncSession, requests: list[IntakeRequest]) -> dict[UUID, str | None]:
+        """Create the orders in one transaction; returns the error of each failed request
+        (None for created ones). Requests another worker already took are left out."""
+        order_service = OrderService(session)
+        results: dict[UUID, str | None] = {}
+        for request in requests:
+            try:
+                async with session.begin_nested():
+                    await self._take(session, request)
+                    await order_service.place_order(request.quantities, request.user_id, order_id=request.id)
+                results[request.id] = None
+            except _AlreadyTaken:
+                continue
+            except HTTPException as e:
+                results[request.id] = str(e.detail)
+            except Exception:
+                logger.exception("Queued order %s failed", request.id)
+                results[request.id] = "Internal error while creating the order"
+            if results[request.id] is not None:
+                await self._record_failure(session, request, results[request.id])
+        await session.commit()
+        return results
+
+    async def _take(self, session: AsyncSession, request: IntakeRequest):
+        """Hook run inside the order's savepoint before it is created."""
+
+    async def _record_failure(self, session: AsyncSession, request: IntakeRequest, error: str):
+        """Hook run after a failed order's savepoint has been rolled back."""
+
+
+class MemoryOrderIntake(OrderIntake):
+    """In-process queue: fast, but queued orders are lost if the process stops, and
+    results can only be polled on the process that accepted the order."""
+
+    def __init__(self, workers: int, batch_size: int, queue_limit: int, result_ttl: float):
+        super().__init__(workers, batch_size)
+        self._queue: asyncio.Queue[IntakeRequest] = asyncio.Queue(maxsize=queue_limit)
+        self._statuses = TTLCache(max(queue_limit, 1) * 10, result_ttl)
+
+    async def _enqueue(self, session: AsyncSession, request: IntakeRequest):
+        try:
+            self._queue.put_nowait(request)
+        except asyncio.QueueFull:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Order intake queue is full, try again shortly",
+                headers={"Retry-After": "1"},
+            )
+        self._set_status(request, "queued")
+
+    async def stop(self):
+        try:
+            await asyncio.wait_for(self._queue.join(), DRAIN_TIMEOUT)
+        except asyncio.TimeoutError:
+            logger.warning("Stopping with %d queued orders not created", self._queue.qsize())
+        await super().stop()
+
+    async def get_status(self, session: AsyncSession, intake_id: UUID) -> dict | None:
+        return self._statuses.get(intake_id)
+
+    def _set_status(self, request: IntakeRequest, state: str, error: str | None = None):
+        self._statuses.set(request.id, {"id": request.id, "user_id": request.user_id, "status": state, "error": error})
+
+    async def _run(self):
+        while True:
+            batch = [await self._queue.get()]
+            while len(batch) < self.batch_size and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            try:
+                async with AsyncSession(engine, expire_on_commit=False) as session:
+                    results = await self._create_orders(session, batch)
+                for request in batch:
+                    error = results.get(request.id)
+                    self._set_status(request, "failed" if error else "completed", error)
+            except Exception:
+                logger.exception("Order intake batch of %d failed", len(batch))
+                for request in batch:
+                    self._set_status(request, "failed", "Internal error while creating the order")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+
+class DatabaseOrderIntake(OrderIntake):
+    """Durable queue in the order_intake table, shared by every app process.
+
+    A worker locks a batch of queued rows (SKIP LOCKED on Postgres, so workers take
+    different rows) and flips each to completed in the same savepoint that creates
+    its order: a crash before the commit leaves the rows queued for the next worker.
+    """
+
+    def __init__(self, workers: int, batch_size: int, poll_interval: float):
+        super().__init__(workers, batch_size)
+        self.poll_interval = poll_interval
+
+    async def _enqueue(self, session: AsyncSession, request: IntakeRequest):
+        session.add(OrderIntakeRow(
+            id=request.id,
+            user_id=request.user_id,
+            items={str(product_id): quantity for product_id, quantity in request.quantities.items()},
+        ))
+        await session.commit()
+
+    async def get_status(self, session: AsyncSession, intake_id: UUID) -> dict | None:
+        row = await session.get(OrderIntakeRow, intake_id)
+        if row is None:
+            return None
+        return {"id": row.id, "user_id": row.user_id, "status": row.status, "error": row.error}
+
+    async def _take(self, session: AsyncSession, request: IntakeRequest):
+        # Guarded so a row is only ever turned into one order, even where SKIP LOCKED
+        # is unavailable (SQLite) and two workers read the same batch.
+        result = await session.execute(
+            update(OrderIntakeRow)
+            .where(OrderIntakeRow.id == request.id, OrderIntakeRow.status == "queued")
+            .values(status="completed", updated_at=datetime.utcnow())
+            .execution_options(synchronize_session=False)
+        )
+        if not result.rowcount:
+            raise _AlreadyTaken()
+
+    async def _record_failure(self, session: AsyncSession, request: IntakeRequest, error: str):
+        await session.execute(
+            update(OrderIntakeRow)
+            .where(OrderIntakeRow.id == request.id, OrderIntakeRow.status == "queued")
+            .values(status="failed", error=error, updated_at=datetime.utcnow())
+            .execution_options(synchronize_session=False)
+        )
+
+    async def _run(self):
+        while True:
+            try:
+                async with AsyncSession(engine, expire_on_commit=False) as session:
+                    rows = (await session.exec(
+                        select(OrderIntakeRow)
+                        .where(OrderIntakeRow.status == "queued")
+                        .order_by(OrderIntakeRow.created_at)
+                        .limit(self.batch_size)
+                        .with_for_update(skip_locked=True)
+                    )).all()
+                    if rows:
+                        await self._create_orders(session, [
+                            IntakeRequest(
+                                id=row.id,
+                                user_id=row.user_id,
+                                quantities={UUID(product_id): quantity for product_id, quantity in row.items.items()},
+                            )
+                            for row in rows
+                        ])
+            except Exception:
+                # The batch is rolled back and stays queued for the next poll.
+                logger.exception("Order intake batch failed")
+                rows = None
+            if not rows:
+                await asyncio.sleep(self.poll_interval)
+
+
+def build_order_intake() -> OrderIntake | None:
+    if settings.order_intake_mode == "memory":
+        return MemoryOrderIntake(
+            settings.order_intake_workers, settings.order_intake_batch_size,
+            settings.order_intake_queue_limit, settings.order_intake_result_ttl,
+        )
+    if settings.order_intake_mode == "database":
+        return DatabaseOrderIntake(
+            settings.order_intake_workers, settings.order_intake_batch_size,
+            settings.order_intake_poll_interval,
+        )
+    return None
+
+
+# None in "sync" mode, where POST /orders creates the order in the request.
+order_intake = build_order_intake()
@@ -1,78 +1,232 @@
 from datetime import datetime
 from decimal import Decimal
 from uuid import UUID
-from sqlmodel import Session, select
+from sqlalchemy import update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import joinedload, selectinload
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
 from fastapi import HTTPException, status
-from app.schemas.order_schema import CreateOrderRequest, OrderResponse, UpdateOrderStatusRequest
-from app.models import Order, Product, OrderStatus, OrderProduct
+from app.schemas.order_schema import BulkUpdateOrderStatusResponse, CreateOrderRequest, OrderResponse, UpdateOrderStatusRequest
+from app.models import Order, Product, OrderProduct
+from app.services.inventory_service import InventoryService
+from app.services.order_status_service import status_cache
+from app.services.report_service import SalesRollups
+from app.utils.pagination import keyset_page
 
 class OrderService:
-    def _init_(self, session: Session):
+    def __init__(self, session: AsyncSession):
         self.session = session
 
-    def get_orders_by_user(self, user_id: UUID):
-        orders = self.session.exec(select(Order).where(Order.user_id == user_id)).all()
-        return orders
+    @staticmethod
+    def _user_orders_query(user_id: UUID, created_from: datetime | None, created_to: datetime | None):
+        # Two queries per page whatever its size: orders joined to their status, then
+        # every line of those orders in one SELECT ... IN.
+        if created_from and created_to and created_from > created_to:
+            raise HTTPException(status_code=400, detail="created_from must not be after created_to")
+        statement = (
+            select(Order)
+            .where(Order.user_id == user_id)
+            .options(joinedload(Order.status), selectinload(Order.order_products))
+        )
+        if created_from:
+            statement = statement.where(Order.created_at >= created_from)
+        if created_to:
+            statement = statement.where(Order.created_at < created_to)
+        return statement
 
+    async def get_orders_by_user(self, user_id: UUID, skip: int = 0, limit: int = 50,
+                                 created_from: datetime | None = None,
+                                 created_to: datetime | None = None) -> list[OrderResponse]:
+        statement = self._user_orders_query(user_id, created_from, created_to)
+        orders = (await self.session.exec(
+            statement.order_by(Order.created_at, Order.id).offset(skip).limit(limit)
+        )).all()
+        return [self._to_response(order) for order in orders]
 
-    def create_order(self, order_data: CreateOrderRequest, user_id: UUID) -> OrderResponse:
-        total_price = Decimal(0.0)
-        order_products_data = []
+    async def get_orders_by_user_page(self, user_id: UUID, limit: int = 50, cursor: str | None = None,
+                                      created_from: datetime | None = None,
+                                      created_to: datetime | None = None) -> tuple[list[OrderResponse], str | None]:
+        statement = self._user_orders_query(user_id, created_from, created_to)
+        orders, next_cursor = await keyset_page(
+            self.session, statement, Order.created_at, Order.id, limit, cursor
+        )
+        return [self._to_response(order) for order in orders], next_cursor
+
+    async def _load_order(self, order_id: UUID, with_status: bool = True, for_update: bool = False) -> Order | None:
+        # Relationships must be loaded eagerly: lazy loads are not allowed on an AsyncSession.
+        options = [selectinload(Order.order_products)]
+        if with_status:
+            options.append(selectinload(Order.status))
+        statement = select(Order).where(Order.id == order_id).options(*options)
+        if for_update:
+            # Status changes and cancellations read the old status to adjust the rollups.
+            statement = statement.with_for_update()
+        return (await self.session.exec(statement)).first()
+
+    async def _status_id(self, name: str) -> UUID:
+        status_id = await status_cache.get_id(self.session, name)
+        if status_id is None:
+            raise HTTPException(status_code=500, detail=f"Order status '{name}' is not configured")
+        return status_id
+
+    async def _commit(self):
+        try:
+            await self.session.commit()
+        except IntegrityError:
+            # Most likely a status id cached here after another process deleted that status.
+            await self.session.rollback()
+            status_cache.invalidate()
+            raise HTTPException(status_code=409, detail="The order changed concurrently, retry the request")
+
+    @staticmethod
+    def _to_response(order: Order, status_name: str | None = None) -> OrderResponse:
+        if status_name is None:
+            status_name = order.status.name if order.status else ""
+        return OrderResponse(
+            id=order.id,
+            user_id=order.user_id,
+            status=status_name,
+            total_price=order.total_price,
+            created_at=order.created_at,
+            updated_at=order.updated_at,
+            products=[
+                {"product_id": op.product_id, "quantity": op.quantity}
+                for op in order.order_products
+            ],
+        )
 
+    @staticmethod
+    def cart_quantities(order_data: CreateOrderRequest) -> dict[UUID, int]:
+        quantities: dict[UUID, int] = {}
         for item in order_data.products:
-            product = self.session.get(Product, item.product_id)
+            quantities[item.product_id] = quantities.get(item.product_id, 0) + item.quantity
+        return quantities
+
+    async def price_cart(self, quantities: dict[UUID, int]) -> tuple[dict[UUID, Product], Decimal]:
+        """Load the cart's products and check them; returns them by id and the order total."""
+        # Plain read: the conditional decrements in InventoryService are what guarantee
+        # stock, so no product row is locked until it is actually written.
+        products = (await self.session.exec(
+            select(Product).where(Product.id.in_(quantities))
+        )).all()
+        products_by_id = {product.id: product for product in products}
+
+        total_price = Decimal(0.0)
+        for product_id, quantity in quantities.items():
+            product = products_by_id.get(product_id)
             if not product or not product.is_available:
                 raise HTTPException(status_code=404, detail="Product not found or unavailable")
-            if item.quantity > product.stock:
+            # Sharded products keep their live stock in buckets; the decrement checks it.
+            if not product.stock_buckets and quantity > product.stock:
                 raise HTTPException(status_code=400, detail="Not enough stock for the product")
-            
-            product.stock -= item.quantity
-            total_price += product.price * item.quantity
-            order_products_data.append(OrderProduct(product_id=product.id, quantity=item.quantity))
-
-        pending_status = self.session.exec(select(OrderStatus).where(OrderStatus.name == "pending")).first()
-        new_order = Order(user_id=user_id, status_id=pending_status.id, total_price=total_price)
-        
-        self.session.add(new_order)
-        self.session.commit()
-        self.session.refresh(new_order)
+            total_price += product.price * quantity
+        return products_by_id, total_price
 
-        for op in order_products_data:
-            op.order_id = new_order.id
-            self.session.add(op)
-        self.session.commit()
+    async def place_order(self, quantities: dict[UUID, int], user_id: UUID, order_id: UUID | None = None) -> Order:
+        """Write the order, its lines, the stock decrements and rollups without committing.
 
+        On failure the caller must roll back (or release its savepoint), since some of
+        those writes may already have been made.
+        """
+        products_by_id, total_price = await self.price_cart(quantities)
+
+        pending_status_id = await self._status_id("pending")
+        new_order = Order(user_id=user_id, status_id=pending_status_id, total_price=total_price)
+        if order_id is not None:
+            new_order.id = order_id
+        new_order.order_products = [
+            OrderProduct(product_id=product_id, quantity=quantity)
+            for product_id, quantity in quantities.items()
+        ]
+        self.session.add(new_order)
+        await self.session.flush()
+
+        # Contended rows (stock, rollups) are written last so their locks are held only
+        # for the few statements before the commit.
+        if not await InventoryService(self.session).reserve(products_by_id, quantities):
+            raise HTTPException(status_code=400, detail="Not enough stock for the product")
+        await SalesRollups(self.session).order_created(new_order, quantities)
         return new_order
 
-    def get_order_by_id(self, order_id: UUID, user_id: UUID) -> OrderResponse:
-        order = self.session.get(Order, order_id)
+    async def create_order(self, order_data: CreateOrderRequest, user_id: UUID) -> OrderResponse:
+        try:
+            new_order = await self.place_order(self.cart_quantities(order_data), user_id)
+            await self._commit()
+        except Exception:
+            await self.session.rollback()
+            raise
+        return self._to_response(new_order, "pending")
+
+    async def get_order_by_id(self, order_id: UUID, user_id: UUID) -> OrderResponse:
+        order = await self._load_order(order_id)
         if not order or order.user_id != user_id:
             raise HTTPException(status_code=404, detail="Order not found")
-        return order
+        return self._to_response(order)
 
-    def update_order_status(self, order_id: UUID, new_status: str) -> OrderResponse:
-        order = self.session.get(Order, order_id)
+    async def update_order_status(self, order_id: UUID, new_status: str) -> OrderResponse:
+        order = await self._load_order(order_id, with_status=False, for_update=True)
         if not order:
             raise HTTPException(status_code=404, detail="Order not found")
 
-        valid_status = self.session.exec(select(OrderStatus).where(OrderStatus.name == new_status)).first()
-        if not valid_status:
+        status_id = await status_cache.get_id(self.session, new_status)
+        if not status_id:
             raise HTTPException(status_code=400, detail="Invalid status")
 
-        order.status_id = valid_status.id
+        await SalesRollups(self.session).orders_moved([order], status_id)
+        order.status_id = status_id
         order.updated_at = datetime.utcnow()
-        self.session.commit()
-        self.session.refresh(order)
-        return order
+        await self._commit()
+        return self._to_response(order, new_status)
+
+    async def bulk_update_order_status(self, order_ids: list[UUID], new_status: str) -> BulkUpdateOrderStatusResponse:
+        status_id = await status_cache.get_id(self.session, new_status)
+        if not status_id:
+            raise HTTPException(status_code=400, detail="Invalid status")
+
+        order_ids = list(dict.fromkeys(order_ids))
+        # The previous statuses are needed to move the orders between rollup rows, so
+        # read (and lock) them first; the change itself is still a single UPDATE.
+        current = (await self.session.exec(
+            select(Order.id, Order.status_id, Order.created_at, Order.total_price)
+            .where(Order.id.in_(order_ids))
+            .order_by(Order.id)
+            .with_for_update()
+        )).all()
+        moved = [order for order in current if order.status_id != status_id]
+        if moved:
+            await self.session.execute(
+                update(Order)
+                .where(Order.id.in_([order.id for order in moved]))
+                .values(status_id=status_id, updated_at=datetime.utcnow())
+                .execution_options(synchronize_session=False)
+            )
+            await SalesRollups(self.session).orders_moved(moved, status_id)
+        await self._commit()
+
+        results = {order.id: "unchanged" for order in current}
+        results.update((order.id, "updated") for order in moved)
+        return BulkUpdateOrderStatusResponse(
+            status=new_status,
+            updated=len(moved),
+            unchanged=len(current) - len(moved),
+            not_found=len(order_ids) - len(current),
+            results=[
+                {"order_id": order_id, "result": results.get(order_id, "not_found")}
+                for order_id in order_ids
+            ],
+        )
 
-    def cancel_order(self, order_id: UUID, user_id: UUID):
-        order = self.session.get(Order, order_id)
+    async def cancel_order(self, order_id: UUID, user_id: UUID):
+        order = await self._load_order(order_id, with_status=False, for_update=True)
         if not order or order.user_id != user_id:
             raise HTTPException(status_code=404, detail="Order not found")
 
-        pending_status = self.session.exec(select(OrderStatus).where(OrderStatus.name == "pending")).first()
-        if order.status_id != pending_status.id:
+        if order.status_id != await self._status_id("pending"):
             raise HTTPException(status_code=400, detail="Only pending orders can be canceled")
 
-        self.session.delete(order)
-        self.session.commit()
\ No newline at end of file
+        await SalesRollups(self.session).order_cancelled(order)
+        for op in order.order_products:
+            await self.session.delete(op)
+        await self.session.delete(order)
+        await self.session.commit()
@@ -1,57 +1,112 @@
-from sqlmodel import Session, select
+import time
+from sqlalchemy import func
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
 from uuid import UUID
 from datetime import datetime
 from app.models import OrderStatus, Order
 from fastapi import HTTPException
 
 from app.schemas.order_status_schema import OrderStatusCreate, OrderStatusUpdate
+from app.settings import Settings
+
+settings = Settings.get_instance()
+
+
+class OrderStatusCache:
+    """Process-local name <-> id lookup for the small, rarely changing order_status table.
+
+    Loaded at startup and kept current by OrderStatusService. Statuses written by
+    another process are picked up by reloading on a lookup miss, and renames or
+    deletions there by reloading once the table is ``max_age`` seconds old.
+    """
+
+    def __init__(self, max_age: float):
+        self.max_age = max_age
+        self._ids_by_name: dict[str, UUID] = {}
+        self._names_by_id: dict[UUID, str] = {}
+        self._loaded_at: float | None = None
+
+    async def load(self, session: AsyncSession):
+        statuses = (await session.exec(select(OrderStatus))).all()
+        self._ids_by_name = {status.name: status.id for status in statuses}
+        self._names_by_id = {status.id: status.name for status in statuses}
+        self._loaded_at = time.monotonic()
+
+    async def get_id(self, session: AsyncSession, name: str) -> UUID | None:
+        stale = self._loaded_at is None or time.monotonic() - self._loaded_at >= self.max_age
+        if stale or name not in self._ids_by_name:
+            await self.load(session)
+        return self._ids_by_name.get(name)
+
+    def set(self, status: OrderStatus):
+        self.remove(status.id)
+        self._ids_by_name[status.name] = status.id
+        self._names_by_id[status.id] = status.name
+
+    def remove(self, status_id: UUID):
+        name = self._names_by_id.pop(status_id, None)
+        if name is not None:
+            self._ids_by_name.pop(name, None)
+
+    def invalidate(self):
+        self._loaded_at = None
+
+
+status_cache = OrderStatusCache(settings.order_status_cache_ttl)
+
 
 class OrderStatusService:
     
     @staticmethod
-    def create_status(session: Session, order_status_data: OrderStatusCreate) -> OrderStatus:
-        existing_status = session.exec(select(OrderStatus).where(OrderStatus.name == order_status_data.name)).first()
+    async def create_status(session: AsyncSession, order_status_data: OrderStatusCreate) -> OrderStatus:
+        existing_status = (await session.exec(select(OrderStatus).where(OrderStatus.name == order_status_data.name))).first()
         if existing_status:
             raise HTTPException(status_code=400, detail="Status name must be unique")
 
         new_status = OrderStatus(name=order_status_data.name, created_at=datetime.utcnow())
         session.add(new_status)
-        session.commit()
-        session.refresh(new_status)
+        await session.commit()
+        await session.refresh(new_status)
+        status_cache.set(new_status)
         return new_status
 
     @staticmethod
-    def get_status(session: Session, status_id: UUID) -> OrderStatus:
-        status = session.get(OrderStatus, status_id)
+    async def get_status(session: AsyncSession, status_id: UUID) -> OrderStatus:
+        status = await session.get(OrderStatus, status_id)
         if not status:
             raise HTTPException(status_code=404, detail="Status not found")
         return status
 
     @staticmethod
-    def update_status(session: Session, status_id: UUID, order_status_data: OrderStatusUpdate) -> OrderStatus:
-        status = session.get(OrderStatus, status_id)
+    async def update_status(session: AsyncSession, status_id: UUID, order_status_data: OrderStatusUpdate) -> OrderStatus:
+        status = await session.get(OrderStatus, status_id)
         if not status:
             raise HTTPException(status_code=404, detail="Status not found")
 
-        existing_status = session.exec(select(OrderStatus).where(OrderStatus.name == order_status_data.name)).first()
+        existing_status = (await session.exec(select(OrderStatus).where(OrderStatus.name == order_status_data.name))).first()
         if existing_status and existing_status.id != status_id:
             raise HTTPException(status_code=400, detail="Status name must be unique")
 
         status.name = order_status_data.name
         status.updated_at = datetime.utcnow()
-        session.commit()
-        session.refresh(status)
+        await session.commit()
+        await session.refresh(status)
+        status_cache.set(status)
         return status
 
     @staticmethod
-    def remove_status(session: Session, status_id: UUID):
-        status = session.get(OrderStatus, status_id)
+    async def remove_status(session: AsyncSession, status_id: UUID):
+        status = await session.get(OrderStatus, status_id)
         if not status:
             raise HTTPException(status_code=404, detail="Status not found")
 
-        related_orders = session.exec(select(Order).where(Order.status_id == status_id)).count()
+        related_orders = (await session.exec(
+            select(func.count()).select_from(Order).where(Order.status_id == status_id)
+        )).one()
         if related_orders > 0:
             raise HTTPException(status_code=400, detail="Cannot delete status in use by orders")
 
-        session.delete(status)
-        session.commit()
\ No newline at end of file
+        await session.delete(status)
+        await session.commit()
+        status_cache.remove(status_id)
@@ -1,55 +1,277 @@
+import csv
+import io
+import json
 from datetime import datetime
+from typing import BinaryIO, Iterator
 from uuid import UUID, uuid4
-from sqlmodel import Session
+from pydantic import ValidationError
+from sqlalchemy import delete, func, insert, or_
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
 from fastapi import HTTPException, status
-from app.schemas.product_schema import CreateProductRequest, Product, UpdateProductRequest
+from app.models import Product, ProductStockBucket
+from app.schemas.product_schema import CreateProductRequest, UpdateProductRequest
+from app.services.inventory_service import InventoryService
+from app.settings import Settings
+from app.services.search_index import SEARCH_CONFIG, product_search_index, search_document, tokenize
+from app.utils.pagination import keyset_page
+
+
+settings = Settings.get_instance()
+
+
+def _is_utf8(value: str) -> bool:
+    # Undecodable bytes survive as lone surrogates (errors="surrogateescape").
+    try:
+        value.encode("utf-8")
+    except UnicodeEncodeError:
+        return False
+    return True
+
+
+def iter_import_rows(file: BinaryIO, fmt: str) -> Iterator[tuple[int, dict | str]]:
+    """Yield (row number, record) from an NDJSON or CSV upload, one row at a time.
+
+    Rows that cannot be parsed (bad JSON, malformed CSV, more CSV fields than the header,
+    invalid UTF-8) are yielded as an error message instead of a record, so one bad row
+    never fails the whole upload.
+    """
+    text = io.TextIOWrapper(file, encoding="utf-8-sig", errors="surrogateescape", newline="")
+    try:
+        if fmt == "csv":
+            yield from _iter_csv_rows(text)
+            return
+        for number, line in enumerate(text, start=1):
+            if not line.strip():
+                continue
+            if not _is_utf8(line):
+                yield number, "Invalid UTF-8"
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                yield number, f"Invalid JSON: {e}"
+                continue
+            yield number, record if isinstance(record, dict) else "Expected a JSON object"
+    finally:
+        text.detach()
+
+
+def _iter_csv_rows(text: io.TextIOWrapper) -> Iterator[tuple[int, dict | str]]:
+    reader = csv.DictReader(text)
+    number = 0
+    while True:
+        try:
+            record = next(reader)
+        except StopIteration:
+            return
+        except csv.Error as e:
+            # The reader resumes at the next line.
+            number += 1
+            yield number, f"Invalid CSV: {e}"
+            continue
+        number += 1
+        if None in record:
+            yield number, "More fields than the header"
+        elif not all(_is_utf8(value) for value in (*record, *record.values()) if value is not None):
+            yield number, "Invalid UTF-8"
+        else:
+            yield number, {key: (value if value != "" else None) for key, value in record.items()}
+
 
 class ProductService:
-    def __init__(self, session: Session):
+    def __init__(self, session: AsyncSession):
         self.session = session
 
-    def create_product(self, product_data: CreateProductRequest) -> Product:
-        existing_product = self.session.query(Product).filter(
-            Product.name.ilike(product_data.name)
-        ).first()
+    async def create_product(self, product_data: CreateProductRequest) -> Product:
+        existing_product = (await self.session.exec(
+            select(Product).where(func.lower(Product.name) == product_data.name.lower())
+        )).first()
         
         if existing_product:
             raise HTTPException(status_code=400, detail="Product already exists")
 
-        new_product = Product(**product_data.dict(), created_at=datetime.now())
+        new_product = Product(**product_data.dict(), created_at=datetime.utcnow())
         self.session.add(new_product)
-        self.session.commit()
-        self.session.refresh(new_product)
+        await self.session.commit()
+        await self.session.refresh(new_product)
+        product_search_index.add(new_product.id, new_product.name, new_product.description)
         return new_product
 
-    def get_all_products(self, skip: int = 0, limit: int = 10) -> list[Product]:
-        products = self.session.query(Product).offset(skip).limit(limit).all()
-        return products
+    async def get_all_products(self, skip: int = 0, limit: int = 10) -> list[Product]:
+        products = (await self.session.exec(select(Product).offset(skip).limit(limit))).all()
+        return await InventoryService(self.session).with_live_stock(products)
+
+    async def get_products_page(self, limit: int = 10, cursor: str | None = None) -> tuple[list[Product], str | None]:
+        products, next_cursor = await keyset_page(
+            self.session, select(Product), Product.created_at, Product.id, limit, cursor
+        )
+        return await InventoryService(self.session).with_live_stock(products), next_cursor
 
-    def get_product_by_id(self, product_id: UUID) -> Product:
-        product = self.session.query(Product).get(product_id)
+    async def get_product_by_id(self, product_id: UUID) -> Product:
+        product = await self.session.get(Product, product_id)
         if not product:
             raise HTTPException(status_code=404, detail="Product not found")
+        await InventoryService(self.session).with_live_stock([product])
         return product
 
-    def update_product(self, product_id: UUID, updated_data: UpdateProductRequest) -> Product:
-        product = self.get_product_by_id(product_id)
+    async def update_product(self, product_id: UUID, updated_data: UpdateProductRequest) -> Product:
+        product = await self.get_product_by_id(product_id)
         if not product:
             raise HTTPException(status_code=404, detail="Product not found")
 
         update_data = updated_data.dict(exclude_unset=True)
+        if "stock" in update_data and product.stock_buckets:
+            raise HTTPException(
+                status_code=409,
+                detail="Stock of this product is sharded; redistribute it through /admin/products/{id}/stock-buckets",
+            )
         for key, value in update_data.items():
             setattr(product, key, value)
-        product.updated_at = datetime.now()
+        product.updated_at = datetime.utcnow()
 
-        self.session.commit()
-        self.session.refresh(product)
+        await self.session.commit()
+        await self.session.refresh(product)
+        await InventoryService(self.session).with_live_stock([product])
+        product_search_index.add(product.id, product.name, product.description)
         return product
 
-    def delete_product(self, product_id: UUID):
-        product = self.get_product_by_id(product_id)
+    async def delete_product(self, product_id: UUID):
+        product = await self.get_product_by_id(product_id)
         if not product:
             raise HTTPException(status_code=404, detail="Product not found")
         
-        self.session.delete(product)
-        self.session.commit()
+        if product.stock_buckets:
+            await self.session.execute(
+                delete(ProductStockBucket).where(ProductStockBucket.product_id == product_id)
+            )
+        await self.session.delete(product)
+        await self.session.commit()
+        product_search_index.remove(product_id)
+
+    async def search_products(
+        self, query: str, mode: str = "fulltext", min_price: float | None = None,
+        max_price: float | None = None, is_available: bool | None = None,
+        skip: int = 0, limit: int = 10,
+    ) -> tuple[list[Product], int]:
+        """Search name and description; returns one page of products and the total match count.
+
+        ``mode`` is "prefix" (words starting with the query words), "substring" (the query
+        anywhere in name or description) or "fulltext" (all query words, ranked).
+        """
+        filters = []
+        if min_price is not None:
+            filters.append(Product.price >= min_price)
+        if max_price is not None:
+            filters.append(Product.price <= max_price)
+        if is_available is not None:
+            filters.append(Product.is_available == is_available)
+
+        if mode == "substring":
+            escaped = query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            pattern = f"%{escaped}%"
+            filters.append(or_(
+                Product.name.ilike(pattern, escape="\\"),
+                Product.description.ilike(pattern, escape="\\"),
+            ))
+            return await self._search_page(filters, [Product.name, Product.id], skip, limit)
+
+        words = tokenize(query)
+        if not words:
+            return [], 0
+        if self.session.bind.dialect.name == "postgresql":
+            if mode == "prefix":
+                ts_query = func.to_tsquery(SEARCH_CONFIG, " & ".join(f"{word}:*" for word in words))
+            else:
+                ts_query = func.websearch_to_tsquery(SEARCH_CONFIG, query)
+            filters.append(search_document().op("@@")(ts_query))
+            rank = func.ts_rank(search_document(), ts_query)
+            return await self._search_page(filters, [rank.desc(), Product.id], skip, limit)
+
+        await product_search_index.ensure_loaded(self.session)
+        ranked_ids = [product_id for product_id, _ in product_search_index.search(query, prefix=mode == "prefix")]
+        if filters and ranked_ids:
+            matching: set[UUID] = set()
+            for start in range(0, len(ranked_ids), 1000):
+                batch = ranked_ids[start:start + 1000]
+                matching.update((await self.session.exec(
+                    select(Product.id).where(Product.id.in_(batch), *filters)
+                )).all())
+            ranked_ids = [product_id for product_id in ranked_ids if product_id in matching]
+        page_ids = ranked_ids[skip:skip + limit]
+        if not page_ids:
+            return [], len(ranked_ids)
+        products = {product.id: product for product in (await self.session.exec(
+            select(Product).where(Product.id.in_(page_ids))
+        )).all()}
+        page = [products[product_id] for product_id in page_ids if product_id in products]
+        return await InventoryService(self.session).with_live_stock(page), len(ranked_ids)
+
+    async def _search_page(self, filters, order_by, skip: int, limit: int) -> tuple[list[Product], int]:
+        total = (await self.session.exec(select(func.count()).select_from(Product).where(*filters))).one()
+        products = (await self.session.exec(
+            select(Product).where(*filters).order_by(*order_by).offset(skip).limit(limit)
+        )).all()
+        return await InventoryService(self.session).with_live_stock(products), total
+
+    async def import_products(self, rows: Iterator[tuple[int, dict | str]]) -> dict:
+        """Insert products from ``rows`` in chunks, reporting every rejected row.
+
+        Each chunk costs one duplicate lookup and one multi-row INSERT, and is committed
+        on its own so a late failure does not roll back rows already imported.
+        """
+        report = {"total_rows": 0, "imported": 0, "failed": 0, "errors": []}
+        seen_names: set[str] = set()
+        chunk: list[tuple[int, CreateProductRequest]] = []
+
+        def reject(number: int, error: str):
+            report["failed"] += 1
+            report["errors"].append({"row": number, "error": error})
+
+        for number, record in rows:
+            report["total_rows"] += 1
+            if isinstance(record, str):
+                reject(number, record)
+                continue
+            try:
+                product = CreateProductRequest(**record)
+            except ValidationError as e:
+                reject(number, "; ".join(f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors()))
+                continue
+            except TypeError as e:
+                # Keys that are not field names at all, e.g. a None key from a ragged row.
+                reject(number, f"Invalid row: {e}")
+                continue
+            name_key = product.name.lower()
+            if name_key in seen_names:
+                reject(number, "Duplicate product name in upload")
+                continue
+            seen_names.add(name_key)
+            chunk.append((number, product))
+            if len(chunk) >= settings.bulk_import_chunk_size:
+                await self._import_chunk(chunk, report, reject)
+                chunk = []
+        if chunk:
+            await self._import_chunk(chunk, report, reject)
+        report["errors"].sort(key=lambda error: error["row"])
+        return report
+
+    async def _import_chunk(self, chunk, report: dict, reject):
+        names = [product.name.lower() for _, product in chunk]
+        existing = set((await self.session.exec(
+            select(func.lower(Product.name)).where(func.lower(Product.name).in_(names))
+        )).all())
+
+        now = datetime.utcnow()
+        values = []
+        for number, product in chunk:
+            if product.name.lower() in existing:
+                reject(number, "Product already exists")
+                continue
+            values.append({"id": uuid4(), "created_at": now, "is_available": True, **product.dict()})
+        if values:
+            await self.session.execute(insert(Product), values)
+            await self.session.commit()
+            report["imported"] += len(values)
+            for value in values:
+                product_search_index.add(value["id"], value["name"], value["description"])
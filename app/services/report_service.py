@@ -0,0 +1,208 @@
+import random
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from typing import Iterable
+from uuid import UUID
+from fastapi import HTTPException
+from sqlalchemy import delete, func, insert, literal, union_all
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.models import DailySales, Order, OrderProduct, OrderStatus, Product, ProductSales
+from app.services.inventory_service import bucket_totals
+from app.settings import Settings
+
+settings = Settings.get_instance()
+
+# Longest revenue report, in days.
+MAX_REPORT_DAYS = 366
+
+DIALECT_INSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+
+def rebuild_daily_statements():
+    """Statements that recompute daily_sales from the order history, into slot 0."""
+    order_day = func.date(Order.created_at)
+    return [
+        delete(DailySales),
+        insert(DailySales).from_select(
+            ["day", "status_id", "slot", "order_count", "revenue"],
+            select(order_day, Order.status_id, literal(0), func.count(), func.sum(Order.total_price))
+            .where(Order.status_id.is_not(None))
+            .group_by(order_day, Order.status_id),
+        ),
+    ]
+
+
+def rebuild_product_statements():
+    """Statements that recompute product_sales from the order history, into slot 0."""
+    return [
+        delete(ProductSales),
+        insert(ProductSales).from_select(
+            ["product_id", "slot", "quantity_sold", "order_count"],
+            select(
+                OrderProduct.product_id, literal(0),
+                func.sum(OrderProduct.quantity), func.count(func.distinct(OrderProduct.order_id)),
+            )
+            .where(OrderProduct.product_id.is_not(None))
+            .group_by(OrderProduct.product_id),
+        ),
+    ]
+
+
+def rebuild_statements():
+    """Statements that recompute both rollups from the order history (used by the backfill migrations)."""
+    return [*rebuild_daily_statements(), *rebuild_product_statements()]
+
+
+class SalesRollups:
+    """Incremental maintenance of the daily_sales and product_sales rollups.
+
+    OrderService calls these inside its own transaction, right before committing, so a
+    rollup change commits or rolls back together with the order change behind it. Each
+    call is one INSERT ... ON CONFLICT DO UPDATE that adds the deltas to the counters.
+    Counters are split over ROLLUP_SLOTS rows and each transaction writes a random slot,
+    so orders placed together do not queue on one row lock until they commit.
+    """
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+        self.slot = random.randrange(settings.rollup_slots)
+
+    async def order_created(self, order: Order, quantities: dict[UUID, int]):
+        await self._add_daily({(order.created_at.date(), order.status_id): (1, order.total_price)})
+        await self._add_products({product_id: (quantity, 1) for product_id, quantity in quantities.items()})
+
+    async def orders_moved(self, orders: Iterable, new_status_id: UUID):
+        """Move orders (rows with status_id, created_at and total_price) to ``new_status_id``."""
+        deltas: dict[tuple[date, UUID], list] = defaultdict(lambda: [0, Decimal(0)])
+        for order in orders:
+            if order.status_id == new_status_id:
+                continue
+            day = order.created_at.date()
+            if order.status_id is not None:
+                deltas[day, order.status_id][0] -= 1
+                deltas[day, order.status_id][1] -= order.total_price
+            deltas[day, new_status_id][0] += 1
+            deltas[day, new_status_id][1] += order.total_price
+        await self._add_daily(deltas)
+
+    async def order_cancelled(self, order: Order):
+        await self._add_daily({(order.created_at.date(), order.status_id): (-1, -order.total_price)})
+        await self._add_products({op.product_id: (-op.quantity, -1) for op in order.order_products})
+
+    async def _add_daily(self, deltas: dict):
+        # Sorted so concurrent transactions lock rollup rows in the same sequence.
+        rows = [
+            {"day": day, "status_id": status_id, "slot": self.slot, "order_count": count, "revenue": revenue}
+            for (day, status_id), (count, revenue) in sorted(deltas.items(), key=lambda item: str(item[0]))
+            if status_id is not None
+        ]
+        await self._upsert_add(DailySales.__table__, ["day", "status_id", "slot"], rows)
+
+    async def _add_products(self, deltas: dict):
+        rows = [
+            {"product_id": product_id, "slot": self.slot, "quantity_sold": quantity, "order_count": count}
+            for product_id, (quantity, count) in sorted(deltas.items(), key=lambda item: str(item[0]))
+            if product_id is not None
+        ]
+        await self._upsert_add(ProductSales.__table__, ["product_id", "slot"], rows)
+
+    async def _upsert_add(self, table, keys: list[str], rows: list[dict]):
+        if not rows:
+            return
+        dialect = self.session.bind.dialect.name
+        if dialect not in DIALECT_INSERTS:
+            raise RuntimeError(f"Sales rollups do not support the {dialect} dialect")
+        statement = DIALECT_INSERTS[dialect](table)
+        statement = statement.on_conflict_do_update(
+            index_elements=keys,
+            set_={name: table.c[name] + statement.excluded[name] for name in rows[0] if name not in keys},
+        )
+        await self.session.execute(statement, rows)
+
+
+class ReportService:
+    """Admin reports, read from the rollups so their cost does not grow with the order history."""
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def revenue_by_day(self, date_from: date | None, date_to: date | None, status: str | None = None):
+        date_to = date_to or datetime.utcnow().date()
+        date_from = date_from or date_to - timedelta(days=29)
+        if date_from > date_to:
+            raise HTTPException(status_code=400, detail="date_from must not be after date_to")
+        if (date_to - date_from).days >= MAX_REPORT_DAYS:
+            raise HTTPException(status_code=400, detail=f"Reports cover at most {MAX_REPORT_DAYS} days")
+
+        daily = (
+            select(
+                DailySales.day, DailySales.status_id,
+                func.sum(DailySales.order_count).label("order_count"),
+                func.sum(DailySales.revenue).label("revenue"),
+            )
+            .where(DailySales.day >= date_from, DailySales.day <= date_to)
+            .group_by(DailySales.day, DailySales.status_id)
+            .subquery()
+        )
+        statement = (
+            select(daily.c.day, OrderStatus.name, daily.c.order_count, daily.c.revenue)
+            .outerjoin(OrderStatus, OrderStatus.id == daily.c.status_id)
+            .where(daily.c.order_count > 0)
+            .order_by(daily.c.day, OrderStatus.name)
+        )
+        if status:
+            statement = statement.where(OrderStatus.name == status)
+        rows = (await self.session.exec(statement)).all()
+        return [
+            {"day": day, "status": name or "", "order_count": count, "revenue": revenue}
+            for day, name, count, revenue in rows
+        ]
+
+    async def top_products(self, limit: int = 10):
+        sales = (
+            select(
+                ProductSales.product_id,
+                func.sum(ProductSales.quantity_sold).label("quantity_sold"),
+                func.sum(ProductSales.order_count).label("order_count"),
+            )
+            .group_by(ProductSales.product_id)
+            .subquery()
+        )
+        rows = (await self.session.exec(
+            select(sales.c.product_id, Product.name, sales.c.quantity_sold, sales.c.order_count)
+            .outerjoin(Product, Product.id == sales.c.product_id)
+            .where(sales.c.quantity_sold > 0)
+            .order_by(sales.c.quantity_sold.desc(), sales.c.product_id)
+            .limit(limit)
+        )).all()
+        return [
+            {"product_id": product_id, "name": name, "quantity_sold": quantity, "order_count": count}
+            for product_id, name, quantity, count in rows
+        ]
+
+    async def low_stock(self, threshold: int = 10, limit: int = 50):
+        # Plain products through the stock index; sharded ones by the sum of their buckets,
+        # since their Product.stock is not decremented.
+        totals = bucket_totals()
+        plain = (
+            select(Product.id, Product.name, Product.stock.label("stock"), Product.is_available)
+            .where(Product.stock_buckets == 0, Product.stock <= threshold)
+        )
+        sharded = (
+            select(Product.id, Product.name, totals.c.stock.label("stock"), Product.is_available)
+            .join(totals, totals.c.product_id == Product.id)
+            .where(Product.stock_buckets > 0, totals.c.stock <= threshold)
+        )
+        low = union_all(plain, sharded).subquery()
+        rows = (await self.session.exec(
+            select(low.c.id, low.c.name, low.c.stock, low.c.is_available)
+            .order_by(low.c.stock, low.c.id)
+            .limit(limit)
+        )).all()
+        return [
+            {"product_id": product_id, "name": name, "stock": stock, "is_available": is_available}
+            for product_id, name, stock, is_available in rows
+        ]
@@ -0,0 +1,134 @@
+import bisect
+import math
+import re
+import time
+from uuid import UUID
+from sqlalchemy import func, literal_column
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.models import Product
+from app.settings import Settings
+
+settings = Settings.get_instance()
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+# Matches in the name count more than matches in the description.
+NAME_WEIGHT = 2
+DESCRIPTION_WEIGHT = 1
+
+
+# Postgres: text search configuration and document expression. Constants are inlined
+# (not bound) so the expression matches ix_products_search_document from app.migrations
+# even under prepared-statement generic plans.
+SEARCH_CONFIG = literal_column("'english'::regconfig")
+
+
+def search_document():
+    return func.to_tsvector(
+        SEARCH_CONFIG,
+        func.coalesce(Product.name, literal_column("''"))
+        + literal_column("' '")
+        + func.coalesce(Product.description, literal_column("''")),
+    )
+
+
+def tokenize(text: str | None) -> list[str]:
+    return TOKEN_PATTERN.findall(text.lower()) if text else []
+
+
+class ProductSearchIndex:
+    """In-process inverted index over product name and description.
+
+    Used for product search when the database has no full-text support (SQLite).
+    Built on first use and kept current by ProductService writes; it is rebuilt
+    after ``max_age`` seconds so changes made by other workers show up eventually.
+    """
+
+    def __init__(self, max_age: float):
+        self.max_age = max_age
+        self._postings: dict[str, dict[UUID, int]] = {}
+        self._terms_by_product: dict[UUID, set[str]] = {}
+        self._vocabulary: list[str] | None = None
+        self._built_at: float | None = None
+
+    @property
+    def loaded(self) -> bool:
+        return self._built_at is not None and time.monotonic() - self._built_at < self.max_age
+
+    async def ensure_loaded(self, session: AsyncSession):
+        if self.loaded:
+            return
+        self._postings, self._terms_by_product, self._vocabulary = {}, {}, None
+        result = await session.stream(
+            select(Product.id, Product.name, Product.description).execution_options(yield_per=1000)
+        )
+        async for product_id, name, description in result:
+            self._add(product_id, name, description)
+        self._built_at = time.monotonic()
+
+    def add(self, product_id: UUID, name: str | None, description: str | None):
+        if self._built_at is None:
+            return
+        self.remove(product_id)
+        self._add(product_id, name, description)
+
+    def remove(self, product_id: UUID):
+        for term in self._terms_by_product.pop(product_id, ()):
+            postings = self._postings[term]
+            postings.pop(product_id, None)
+            if not postings:
+                del self._postings[term]
+                self._vocabulary = None
+
+    def invalidate(self):
+        self._built_at = None
+
+    def _add(self, product_id: UUID, name: str | None, description: str | None):
+        weights: dict[str, int] = {}
+        for term in tokenize(name):
+            weights[term] = weights.get(term, 0) + NAME_WEIGHT
+        for term in tokenize(description):
+            weights[term] = weights.get(term, 0) + DESCRIPTION_WEIGHT
+        for term, weight in weights.items():
+            if term not in self._postings:
+                self._postings[term] = {}
+                self._vocabulary = None
+            self._postings[term][product_id] = weight
+        self._terms_by_product[product_id] = set(weights)
+
+    def _terms_with_prefix(self, prefix: str) -> list[str]:
+        if self._vocabulary is None:
+            self._vocabulary = sorted(self._postings)
+        start = bisect.bisect_left(self._vocabulary, prefix)
+        end = bisect.bisect_left(self._vocabulary, prefix + "\uffff")
+        return self._vocabulary[start:end]
+
+    def search(self, query: str, prefix: bool = False) -> list[tuple[UUID, float]]:
+        """Products matching every query word, best first (tf-idf over weighted terms).
+
+        With ``prefix`` each query word matches any indexed word starting with it.
+        """
+        words = tokenize(query)
+        if not words:
+            return []
+        total = len(self._terms_by_product)
+        scores: dict[UUID, float] | None = None
+        for word in words:
+            terms = self._terms_with_prefix(word) if prefix else ([word] if word in self._postings else [])
+            word_scores: dict[UUID, float] = {}
+            for term in terms:
+                postings = self._postings[term]
+                idf = math.log(1 + total / len(postings))
+                for product_id, weight in postings.items():
+                    word_scores[product_id] = word_scores.get(product_id, 0.0) + weight * idf
+            if scores is None:
+                scores = word_scores
+            else:
+                scores = {pid: score + word_scores[pid] for pid, score in scores.items() if pid in word_scores}
+            if not scores:
+                return []
+        return sorted(scores.items(), key=lambda item: (-item[1], str(item[0])))
+
+
+product_search_index = ProductSearchIndex(settings.search_index_max_age)
@@ -2,47 +2,70 @@ from datetime import datetime
 from typing import List, Optional
 from uuid import UUID, uuid4
 from fastapi import HTTPException , status
-from sqlmodel import Session, select
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
 from app import schemas
 from app import models
 from app.schemas.user_schema import CreateUserResponse, GetUserDetailsResponse, UpdateUserDetailsResponse
-from app.utils.security import get_password_hash
+from app.services.auth_service import principal_cache
+from app.utils.pagination import keyset_page
+from app.utils.security import get_password_hash_async
 
 class UserService:
-    def __init__(self, session: Session):
+    def __init__(self, session: AsyncSession):
         self.session = session
 
-    def user_has_active_orders(self, user_id: UUID) -> bool:
-        return self.session.exec(select(models.Order).where(models.Order.user_id == user_id, models.Order.status == 'active')).first() is not None
+    async def user_has_active_orders(self, user_id: UUID) -> bool:
+        return (await self.session.exec(
+            select(models.Order)
+            .join(models.OrderStatus)
+            .where(models.Order.user_id == user_id, models.OrderStatus.name == 'active')
+        )).first() is not None
     
 
-    def delete_user(self, user: models.User):
-        self.session.delete(user)
-        self.session.commit()
+    async def delete_user(self, user: models.User):
+        db_user = await self.session.get(models.User, user.id)
+        await self.session.delete(db_user)
+        await self.session.commit()
+        principal_cache.invalidate(user.id)
 
 
-    def check_email_exists(self, email: str) -> bool:
-        existing_user = self.session.exec(select(models.User).where(models.User.email == email)).first()
+    async def check_email_exists(self, email: str) -> bool:
+        existing_user = (await self.session.exec(select(models.User).where(models.User.email == email))).first()
         return existing_user is not None
 
-    def get_users(self, skip: int = 0, limit: int = 10) -> List[GetUserDetailsResponse]:
+    async def get_users(self, skip: int = 0, limit: int = 10) -> List[GetUserDetailsResponse]:
+        return [GetUserDetailsResponse.from_orm(user) for user in await self.get_user_rows(skip, limit)]
+
+    async def get_users_page(self, limit: int = 10, cursor: str | None = None) -> tuple[List[GetUserDetailsResponse], str | None]:
+        users, next_cursor = await self.get_user_rows_page(limit, cursor)
+        return [GetUserDetailsResponse.from_orm(user) for user in users], next_cursor
+
+    # Row variants for the orjson fast path, which serializes the ORM objects directly.
+    async def get_user_rows(self, skip: int = 0, limit: int = 10) -> List[models.User]:
         if skip < 0 or limit <= 0:
             raise HTTPException(status_code=400, detail="Invalid pagination parameters")
-        users = self.db.exec(select(models.User).offset(skip).limit(limit)).all()
-        return [GetUserDetailsResponse.from_orm(user) for user in users]
+        return (await self.session.exec(select(models.User).offset(skip).limit(limit))).all()
 
-    def get_user_by_id(self, id: UUID) -> GetUserDetailsResponse:
-            user = self.session.exec(select(models.User).where(models.User.id == id)).first()
+    async def get_user_rows_page(self, limit: int = 10, cursor: str | None = None) -> tuple[List[models.User], str | None]:
+        if limit <= 0:
+            raise HTTPException(status_code=400, detail="Invalid pagination parameters")
+        return await keyset_page(
+            self.session, select(models.User), models.User.created_at, models.User.id, limit, cursor
+        )
+
+    async def get_user_by_id(self, id: UUID) -> GetUserDetailsResponse:
+            user = (await self.session.exec(select(models.User).where(models.User.id == id))).first()
             if user  is None :
                 raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
             return GetUserDetailsResponse.from_orm(user)
     
-    def create_user(self, user: schemas.CreateUserRequest) -> CreateUserResponse:
-        if self.check_email_exists(user.email):
+    async def create_user(self, user: schemas.CreateUserRequest) -> CreateUserResponse:
+        if await self.check_email_exists(user.email):
                   raise HTTPException(
                     status_code=status.HTTP_409_CONFLICT,
                     detail="Email already registered")
-        hashed_password = get_password_hash(user.password)
+        hashed_password = await get_password_hash_async(user.password)
         print("hashed_password is :",hashed_password)
         db_user = models.User(id=uuid4(),
                             username=user.username,
@@ -53,33 +76,39 @@ class UserService:
                             created_at=datetime.now(),
                             updated_at=None,)  
         self.session.add(db_user)
-        self.session.commit()
-        self.session.refresh(db_user)
+        await self.session.commit()
+        await self.session.refresh(db_user)
         return CreateUserResponse.from_orm(db_user)
     
-    def update_user(self, user_id: UUID, user: schemas.UpdateUserRequest) -> UpdateUserDetailsResponse:
-        db_user = self.session.get(models.User, user_id)
+    async def update_user(self, user_id: UUID, user: schemas.UpdateUserRequest) -> UpdateUserDetailsResponse:
+        db_user = await self.session.get(models.User, user_id)
         if db_user:        
             if user.username:
                db_user.username = user.username
             if user.email:
-                if self.check_email_exists(user.email):
+                if await self.check_email_exists(user.email):
                   raise HTTPException(
                     status_code=status.HTTP_409_CONFLICT,
                     detail="Email already registered")
                 db_user.email = user.email
             if user.password:
-                hashed_password = get_password_hash(user.password)
-                db_user.password = hashed_password
+                hashed_password = await get_password_hash_async(user.password)
+                db_user.hashed_password = hashed_password
             db_user.updated_at = datetime.now() 
-            self.session.commit()
-            self.session.refresh(db_user)
+            await self.session.commit()
+            await self.session.refresh(db_user)
+            principal_cache.invalidate(user_id)
             return UpdateUserDetailsResponse.from_orm(db_user)
         else :
             raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
                     detail="user not found")
-            
-
 
-   
+    async def change_user_role(self, user_id: UUID, is_admin: bool):
+        db_user = await self.session.get(models.User, user_id)
+        if db_user is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+        db_user.is_admin = is_admin
+        db_user.updated_at = datetime.now()
+        await self.session.commit()
+        principal_cache.invalidate(user_id)
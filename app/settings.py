@@ -1,4 +1,4 @@
-from typing import ClassVar
+from typing import ClassVar, Literal, Optional
 from dotenv import load_dotenv
 from pydantic import Field
 from pydantic_settings import BaseSettings
@@ -10,6 +10,95 @@ class Settings(BaseSettings):
     access_token_expire_minutes: int = Field(30, env="ACCESS_TOKEN_EXPIRE_MINUTES")
     database_url: str = Field(..., env="DATABASE_URL")
 
+    # Connection pool (ignored for in-memory SQLite, which uses a single static connection)
+    db_pool_size: int = Field(5, env="DB_POOL_SIZE")
+    db_max_overflow: int = Field(10, env="DB_MAX_OVERFLOW")
+    db_pool_timeout: float = Field(30.0, env="DB_POOL_TIMEOUT")
+    db_pool_recycle: int = Field(1800, env="DB_POOL_RECYCLE")
+    db_pool_pre_ping: bool = Field(True, env="DB_POOL_PRE_PING")
+
+    # Optional read replica for GET endpoints (same URL forms as DATABASE_URL). A client's
+    # reads stay on the primary for replica_sticky_seconds after it writes, so replica lag
+    # never hides its own changes; a replica that fails to connect is skipped for
+    # replica_retry_seconds
+    read_replica_url: Optional[str] = Field(None, env="READ_REPLICA_URL")
+    replica_sticky_seconds: float = Field(5.0, env="REPLICA_STICKY_SECONDS")
+    replica_retry_seconds: float = Field(30.0, env="REPLICA_RETRY_SECONDS")
+
+    # Schema handling at startup: "auto" reads the schema_version stamp and migrates only
+    # when it is behind; "check" refuses to start on an outdated schema (migrations run
+    # separately with python -m app.migrations); "migrate" always runs the migration pass
+    db_startup_mode: Literal["auto", "check", "migrate"] = Field("auto", env="DB_STARTUP_MODE")
+
+    # bcrypt runs on a bounded thread pool; requests beyond workers + queue limit get a 503
+    password_hash_workers: int = Field(4, env="PASSWORD_HASH_WORKERS")
+    password_hash_queue_limit: int = Field(64, env="PASSWORD_HASH_QUEUE_LIMIT")
+
+    # Login throttling: token buckets per username and per client IP (burst, then
+    # refill per minute), how many keys are tracked, and concurrent bcrypt verifications
+    login_username_burst: int = Field(5, env="LOGIN_USERNAME_BURST")
+    login_username_per_minute: float = Field(5.0, env="LOGIN_USERNAME_PER_MINUTE")
+    login_ip_burst: int = Field(20, env="LOGIN_IP_BURST")
+    login_ip_per_minute: float = Field(30.0, env="LOGIN_IP_PER_MINUTE")
+    login_limiter_max_keys: int = Field(100000, env="LOGIN_LIMITER_MAX_KEYS")
+    login_max_concurrent_verifications: int = Field(8, env="LOGIN_MAX_CONCURRENT_VERIFICATIONS")
+    # Reverse proxies in front of the app that append the client address to
+    # forwarded_for_header; 0 keys the IP limit by the socket peer
+    trusted_proxy_count: int = Field(0, env="TRUSTED_PROXY_COUNT")
+    forwarded_for_header: str = Field("X-Forwarded-For", env="FORWARDED_FOR_HEADER")
+
+    # Authenticated users cached by id in get_current_user; 0 disables the cache
+    principal_cache_size: int = Field(10000, env="PRINCIPAL_CACHE_SIZE")
+    principal_cache_ttl: float = Field(60.0, env="PRINCIPAL_CACHE_TTL")
+
+    # Seconds before the cached order status table is reloaded, bounding how long a
+    # status renamed or deleted by another process can still resolve here
+    order_status_cache_ttl: float = Field(30.0, env="ORDER_STATUS_CACHE_TTL")
+
+    # Rows each sales rollup counter is split across; every order transaction writes one
+    # random slot, so concurrent orders rarely wait on the same counter row
+    rollup_slots: int = Field(16, env="ROLLUP_SLOTS")
+
+    # Rows validated, de-duplicated and inserted per transaction by the bulk product import
+    bulk_import_chunk_size: int = Field(1000, env="BULK_IMPORT_CHUNK_SIZE")
+
+    # Seconds before the in-process product search index (SQLite only) is rebuilt
+    search_index_max_age: float = Field(300.0, env="SEARCH_INDEX_MAX_AGE")
+
+    # Cache-Control sent with the ETag / Last-Modified of public catalog reads
+    catalog_cache_control: str = Field("public, max-age=30", env="CATALOG_CACHE_CONTROL")
+
+    # Serialize large listings directly with orjson instead of response_model validation
+    fast_json_responses: bool = Field(False, env="FAST_JSON_RESPONSES")
+
+    # Idempotency-Key results for POST /orders: how long and how many are kept, and how
+    # long a duplicate waits for the in-flight request before getting a 409
+    idempotency_ttl: float = Field(86400.0, env="IDEMPOTENCY_TTL")
+    idempotency_max_keys: int = Field(100000, env="IDEMPOTENCY_MAX_KEYS")
+    idempotency_wait_timeout: float = Field(10.0, env="IDEMPOTENCY_WAIT_TIMEOUT")
+
+    # POST /orders intake: "sync" creates the order in the request; "memory" or
+    # "database" queue it and answer 202 while background workers create orders in
+    # batches, committing up to order_intake_batch_size orders per transaction
+    order_intake_mode: Literal["sync", "memory", "database"] = Field("sync", env="ORDER_INTAKE_MODE")
+    order_intake_workers: int = Field(2, env="ORDER_INTAKE_WORKERS")
+    order_intake_batch_size: int = Field(50, env="ORDER_INTAKE_BATCH_SIZE")
+    # In-memory queue capacity (503 when full) and how long results stay pollable
+    order_intake_queue_limit: int = Field(10000, env="ORDER_INTAKE_QUEUE_LIMIT")
+    order_intake_result_ttl: float = Field(3600.0, env="ORDER_INTAKE_RESULT_TTL")
+    # Seconds between polls of an empty database queue
+    order_intake_poll_interval: float = Field(0.2, env="ORDER_INTAKE_POLL_INTERVAL")
+
+    # Request, query and pool metrics collected in-process and served at GET /metrics
+    metrics_enabled: bool = Field(True, env="METRICS_ENABLED")
+
+    # SQL profiling: statements slower than slow_query_ms are logged (0 disables);
+    # sql_profiling records every statement per request, adds X-Query-Count /
+    # X-Query-Time-Ms headers and logs statements repeated n_plus_one_threshold times
+    slow_query_ms: float = Field(500.0, env="SLOW_QUERY_MS")
+    sql_profiling: bool = Field(False, env="SQL_PROFILING")
+    n_plus_one_threshold: int = Field(5, env="N_PLUS_ONE_THRESHOLD")
+
     class Config:
         env_file = ".env"
 
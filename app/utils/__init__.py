@@ -1 +0,0 @@
-from app.utils.security import create_access_token ,get_password_hash,verify_password
\ No newline at end of file
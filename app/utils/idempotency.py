@@ -0,0 +1,133 @@
+import asyncio
+import hashlib
+import json
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable
+from fastapi import HTTPException, status
+from app.settings import Settings
+from app.utils.cache import TTLCache
+
+settings = Settings.get_instance()
+
+
+@dataclass(frozen=True)
+class StoredResponse:
+    status_code: int
+    body: Any  # JSON-compatible content
+    fingerprint: str  # hash of the request payload the key was first used with
+
+
+def fingerprint(payload: Any) -> str:
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+
+
+class IdempotencyBackend(ABC):
+    """Storage for idempotency keys: finished responses plus a claim on keys in flight.
+
+    A shared backend (Redis, a database table) makes keys work across workers; the
+    in-memory one only deduplicates retries that reach the same process.
+    """
+
+    @abstractmethod
+    async def get(self, key: str) -> StoredResponse | None:
+        """The stored response for ``key``, if the request has completed."""
+
+    @abstractmethod
+    async def claim(self, key: str) -> bool:
+        """Mark ``key`` as in flight; False if another request already holds it."""
+
+    @abstractmethod
+    async def complete(self, key: str, response: StoredResponse):
+        """Store the response and release the claim."""
+
+    @abstractmethod
+    async def release(self, key: str):
+        """Drop the claim without storing anything, so the request can be retried."""
+
+    @abstractmethod
+    async def wait(self, key: str, timeout: float) -> bool:
+        """Wait until ``key`` is no longer in flight; False on timeout."""
+
+
+class InMemoryIdempotencyBackend(IdempotencyBackend):
+    def __init__(self, maxsize: int, ttl: float):
+        self._responses = TTLCache(maxsize, ttl)
+        self._in_flight: dict[str, asyncio.Event] = {}
+
+    async def get(self, key: str) -> StoredResponse | None:
+        return self._responses.get(key)
+
+    async def claim(self, key: str) -> bool:
+        if key in self._in_flight:
+            return False
+        self._in_flight[key] = asyncio.Event()
+        return True
+
+    async def complete(self, key: str, response: StoredResponse):
+        self._responses.set(key, response)
+        await self.release(key)
+
+    async def release(self, key: str):
+        event = self._in_flight.pop(key, None)
+        if event is not None:
+            event.set()
+
+    async def wait(self, key: str, timeout: float) -> bool:
+        event = self._in_flight.get(key)
+        if event is None:
+            return True
+        try:
+            await asyncio.wait_for(event.wait(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        return True
+
+
+class IdempotencyStore:
+    """Runs a request at most once per key and replays its response afterwards.
+
+    Only successful results are stored: if the call raises, the claim is released and
+    the next request with the same key runs it again.
+    """
+
+    def __init__(self, backend: IdempotencyBackend, wait_timeout: float):
+        self.backend = backend
+        self.wait_timeout = wait_timeout
+
+    async def run(self, key: str, request_fingerprint: str, call: Callable[[], Awaitable[Any]],
+                  status_code: int = 200) -> tuple[StoredResponse, bool]:
+        """Return the response for ``key`` and whether it was replayed from the store."""
+        while True:
+            stored = await self.backend.get(key)
+            if stored is not None:
+                if stored.fingerprint != request_fingerprint:
+                    raise HTTPException(
+                        status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                        detail="Idempotency-Key was already used with a different request body",
+                    )
+                return stored, True
+            if await self.backend.claim(key):
+                break
+            # A duplicate is in flight: wait for its result instead of racing it.
+            if not await self.backend.wait(key, self.wait_timeout):
+                raise HTTPException(
+                    status_code=status.HTTP_409_CONFLICT,
+                    detail="A request with this Idempotency-Key is still being processed",
+                    headers={"Retry-After": "1"},
+                )
+
+        try:
+            body = await call()
+        except BaseException:
+            await self.backend.release(key)
+            raise
+        stored = StoredResponse(status_code, body, request_fingerprint)
+        await self.backend.complete(key, stored)
+        return stored, False
+
+
+idempotency_store = IdempotencyStore(
+    InMemoryIdempotencyBackend(settings.idempotency_max_keys, settings.idempotency_ttl),
+    settings.idempotency_wait_timeout,
+)
@@ -0,0 +1,184 @@
+"""In-process request and database metrics, exposed in the Prometheus text format.
+
+Everything here is updated from the event loop thread only (the async DB driver
+runs its events there too), so plain dicts and counters are enough: no locks on
+the request path.
+"""
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from dataclasses import dataclass
+from app.utils.query_timing import on_query
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+
+class Histogram:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: tuple):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+@dataclass
+class RequestDbStats:
+    queries: int = 0
+    seconds: float = 0.0
+
+
+# Database work done by the request being handled in the current context.
+current_db_stats: ContextVar[RequestDbStats | None] = ContextVar("current_db_stats", default=None)
+
+
+class Metrics:
+    def __init__(self):
+        self.in_flight = 0
+        self.latency: dict[tuple[str, str], Histogram] = {}
+        self.responses: dict[tuple[str, str, int], int] = {}
+        self.db_queries: dict[tuple[str, str], Histogram] = {}
+        self.db_seconds: dict[tuple[str, str], Histogram] = {}
+        self.db_queries_total = 0
+        self.db_seconds_total = 0.0
+
+    def observe_request(self, method: str, route: str, status: int, seconds: float, db: RequestDbStats):
+        key = (method, route)
+        latency = self.latency.get(key)
+        if latency is None:
+            latency = self.latency[key] = Histogram(LATENCY_BUCKETS)
+            self.db_queries[key] = Histogram(QUERY_COUNT_BUCKETS)
+            self.db_seconds[key] = Histogram(LATENCY_BUCKETS)
+        latency.observe(seconds)
+        self.db_queries[key].observe(db.queries)
+        self.db_seconds[key].observe(db.seconds)
+        status_key = (method, route, status)
+        self.responses[status_key] = self.responses.get(status_key, 0) + 1
+
+
+metrics = Metrics()
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware timing every HTTP request.
+
+    Requests are labelled with the matched route template (``/products/{product_id}``),
+    never the raw path, so the number of series stays bounded; unmatched paths share
+    the "unmatched" label.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+        db_stats = RequestDbStats()
+        token = current_db_stats.set(db_stats)
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        metrics.in_flight += 1
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            metrics.in_flight -= 1
+            current_db_stats.reset(token)
+            route = scope.get("route")
+            metrics.observe_request(
+                scope["method"], getattr(route, "path", "unmatched"), status_code, elapsed, db_stats
+            )
+
+
+def _record_query(statement: str, elapsed: float):
+    metrics.db_queries_total += 1
+    metrics.db_seconds_total += elapsed
+    stats = current_db_stats.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.seconds += elapsed
+
+
+def instrument_engine(sync_engine):
+    """Count and time every statement run on ``sync_engine`` (an AsyncEngine's ``.sync_engine``)."""
+    on_query(sync_engine, _record_query)
+
+
+def _labels(**labels) -> str:
+    escaped = (f'{name}="{str(value).replace(chr(92), chr(92) * 2).replace(chr(34), chr(92) + chr(34))}"'
+               for name, value in labels.items())
+    return "{" + ",".join(escaped) + "}"
+
+
+def _histogram_lines(name: str, histograms: dict, label_names: tuple) -> list[str]:
+    lines = []
+    for key, histogram in sorted(histograms.items()):
+        labels = dict(zip(label_names, key))
+        cumulative = 0
+        for bound, count in zip(histogram.buckets + ("+Inf",), histogram.counts):
+            cumulative += count
+            lines.append(f"{name}_bucket{_labels(**labels, le=bound)} {cumulative}")
+        lines.append(f"{name}_sum{_labels(**labels)} {histogram.sum}")
+        lines.append(f"{name}_count{_labels(**labels)} {histogram.count}")
+    return lines
+
+
+def render_metrics(pool_stats, pool_status: dict) -> str:
+    """Prometheus text exposition (format 0.0.4) of the request, query and pool metrics."""
+    route_labels = ("method", "route")
+    lines = [
+        "# HELP http_requests_in_flight Requests currently being handled.",
+        "# TYPE http_requests_in_flight gauge",
+        f"http_requests_in_flight {metrics.in_flight}",
+        "# HELP http_request_duration_seconds Request latency by route.",
+        "# TYPE http_request_duration_seconds histogram",
+        *_histogram_lines("http_request_duration_seconds", metrics.latency, route_labels),
+        "# HELP http_responses_total Responses by route and status code.",
+        "# TYPE http_responses_total counter",
+        *(f"http_responses_total{_labels(method=method, route=route, status=status)} {count}"
+          for (method, route, status), count in sorted(metrics.responses.items())),
+        "# HELP http_request_db_queries Database statements run per request, by route.",
+        "# TYPE http_request_db_queries histogram",
+        *_histogram_lines("http_request_db_queries", metrics.db_queries, route_labels),
+        "# HELP http_request_db_seconds Time spent in database statements per request, by route.",
+        "# TYPE http_request_db_seconds histogram",
+        *_histogram_lines("http_request_db_seconds", metrics.db_seconds, route_labels),
+        "# HELP db_queries_total Database statements run, including outside requests.",
+        "# TYPE db_queries_total counter",
+        f"db_queries_total {metrics.db_queries_total}",
+        "# HELP db_query_seconds_total Time spent in database statements.",
+        "# TYPE db_query_seconds_total counter",
+        f"db_query_seconds_total {metrics.db_seconds_total}",
+        "# HELP db_pool_checkouts_total Connections checked out of the pool.",
+        "# TYPE db_pool_checkouts_total counter",
+        f"db_pool_checkouts_total {pool_stats.checkouts}",
+        "# HELP db_pool_checkout_wait_seconds_total Time spent waiting for a pooled connection.",
+        "# TYPE db_pool_checkout_wait_seconds_total counter",
+        f"db_pool_checkout_wait_seconds_total {pool_stats.total_wait_seconds}",
+        "# HELP db_pool_checkout_wait_seconds_max Longest wait for a pooled connection.",
+        "# TYPE db_pool_checkout_wait_seconds_max gauge",
+        f"db_pool_checkout_wait_seconds_max {pool_stats.max_wait_seconds}",
+        "# HELP db_pool_checkout_timeouts_total Checkouts that gave up after the pool timeout.",
+        "# TYPE db_pool_checkout_timeouts_total counter",
+        f"db_pool_checkout_timeouts_total {pool_stats.checkout_timeouts}",
+    ]
+    for name in ("checked_out", "checked_in", "overflow", "size"):
+        if pool_status.get(name) is not None:
+            lines += [f"# TYPE db_pool_{name} gauge", f"db_pool_{name} {pool_status[name]}"]
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,45 @@
+import base64
+import json
+from datetime import datetime
+from uuid import UUID
+from fastapi import HTTPException, status
+from sqlalchemy import and_, or_
+
+
+def encode_cursor(created_at: datetime, id: UUID) -> str:
+    raw = json.dumps([created_at.isoformat(), str(id)], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, UUID]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, id = json.loads(raw)
+        return datetime.fromisoformat(created_at), UUID(id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+
+def after_cursor(created_at_column, id_column, cursor: str):
+    """WHERE clause selecting rows strictly after ``cursor`` in (created_at, id) order."""
+    created_at, id = decode_cursor(cursor)
+    return or_(
+        created_at_column > created_at,
+        and_(created_at_column == created_at, id_column > id),
+    )
+
+
+async def keyset_page(session, statement, created_at_column, id_column, limit: int, cursor: str | None):
+    """Run ``statement`` ordered by (created_at, id) and return one page plus the cursor for the next."""
+    if cursor:
+        statement = statement.where(after_cursor(created_at_column, id_column, cursor))
+    rows = (await session.exec(
+        statement.order_by(created_at_column, id_column).limit(limit + 1)
+    )).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        # An empty page (limit 0) has no last row to continue from.
+        if rows:
+            next_cursor = encode_cursor(rows[-1].created_at, rows[-1].id)
+    return rows, next_cursor
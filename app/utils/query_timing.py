@@ -0,0 +1,45 @@
+"""Statement timing shared by the metrics and the SQL profiler.
+
+``on_query`` hooks an engine's cursor events once and calls every subscribed
+listener with each finished statement and how long it ran, so the metrics and
+the profiler time a statement once between them.
+"""
+import time
+from typing import Callable
+from weakref import WeakKeyDictionary
+from sqlalchemy import event
+
+QueryListener = Callable[[str, float], None]
+
+_listeners: "WeakKeyDictionary[object, list[QueryListener]]" = WeakKeyDictionary()
+
+
+def on_query(sync_engine, listener: QueryListener):
+    """Call ``listener(statement, seconds)`` after every statement run on ``sync_engine``
+    (an AsyncEngine's ``.sync_engine``); subscribing the same listener twice is a no-op."""
+    listeners = _listeners.get(sync_engine)
+    if listeners is None:
+        listeners = _listeners[sync_engine] = []
+        _time_statements(sync_engine, listeners)
+    if listener not in listeners:
+        listeners.append(listener)
+
+
+def _time_statements(sync_engine, listeners: list[QueryListener]):
+    # A connection runs one statement at a time, so a single start time per connection is
+    # enough; a failed statement never reaches after_cursor_execute and drops it in handle_error.
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info["query_started"] = time.perf_counter()
+
+    def handle_error(exception_context):
+        if exception_context.connection is not None:
+            exception_context.connection.info.pop("query_started", None)
+
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info.pop("query_started")
+        for listener in listeners:
+            listener(statement, elapsed)
+
+    event.listen(sync_engine, "before_cursor_execute", before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", after_cursor_execute)
+    event.listen(sync_engine, "handle_error", handle_error)
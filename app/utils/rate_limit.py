@@ -0,0 +1,91 @@
+import math
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Hashable, Iterator
+from fastapi import HTTPException, Request, status
+
+
+def too_many_requests(retry_after: float, detail: str) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail=detail,
+        headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+    )
+
+
+def client_address(request: Request, forwarded_for_header: str, trusted_proxies: int) -> str:
+    """The client's IP: the socket peer, or behind ``trusted_proxies`` reverse proxies the
+    address the outermost of them recorded in ``forwarded_for_header``.
+
+    Each proxy appends the address it got the request from, so only the last
+    ``trusted_proxies`` entries are trustworthy; anything left of them was sent by the
+    client. With fewer entries than proxies the request bypassed some of them, and the
+    peer address is used.
+    """
+    peer = request.client.host if request.client else "unknown"
+    if trusted_proxies <= 0:
+        return peer
+    hops = [
+        hop.strip() for value in request.headers.getlist(forwarded_for_header)
+        for hop in value.split(",") if hop.strip()
+    ]
+    return hops[-trusted_proxies] if len(hops) >= trusted_proxies else peer
+
+
+class TokenBucketLimiter:
+    """Token buckets per key: ``burst`` requests at once, refilled at ``per_minute``.
+
+    State is one (tokens, timestamp) tuple per key in an LRU bounded to ``maxsize``
+    keys. A bucket left alone long enough to refill completely is dropped, since
+    it behaves exactly like a missing one. Event loop only, so no locks.
+    """
+
+    def __init__(self, burst: int, per_minute: float, maxsize: int):
+        self.burst = burst
+        self.rate = per_minute / 60.0
+        self.maxsize = maxsize
+        self._buckets: OrderedDict[Hashable, tuple[float, float]] = OrderedDict()
+        self._refill_seconds = burst / self.rate if self.rate else math.inf
+
+    def acquire(self, key: Hashable) -> float:
+        """Take a token for ``key``: 0 if allowed, else the seconds until one is available."""
+        now = time.monotonic()
+        tokens, updated = self._buckets.pop(key, (self.burst, now))
+        tokens = min(self.burst, tokens + (now - updated) * self.rate)
+        if tokens < 1:
+            self._buckets[key] = (tokens, now)
+            return (1 - tokens) / self.rate if self.rate else math.inf
+        self._buckets[key] = (tokens - 1, now)
+        self._evict(now)
+        return 0.0
+
+    def _evict(self, now: float):
+        # Oldest first: drop buckets that have refilled, then anything over maxsize.
+        while self._buckets:
+            key, (_, updated) = next(iter(self._buckets.items()))
+            if now - updated < self._refill_seconds and len(self._buckets) <= self.maxsize:
+                break
+            del self._buckets[key]
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+
+class ConcurrencyCap:
+    """Caps how many callers may be inside ``slot()`` at once; the rest get a 429."""
+
+    def __init__(self, limit: int, detail: str):
+        self.limit = limit
+        self.detail = detail
+        self.active = 0
+
+    @contextmanager
+    def slot(self) -> Iterator[None]:
+        if self.active >= self.limit:
+            raise too_many_requests(1, self.detail)
+        self.active += 1
+        try:
+            yield
+        finally:
+            self.active -= 1
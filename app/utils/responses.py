@@ -0,0 +1,59 @@
+from decimal import Decimal
+from operator import attrgetter
+from typing import Any, Callable, Iterable
+import orjson
+from fastapi import Response
+
+
+def _default(value):
+    if isinstance(value, Decimal):
+        return str(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+class FastJSONAdapter:
+    """Serializes rows (ORM objects or pydantic models) straight to JSON with orjson.
+
+    This is the opt-in fast path for large listings (``FAST_JSON_RESPONSES``): it skips
+    the per-field re-validation FastAPI does for ``response_model`` and the stdlib json
+    encoder. The adapter must emit exactly what the route's response model would, so
+    build one per response model: ``fields`` maps output keys to row attributes,
+    ``converters`` coerce values whose JSON form depends on the model's field type
+    (a Decimal column declared ``float``) and ``constants`` cover fields the model
+    always defaults. Decimals left unconverted are written as strings, like pydantic.
+    """
+
+    def __init__(self, fields: dict[str, str], converters: dict[str, Callable] | None = None,
+                 constants: dict[str, Any] | None = None):
+        self._keys = tuple(fields)
+        self._getter = attrgetter(*fields.values())
+        self._converters = converters or {}
+        self._constants = constants or {}
+
+    def dump_row(self, row) -> dict:
+        values = self._getter(row)
+        if len(self._keys) == 1:
+            values = (values,)
+        record = dict(zip(self._keys, values))
+        for key, convert in self._converters.items():
+            if record[key] is not None:
+                record[key] = convert(record[key])
+        if self._constants:
+            record.update(self._constants)
+        return record
+
+    def dump_rows(self, rows: Iterable) -> list[dict]:
+        return [self.dump_row(row) for row in rows]
+
+    def response(self, rows: Iterable, envelope: dict[str, Any] | None = None,
+                 status_code: int = 200, headers: dict | None = None) -> Response:
+        """JSON response with the rows as a list, or under "items" when ``envelope`` is given."""
+        payload: Any = self.dump_rows(rows)
+        if envelope is not None:
+            payload = {"items": payload, **envelope}
+        return Response(
+            content=orjson.dumps(payload, default=_default),
+            status_code=status_code,
+            media_type="application/json",
+            headers=headers,
+        )
@@ -0,0 +1,172 @@
+"""Per-request SQL capture: timings, N+1 detection and the slow-query log.
+
+``profile_engine`` subscribes to the engine's statement timings (``query_timing``).
+Every statement slower than ``SLOW_QUERY_MS`` is logged; when a QueryProfile is
+active in the current context (set per request by SqlProfilerMiddleware, or by
+``assert_max_queries`` in tests) the statement is also recorded there. Statements are grouped by their normalized
+SQL (literals and placeholders replaced, IN lists collapsed), and a SELECT shape
+repeated ``N_PLUS_ONE_THRESHOLD`` times or more in one request is reported as a
+likely N+1: one query per row of an earlier result instead of one joined or
+selectin load.
+"""
+import logging
+import re
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from app.settings import Settings
+from app.utils.query_timing import on_query
+
+settings = Settings.get_instance()
+logger = logging.getLogger(__name__)
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER = re.compile(r"\$\d+|%\(\w+\)s|%s|(?<!:):\w+|\?")
+_IN_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_sql(statement: str) -> str:
+    """The shape of a statement: the same query with different parameters normalizes the same."""
+    statement = _STRING.sub("?", statement)
+    statement = _PLACEHOLDER.sub("?", statement)
+    statement = _NUMBER.sub("?", statement)
+    statement = _IN_LIST.sub("(...)", statement)
+    return _WHITESPACE.sub(" ", statement).strip()
+
+
+@dataclass
+class QueryRecord:
+    statement: str
+    seconds: float
+
+
+@dataclass
+class QueryGroup:
+    sql: str
+    count: int = 0
+    seconds: float = 0.0
+
+
+@dataclass
+class QueryProfile:
+    queries: list[QueryRecord] = field(default_factory=list)
+    # Profile that was active when this one started; it sees these statements too.
+    parent: "QueryProfile | None" = None
+
+    def record(self, query: QueryRecord):
+        profile = self
+        while profile is not None:
+            profile.queries.append(query)
+            profile = profile.parent
+
+    @property
+    def count(self) -> int:
+        return len(self.queries)
+
+    @property
+    def seconds(self) -> float:
+        return sum(query.seconds for query in self.queries)
+
+    def groups(self) -> list[QueryGroup]:
+        """Statements grouped by normalized SQL, most frequent first."""
+        groups: dict[str, QueryGroup] = {}
+        for query in self.queries:
+            sql = normalize_sql(query.statement)
+            group = groups.get(sql)
+            if group is None:
+                group = groups[sql] = QueryGroup(sql)
+            group.count += 1
+            group.seconds += query.seconds
+        return sorted(groups.values(), key=lambda group: (-group.count, -group.seconds))
+
+    def n_plus_one_suspects(self, threshold: int | None = None) -> list[QueryGroup]:
+        threshold = threshold or settings.n_plus_one_threshold
+        return [
+            group for group in self.groups()
+            if group.count >= threshold and group.sql.lstrip("( ").upper().startswith("SELECT")
+        ]
+
+    def report(self) -> str:
+        lines = [f"{self.count} queries in {self.seconds * 1000:.2f} ms"]
+        lines += [f"  {group.count:>4}x {group.seconds * 1000:>8.2f} ms  {group.sql}" for group in self.groups()]
+        return "\n".join(lines)
+
+
+current_profile: ContextVar[QueryProfile | None] = ContextVar("current_query_profile", default=None)
+
+
+def _record_query(statement: str, elapsed: float):
+    profile = current_profile.get()
+    if profile is not None:
+        profile.record(QueryRecord(statement, elapsed))
+    if settings.slow_query_ms and elapsed * 1000 >= settings.slow_query_ms:
+        logger.warning("Slow query (%.1f ms): %s", elapsed * 1000, _WHITESPACE.sub(" ", statement))
+
+
+def profile_engine(sync_engine):
+    """Hook the profiler into ``sync_engine`` (an AsyncEngine's ``.sync_engine``); safe to call twice."""
+    on_query(sync_engine, _record_query)
+
+
+class SqlProfilerMiddleware:
+    """Profiles each HTTP request: adds X-Query-Count and X-Query-Time-Ms to the response
+    (statements run before the response starts) and logs N+1 suspects once it is done."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        profile = QueryProfile(parent=current_profile.get())
+        token = current_profile.set(profile)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = [
+                    *message.get("headers", []),
+                    (b"x-query-count", str(profile.count).encode()),
+                    (b"x-query-time-ms", f"{profile.seconds * 1000:.2f}".encode()),
+                ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            current_profile.reset(token)
+            for group in profile.n_plus_one_suspects():
+                logger.warning(
+                    "Possible N+1 on %s %s: %d queries of the same shape (%.1f ms): %s",
+                    scope["method"], scope["path"], group.count, group.seconds * 1000, group.sql,
+                )
+
+
+@contextmanager
+def assert_max_queries(max_queries: int, allow_n_plus_one: bool = False):
+    """Fail with the grouped statements when the block runs more than ``max_queries``
+    statements (or, unless allowed, has an N+1 suspect). Works in sync and async tests:
+
+        with assert_max_queries(3):
+            response = await client.get(f"/api/v1/users/{user_id}/orders")
+    """
+    from app.database import engine
+
+    profile_engine(engine.sync_engine)
+    profile = QueryProfile(parent=current_profile.get())
+    token = current_profile.set(profile)
+    try:
+        yield profile
+    finally:
+        current_profile.reset(token)
+    if profile.count > max_queries:
+        raise AssertionError(f"Expected at most {max_queries} queries, got {profile.report()}")
+    suspects = profile.n_plus_one_suspects()
+    if suspects and not allow_n_plus_one:
+        raise AssertionError(
+            "Possible N+1: " + "; ".join(f"{group.count}x {group.sql}" for group in suspects)
+            + f"\n{profile.report()}"
+        )
@@ -0,0 +1,61 @@
+"""Product load throughput: one POST per product vs the bulk import endpoint.
+
+    python -m benchmarks.bench_bulk_import --rows 20000 --single 300
+"""
+import argparse
+import asyncio
+import time
+
+from benchmarks.common import asgi_client, configure_env
+
+configure_env("bench_bulk_import")
+
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.database import engine
+from app.main import app
+from app.models import User
+from app.utils.security import get_password_hash
+
+
+async def admin_headers(client) -> dict:
+    async with AsyncSession(engine) as session:
+        session.add(User(username="bench-admin", email="bench-admin@example.com",
+                         hashed_password=get_password_hash("Bench!pass1"), is_admin=True))
+        await session.commit()
+    response = await client.post("/login/", data={"username": "bench-admin", "password": "Bench!pass1"})
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+def build_csv(rows: int, prefix: str) -> bytes:
+    lines = ["name,description,price,stock"]
+    lines += [f"{prefix}-{i},imported product {i},{i % 100 + 0.99},{i % 50}" for i in range(rows)]
+    return ("\n".join(lines) + "\n").encode()
+
+
+async def main(args):
+    async with app.router.lifespan_context(app):
+        async with asgi_client(app) as client:
+            headers = await admin_headers(client)
+
+            started = time.perf_counter()
+            for i in range(args.single):
+                await client.post("/products/products", headers=headers,
+                                  json={"name": f"single-{i}", "price": 1.5, "stock": 10})
+            elapsed = time.perf_counter() - started
+            print(f"{'POST /products (one per row)':<32} {args.single:>7} rows  {args.single / elapsed:>10.1f} rows/s")
+
+            payload = build_csv(args.rows, "bulk")
+            started = time.perf_counter()
+            response = await client.post("/admin/import/products", headers=headers,
+                                         files={"file": ("products.csv", payload, "text/csv")})
+            elapsed = time.perf_counter() - started
+            imported = response.json()["imported"]
+            print(f"{'POST /admin/import/products':<32} {imported:>7} rows  {imported / elapsed:>10.1f} rows/s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--single", type=int, default=300)
+    asyncio.run(main(parser.parse_args()))
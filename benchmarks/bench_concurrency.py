@@ -0,0 +1,102 @@
+"""Concurrent-request throughput: blocking Session vs AsyncSession.
+
+Both variants serve the same ``async def`` product listing; "sync" uses a
+plain ``Session`` on a ``create_engine`` engine (how every route worked
+before the async port), "async" uses the app's ``get_session`` dependency.
+``--query-delay-ms`` adds server-side latency to every request via a
+``bench_sleep()`` SQL function, standing in for a slow query or a network
+round trip.
+
+    python -m benchmarks.bench_concurrency --requests 400 --concurrency 50 --query-delay-ms 5
+"""
+import argparse
+import asyncio
+import time
+
+from benchmarks.common import asgi_client, configure_env, run_concurrent, summarize
+
+configure_env("bench_concurrency")
+
+from fastapi import Depends, FastAPI
+from sqlalchemy import event, text
+from sqlmodel import Session, create_engine, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.database import engine, get_session, init_db, settings
+from app.models import Product
+from app.services.product_services import ProductService
+
+
+def _sleep_ms(ms):
+    time.sleep(ms / 1000)
+    return 1
+
+
+def _register_sleep(dbapi_connection, connection_record):
+    if hasattr(dbapi_connection, "create_function"):
+        dbapi_connection.create_function("bench_sleep", 1, _sleep_ms)
+
+
+def build_apps(delay_ms: int):
+    sync_engine = create_engine(settings.database_url)
+    event.listen(sync_engine, "connect", _register_sleep)
+    event.listen(engine.sync_engine, "connect", _register_sleep)
+    delay = text("SELECT bench_sleep(:ms)").bindparams(ms=delay_ms)
+
+    sync_app = FastAPI()
+
+    @sync_app.get("/products")
+    async def sync_products():
+        with Session(sync_engine) as session:
+            if delay_ms:
+                session.exec(delay)
+            session.exec(select(Product).offset(0).limit(10)).all()
+        return {"ok": True}
+
+    async_app = FastAPI()
+
+    @async_app.get("/products")
+    async def async_products(session: AsyncSession = Depends(get_session)):
+        if delay_ms:
+            await session.exec(delay)
+        await ProductService(session).get_all_products(0, 10)
+        return {"ok": True}
+
+    return sync_engine, sync_app, async_app
+
+
+async def seed(count: int):
+    await init_db()
+    async with AsyncSession(engine) as session:
+        for i in range(count):
+            session.add(Product(name=f"product-{i}", price=10, stock=100))
+        await session.commit()
+    # Pooled connections opened so far predate the "connect" listener that registers
+    # bench_sleep(); drop them so every connection the runs use has the function.
+    await engine.dispose()
+
+
+async def main(args):
+    await seed(args.products)
+    sync_engine, sync_app, async_app = build_apps(args.query_delay_ms)
+    try:
+        for label, app in (("sync Session (before)", sync_app), ("AsyncSession (after)", async_app)):
+            async with asgi_client(app, "http://bench") as client:
+                await client.get("/products")
+                latencies, elapsed = await run_concurrent(
+                    lambda: client.get("/products"), args.requests, args.concurrency
+                )
+            summarize(label, latencies, elapsed)
+    finally:
+        # Open aiosqlite connections keep non-daemon threads alive and would hang the exit.
+        sync_engine.dispose()
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--products", type=int, default=200)
+    parser.add_argument("--query-delay-ms", type=int, default=5)
+    asyncio.run(main(parser.parse_args()))
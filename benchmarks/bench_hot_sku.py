@@ -0,0 +1,106 @@
+"""Orders per second when every order buys the same product.
+
+Runs the same burst of concurrent POST /orders against one product, first with
+its stock in the product row (atomic conditional decrement) and then split into
+--buckets stock buckets, and checks no unit was oversold. Row contention only
+shows on a database with row-level locks; point DATABASE_URL at Postgres for
+meaningful numbers (SQLite serializes all writers either way). On Postgres the
+number of backends waiting on a row or transaction lock is sampled every 10 ms,
+which shows queueing even when the in-process client is the throughput limit.
+Compare with ROLLUP_SLOTS=1 to see the sales rollup rows contend.
+
+    DATABASE_URL=postgresql://... python -m benchmarks.bench_hot_sku --orders 2000 --concurrency 50
+"""
+import argparse
+import asyncio
+
+from benchmarks.common import asgi_client, configure_env, run_concurrent, summarize
+
+configure_env("bench_hot_sku")
+
+from sqlalchemy import select, text
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.database import engine
+from app.main import app
+from app.models import OrderStatus, Product, User
+from app.services.inventory_service import InventoryService
+from app.utils.security import create_access_token
+
+
+async def seed(stock: int) -> tuple[str, Product]:
+    async with AsyncSession(engine, expire_on_commit=False) as session:
+        user = User(username="hot-buyer", email="hot@example.com", hashed_password="x")
+        product = Product(name="hot product", price=10, stock=stock)
+        session.add_all([user, product])
+        if not (await session.exec(select(OrderStatus).where(OrderStatus.name == "pending"))).first():
+            session.add(OrderStatus(name="pending"))
+        await session.commit()
+        return create_access_token({"sub": str(user.id)}), product
+
+
+async def inventory(product_id) -> dict:
+    async with AsyncSession(engine) as session:
+        return await InventoryService(session).get_inventory(product_id)
+
+
+LOCK_WAITS = text(
+    "SELECT count(*) FROM pg_stat_activity WHERE datname = current_database() AND wait_event_type = 'Lock'"
+)
+
+
+async def sample_lock_waits(samples: list[int]):
+    async with engine.connect() as conn:
+        while True:
+            samples.append((await conn.execute(LOCK_WAITS)).scalar())
+            await asyncio.sleep(0.01)
+
+
+async def measure(client, product, args, label) -> dict:
+    body = {"products": [{"product_id": str(product.id), "quantity": 1}]}
+    failures = 0
+
+    async def order():
+        nonlocal failures
+        response = await client.post("/orders/orders/", json=body)
+        if response.status_code != 201:
+            failures += 1
+
+    samples: list[int] = []
+    sampler = None
+    if engine.dialect.name == "postgresql":
+        sampler = asyncio.create_task(sample_lock_waits(samples))
+    try:
+        latencies, elapsed = await run_concurrent(order, args.orders, args.concurrency)
+    finally:
+        if sampler is not None:
+            sampler.cancel()
+            await asyncio.gather(sampler, return_exceptions=True)
+    result = summarize(label, latencies, elapsed)
+    left = (await inventory(product.id))["stock"]
+    sold = args.orders - failures
+    assert left == args.stock - sold, f"stock {left} after {sold} orders"
+    waits = f", {sum(samples) / len(samples):.1f} backends waiting on locks on average" if samples else ""
+    print(f"{'':<32} {failures} rejected, {left} left{waits}")
+    return result
+
+
+async def main(args):
+    async with app.router.lifespan_context(app):
+        token, product = await seed(args.stock)
+        async with asgi_client(app) as client:
+            client.headers["Authorization"] = f"Bearer {token}"
+            await measure(client, product, args, "stock in product row")
+
+            async with AsyncSession(engine) as session:
+                args.stock = (await InventoryService(session).set_stock_buckets(product.id, args.buckets))["stock"]
+            await measure(client, product, args, f"stock in {args.buckets} buckets")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--orders", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--stock", type=int, default=1_000_000)
+    parser.add_argument("--buckets", type=int, default=16)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,77 @@
+"""p99 latency of GET /products while a login storm is running.
+
+"inline" verifies bcrypt hashes on the event loop (the previous behaviour);
+"offloaded" uses the bounded hashing pool in app.utils.security.
+
+    python -m benchmarks.bench_login_storm --logins 64 --login-concurrency 16 --reads 300
+"""
+import argparse
+import asyncio
+import os
+
+from benchmarks.common import asgi_client, configure_env, run_concurrent, summarize
+
+configure_env("bench_login_storm")
+# The storm comes from one client for one user: lift the login rate limits so every
+# attempt reaches bcrypt.
+for name in ("LOGIN_USERNAME_BURST", "LOGIN_IP_BURST", "LOGIN_MAX_CONCURRENT_VERIFICATIONS"):
+    os.environ.setdefault(name, "1000000")
+
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.database import engine
+from app.main import app
+from app.models import Product, User
+from app.services import auth_service
+from app.utils import security
+
+PASSWORD = "Bench!pass1"
+
+
+async def seed():
+    async with AsyncSession(engine) as session:
+        session.add(User(username="storm", email="storm@example.com",
+                         hashed_password=security.get_password_hash(PASSWORD)))
+        for i in range(50):
+            session.add(Product(name=f"product-{i}", price=10, stock=100))
+        await session.commit()
+
+
+async def inline_verify(plain_password, hashed_password):
+    return security.verify_password(plain_password, hashed_password)
+
+
+async def measure(client, args, label):
+    async def login():
+        await client.post("/login/", data={"username": "storm", "password": PASSWORD})
+
+    async def browse():
+        await client.get("/products/products")
+
+    storm = asyncio.create_task(run_concurrent(login, args.logins, args.login_concurrency))
+    await asyncio.sleep(0.05)
+    latencies, elapsed = await run_concurrent(browse, args.reads, args.read_concurrency)
+    await storm
+    return summarize(f"GET /products, {label}", latencies, elapsed)
+
+
+async def main(args):
+    async with app.router.lifespan_context(app):
+        await seed()
+        async with asgi_client(app) as client:
+            original = auth_service.verify_password_async
+            auth_service.verify_password_async = inline_verify
+            try:
+                await measure(client, args, "inline bcrypt")
+            finally:
+                auth_service.verify_password_async = original
+            await measure(client, args, "offloaded bcrypt")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--logins", type=int, default=64)
+    parser.add_argument("--login-concurrency", type=int, default=16)
+    parser.add_argument("--reads", type=int, default=300)
+    parser.add_argument("--read-concurrency", type=int, default=4)
+    asyncio.run(main(parser.parse_args()))
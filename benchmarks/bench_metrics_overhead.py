@@ -0,0 +1,101 @@
+"""Per-request and per-query cost of the /metrics instrumentation.
+
+Request overhead is measured by calling a trivial ASGI app directly, with and
+without MetricsMiddleware in front of it, so the number is the middleware's own
+cost and not the framework's. Query overhead compares ``SELECT 1`` on an
+instrumented and a plain SQLite engine; most of it is SQLAlchemy's event
+dispatch rather than the listeners themselves. The target is under 50us per
+request.
+
+    python -m benchmarks.bench_metrics_overhead --iterations 50000
+"""
+import argparse
+import asyncio
+import time
+
+from benchmarks.common import asgi_client, configure_env
+
+configure_env("bench_metrics_overhead")
+
+from sqlalchemy import create_engine, text
+
+from app.main import app
+from app.utils.metrics import MetricsMiddleware, instrument_engine, metrics
+
+BUDGET_US = 50.0
+
+
+class _Route:
+    path = "/bench/{item_id}"
+
+
+async def _endpoint(scope, receive, send):
+    scope["route"] = _Route
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"ok"})
+
+
+async def _receive():
+    return {"type": "http.request", "body": b"", "more_body": False}
+
+
+async def _send(message):
+    pass
+
+
+async def time_asgi(asgi_app, iterations: int) -> float:
+    """Mean microseconds per request."""
+    started = time.perf_counter()
+    for _ in range(iterations):
+        scope = {"type": "http", "method": "GET", "path": "/bench/1", "headers": []}
+        await asgi_app(scope, _receive, _send)
+    return (time.perf_counter() - started) / iterations * 1e6
+
+
+def time_queries(instrumented: bool, iterations: int) -> float:
+    """Mean microseconds per ``SELECT 1``."""
+    engine = create_engine("sqlite://")
+    if instrumented:
+        instrument_engine(engine)
+    with engine.connect() as conn:
+        statement = text("SELECT 1")
+        for _ in range(1000):
+            conn.execute(statement)
+        started = time.perf_counter()
+        for _ in range(iterations):
+            conn.execute(statement)
+        return (time.perf_counter() - started) / iterations * 1e6
+
+
+async def main(args):
+    # Warm up both paths once before timing.
+    await time_asgi(_endpoint, 1000)
+    await time_asgi(MetricsMiddleware(_endpoint), 1000)
+    bare = min([await time_asgi(_endpoint, args.iterations) for _ in range(3)])
+    wrapped = min([await time_asgi(MetricsMiddleware(_endpoint), args.iterations) for _ in range(3)])
+    request_overhead = wrapped - bare
+    print(f"{'bare ASGI app':<32} {bare:>8.2f} us/request")
+    print(f"{'with MetricsMiddleware':<32} {wrapped:>8.2f} us/request")
+    print(f"{'request overhead':<32} {request_overhead:>8.2f} us (budget {BUDGET_US:.0f} us)")
+
+    plain = min(time_queries(False, args.iterations) for _ in range(3))
+    timed = min(time_queries(True, args.iterations) for _ in range(3))
+    print(f"{'SELECT 1 plain engine':<32} {plain:>8.2f} us/query")
+    print(f"{'SELECT 1 instrumented engine':<32} {timed:>8.2f} us/query")
+    print(f"{'query overhead':<32} {timed - plain:>8.2f} us")
+
+    # Sanity check the real endpoint after the runs above.
+    async with app.router.lifespan_context(app):
+        async with asgi_client(app, base_url="http://bench") as client:
+            await client.get("/api/v1/products/products")
+            body = (await client.get("/metrics")).text
+    series = sum(1 for line in body.splitlines() if line and not line.startswith("#"))
+    print(f"/metrics: {series} samples, {metrics.in_flight} requests in flight")
+    if request_overhead > BUDGET_US:
+        raise SystemExit(f"request overhead {request_overhead:.2f} us exceeds {BUDGET_US:.0f} us")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=50000)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,115 @@
+"""Query plans and timings for the hot lookups before and after the index migration.
+
+Builds the schema, drops the secondary indexes to mimic a database created
+before they existed, seeds it, then prints the plan and mean time of each
+lookup; applies pending migrations and repeats.
+
+    python -m benchmarks.bench_query_plans --users 20000 --orders 50000
+"""
+import argparse
+import random
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from benchmarks.common import configure_env
+
+configure_env("bench_query_plans")
+
+from sqlalchemy import create_engine, func, insert, select, text
+from sqlalchemy.schema import DropIndex
+
+from app.database import settings, to_async_url
+from app.migrations import MIGRATIONS, run_migrations, schema_version_table
+from app.models import Order, OrderProduct, OrderStatus, Product, User
+
+
+def hot_queries(sample: dict):
+    return {
+        "login: user by username": select(User).where(User.username == sample["username"]),
+        "orders of a user": select(Order).where(Order.user_id == sample["user_id"]),
+        "orders in a status": select(func.count()).select_from(Order).where(Order.status_id == sample["status_id"]),
+        "lines of an order": select(OrderProduct).where(OrderProduct.order_id == sample["order_id"]),
+        "product name duplicate check": select(Product).where(func.lower(Product.name) == sample["product_name"]),
+    }
+
+
+def explain(conn, statement) -> str:
+    compiled = statement.compile(conn, compile_kwargs={"literal_binds": True})
+    if conn.dialect.name == "sqlite":
+        rows = conn.execute(text(f"EXPLAIN QUERY PLAN {compiled}")).all()
+        return "; ".join(row[-1] for row in rows)
+    rows = conn.execute(text(f"EXPLAIN {compiled}")).all()
+    return "; ".join(row[0].strip() for row in rows)
+
+
+def measure(conn, statement, repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        conn.execute(statement).all()
+    return (time.perf_counter() - started) / repeat * 1000
+
+
+def seed(conn, args) -> dict:
+    now = datetime.utcnow()
+    statuses = [{"id": uuid.uuid4(), "name": name, "created_at": now} for name in ("pending", "shipped", "delivered")]
+    conn.execute(insert(OrderStatus), statuses)
+    users = [{"id": uuid.uuid4(), "username": f"user{i}", "email": f"user{i}@example.com",
+              "hashed_password": "x", "is_admin": False, "is_active": True,
+              "created_at": now - timedelta(seconds=i)} for i in range(args.users)]
+    conn.execute(insert(User), users)
+    products = [{"id": uuid.uuid4(), "name": f"Product {i}", "price": 10, "stock": 100,
+                 "is_available": True, "created_at": now} for i in range(args.products)]
+    conn.execute(insert(Product), products)
+    orders, lines = [], []
+    for i in range(args.orders):
+        order_id = uuid.uuid4()
+        orders.append({"id": order_id, "user_id": random.choice(users)["id"],
+                       "status_id": random.choice(statuses)["id"], "total_price": 10,
+                       "created_at": now - timedelta(minutes=i)})
+        for product in random.sample(products, 3):
+            lines.append({"id": uuid.uuid4(), "order_id": order_id, "product_id": product["id"],
+                          "quantity": 1, "created_at": now})
+    conn.execute(insert(Order), orders)
+    conn.execute(insert(OrderProduct), lines)
+    return {"username": users[-1]["username"], "user_id": users[-1]["id"],
+            "status_id": statuses[0]["id"], "order_id": orders[-1]["id"],
+            "product_name": products[-1]["name"].lower()}
+
+
+def report(conn, queries: dict, repeat: int, label: str):
+    print(f"\n== {label}")
+    for name, statement in queries.items():
+        print(f"{name:<32} {measure(conn, statement, repeat):>9.3f} ms   {explain(conn, statement)}")
+
+
+def main(args):
+    url = to_async_url(settings.database_url)
+    engine = create_engine(url.set(drivername=url.get_backend_name()))
+    with engine.begin() as conn:
+        MIGRATIONS[0].upgrade(conn)
+        schema_version_table.create(conn, checkfirst=True)
+        conn.execute(schema_version_table.insert().values(
+            version=1, description=MIGRATIONS[0].description, applied_at=datetime.utcnow()))
+        for table in (User.__table__, Product.__table__, Order.__table__, OrderProduct.__table__):
+            for index in table.indexes:
+                conn.execute(DropIndex(index, if_exists=True))
+        queries = hot_queries(seed(conn, args))
+    with engine.begin() as conn:
+        report(conn, queries, args.repeat, "schema version 1 (no secondary indexes)")
+    with engine.begin() as conn:
+        applied = run_migrations(conn)
+        if conn.dialect.name == "postgresql":
+            conn.execute(text("ANALYZE"))
+    with engine.begin() as conn:
+        report(conn, queries, args.repeat, f"after migrations {[m.version for m in applied]}")
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=20000)
+    parser.add_argument("--products", type=int, default=5000)
+    parser.add_argument("--orders", type=int, default=50000)
+    parser.add_argument("--repeat", type=int, default=20)
+    main(parser.parse_args())
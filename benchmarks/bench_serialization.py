@@ -0,0 +1,70 @@
+"""List endpoint latency with response_model validation vs the orjson fast path.
+
+Requests GET /products and GET /users at 10, 100 and 1000 items per page, first
+with the default serialization and then with FAST_JSON_RESPONSES enabled, and
+checks both paths return the same JSON.
+
+    python -m benchmarks.bench_serialization --requests 200 --concurrency 4
+"""
+import argparse
+import asyncio
+
+from benchmarks.common import asgi_client, configure_env, run_concurrent, summarize
+
+configure_env("bench_serialization")
+
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.database import engine, settings
+from app.main import app
+from app.models import Product, User
+from app.utils.security import create_access_token
+
+SIZES = (10, 100, 1000)
+
+
+async def seed(count: int) -> str:
+    async with AsyncSession(engine) as session:
+        admin = User(username="bench-admin", email="admin@example.com", hashed_password="x", is_admin=True)
+        session.add(admin)
+        admin_id = admin.id
+        for i in range(count):
+            session.add(Product(name=f"product-{i}", description=f"Description of product {i}",
+                                price=10 + i % 90, stock=100))
+            session.add(User(username=f"user-{i}", email=f"user{i}@example.com", hashed_password="x"))
+        await session.commit()
+    return create_access_token({"sub": str(admin_id)})
+
+
+async def measure(client, path: str, label: str, args) -> dict:
+    async def call():
+        response = await client.get(path)
+        response.raise_for_status()
+
+    latencies, elapsed = await run_concurrent(call, args.requests, args.concurrency)
+    return summarize(label, latencies, elapsed)
+
+
+async def main(args):
+    async with app.router.lifespan_context(app):
+        token = await seed(max(SIZES))
+        headers = {"Authorization": f"Bearer {token}"}
+        async with asgi_client(app) as client:
+            client.headers.update(headers)
+            for size in SIZES:
+                for name, path in (("products", f"/products/products?limit={size}"),
+                                   ("users", f"/users/?limit={size}")):
+                    settings.fast_json_responses = False
+                    expected = (await client.get(path)).json()
+                    await measure(client, path, f"{name} x{size} response_model", args)
+                    settings.fast_json_responses = True
+                    assert (await client.get(path)).json() == expected, f"{name}: fast path output differs"
+                    await measure(client, path, f"{name} x{size} orjson", args)
+            settings.fast_json_responses = False
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=4)
+    asyncio.run(main(parser.parse_args()))
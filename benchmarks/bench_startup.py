@@ -0,0 +1,88 @@
+"""Worker boot cost: import time and time to first request, per DB_STARTUP_MODE.
+
+Every boot runs in a fresh interpreter against an already migrated database (the
+usual restart or scale-out case) and reports, as medians over ``--runs`` boots:
+
+    import     importing app.main
+    startup    the lifespan (schema check or migration pass, status cache load),
+               and the number of SQL statements it ran
+    first req  the first GET /api/v1/products/products through the ASGI app
+    process    wall time of the whole child process, interpreter start included
+
+    python -m benchmarks.bench_startup --runs 5
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from benchmarks.common import configure_env
+
+MODES = ("migrate", "auto")
+
+
+def child():
+    import asyncio
+
+    started = time.perf_counter()
+    from app.main import app
+    imported = time.perf_counter()
+
+    from app.utils.metrics import metrics
+    from benchmarks.common import asgi_client
+
+    async def boot():
+        async with app.router.lifespan_context(app):
+            ready = time.perf_counter()
+            startup_queries = metrics.db_queries_total
+            async with asgi_client(app) as client:
+                response = await client.get("/products/products", params={"limit": 10})
+                response.raise_for_status()
+            return ready, time.perf_counter(), startup_queries
+
+    ready, answered, startup_queries = asyncio.run(boot())
+    print(json.dumps({
+        "import_ms": (imported - started) * 1000,
+        "startup_ms": (ready - imported) * 1000,
+        "first_request_ms": (answered - ready) * 1000,
+        "startup_queries": startup_queries,
+    }))
+
+
+def boot(mode: str) -> dict:
+    started = time.perf_counter()
+    output = subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench_startup", "--child"],
+        env={**os.environ, "DB_STARTUP_MODE": mode},
+        check=True, capture_output=True, text=True,
+    ).stdout
+    timings = json.loads(output.strip().splitlines()[-1])
+    timings["process_ms"] = (time.perf_counter() - started) * 1000
+    return timings
+
+
+def main(args):
+    configure_env("bench_startup")
+    boot("migrate")  # create and stamp the schema once, outside the measurements
+    for mode in MODES:
+        runs = [boot(mode) for _ in range(args.runs)]
+        medians = {key: statistics.median(run[key] for run in runs) for key in runs[0]}
+        print(
+            f"DB_STARTUP_MODE={mode:<8} import {medians['import_ms']:>7.1f} ms  "
+            f"startup {medians['startup_ms']:>6.1f} ms ({medians['startup_queries']:.0f} queries)  "
+            f"first req {medians['first_request_ms']:>6.1f} ms  process {medians['process_ms']:>7.1f} ms"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        child()
+    else:
+        main(args)
@@ -0,0 +1,71 @@
+"""Shared helpers for the scripts in this directory.
+
+Benchmarks run the real application in-process against a throwaway SQLite
+database unless DATABASE_URL is already set, so they can be started with
+nothing but the app requirements installed:
+
+    python -m benchmarks.bench_concurrency
+"""
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+
+def configure_env(name: str) -> str:
+    """Point the app at a fresh SQLite file unless DATABASE_URL is set. Must run before importing app."""
+    os.environ.setdefault("SECRET_KEY", "benchmark-secret")
+    if "DATABASE_URL" not in os.environ:
+        path = os.path.join(tempfile.gettempdir(), f"{name}.db")
+        if os.path.exists(path):
+            os.remove(path)
+        os.environ["DATABASE_URL"] = f"sqlite:///{path}"
+    return os.environ["DATABASE_URL"]
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def summarize(label: str, latencies: list[float], elapsed: float) -> dict:
+    result = {
+        "label": label,
+        "requests": len(latencies),
+        "throughput_rps": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+        "mean_ms": round(statistics.fmean(latencies) * 1000, 2) if latencies else 0.0,
+    }
+    print(
+        f"{label:<32} {result['requests']:>6} req  {result['throughput_rps']:>9} req/s  "
+        f"p50 {result['p50_ms']:>8} ms  p95 {result['p95_ms']:>8} ms  p99 {result['p99_ms']:>8} ms"
+    )
+    return result
+
+
+async def run_concurrent(call, total: int, concurrency: int) -> tuple[list[float], float]:
+    """Run ``call()`` ``total`` times with at most ``concurrency`` in flight; return latencies and wall time."""
+    latencies: list[float] = []
+    remaining = iter(range(total))
+
+    async def worker():
+        for _ in remaining:
+            started = time.perf_counter()
+            await call()
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, time.perf_counter() - started
+
+
+def asgi_client(app, base_url: str = "http://bench/api/v1"):
+    import httpx
+
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url=base_url)
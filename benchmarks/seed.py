@@ -0,0 +1,116 @@
+"""Deterministic bulk seeding of users, products, statuses and orders for benchmarks.
+
+Rows are written with Core bulk INSERTs in chunks, so tens of thousands of orders
+seed in seconds; the sales rollups are rebuilt from them at the end. The same
+``--seed`` always produces the same ids and data, so runs against a fresh
+database are comparable.
+"""
+import random
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from decimal import Decimal
+from uuid import UUID
+
+from sqlalchemy import insert
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.database import engine
+from app.models import Order, OrderProduct, OrderStatus, Product, User
+from app.services.order_status_service import status_cache
+from app.services.report_service import rebuild_statements
+from app.utils.security import create_access_token, get_password_hash
+
+PASSWORD = "Bench!pass1"
+STATUSES = ("pending", "processing", "shipped", "delivered", "cancelled")
+CHUNK_SIZE = 1000
+
+
+@dataclass
+class Volumes:
+    users: int = 1000
+    products: int = 2000
+    orders: int = 5000
+    max_lines: int = 3  # products per order
+
+
+@dataclass
+class SeededData:
+    """What the scenarios need to build requests against the seeded database."""
+    admin_token: str
+    usernames: list[str]
+    user_ids: list[UUID]
+    user_tokens: list[str]
+    product_ids: list[UUID]
+    order_ids: list[UUID]
+    statuses: list[str] = field(default_factory=lambda: list(STATUSES))
+
+
+def _uuid(rng: random.Random) -> UUID:
+    return UUID(int=rng.getrandbits(128), version=4)
+
+
+async def _insert(session: AsyncSession, model, rows: list[dict]):
+    for start in range(0, len(rows), CHUNK_SIZE):
+        await session.execute(insert(model), rows[start:start + CHUNK_SIZE])
+
+
+async def seed(volumes: Volumes, seed: int = 1, token_users: int = 50) -> SeededData:
+    """Fill an empty (migrated) database; ``token_users`` users get an access token for the scenarios."""
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+    # bcrypt is slow on purpose: hash once and share it, every user has PASSWORD.
+    hashed_password = get_password_hash(PASSWORD)
+
+    admin_id = _uuid(rng)
+    users = [{"id": admin_id, "username": "bench-admin", "email": "bench-admin@example.com",
+              "hashed_password": hashed_password, "is_admin": True, "is_active": True, "created_at": now}]
+    users += [
+        {"id": _uuid(rng), "username": f"user-{i}", "email": f"user-{i}@example.com",
+         "hashed_password": hashed_password, "is_admin": False, "is_active": True,
+         "created_at": now - timedelta(minutes=i)}
+        for i in range(volumes.users)
+    ]
+    statuses = [{"id": _uuid(rng), "name": name, "created_at": now} for name in STATUSES]
+    products = [
+        {"id": _uuid(rng), "name": f"Product {i}", "description": f"Benchmark product number {i}",
+         "price": Decimal(rng.randrange(100, 50000)) / 100, "stock": 1_000_000, "is_available": True,
+         "stock_buckets": 0, "created_at": now - timedelta(minutes=i)}
+        for i in range(volumes.products)
+    ]
+
+    orders, order_products = [], []
+    prices = {product["id"]: product["price"] for product in products}
+    for _ in range(volumes.orders):
+        order_id = _uuid(rng)
+        created_at = now - timedelta(minutes=rng.randrange(60 * 24 * 90))
+        lines = rng.sample(list(prices), min(rng.randint(1, volumes.max_lines), len(prices)))
+        total = Decimal(0)
+        for product_id in lines:
+            quantity = rng.randint(1, 3)
+            total += prices[product_id] * quantity
+            order_products.append({"id": _uuid(rng), "order_id": order_id, "product_id": product_id,
+                                   "quantity": quantity, "created_at": created_at})
+        orders.append({"id": order_id, "user_id": rng.choice(users[1:])["id"],
+                       "status_id": rng.choice(statuses)["id"], "total_price": total,
+                       "created_at": created_at})
+
+    async with AsyncSession(engine) as session:
+        await _insert(session, User, users)
+        await _insert(session, OrderStatus, statuses)
+        await _insert(session, Product, products)
+        await _insert(session, Order, orders)
+        await _insert(session, OrderProduct, order_products)
+        for statement in rebuild_statements():
+            await session.execute(statement)
+        await session.commit()
+        await status_cache.load(session)
+
+    token_rows = users[1:token_users + 1]
+    return SeededData(
+        admin_token=create_access_token({"sub": str(admin_id)}),
+        usernames=[user["username"] for user in users[1:]],
+        user_ids=[user["id"] for user in token_rows],
+        user_tokens=[create_access_token({"sub": str(user["id"])}) for user in token_rows],
+        product_ids=[product["id"] for product in products],
+        order_ids=[order["id"] for order in orders],
+    )
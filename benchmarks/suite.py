@@ -0,0 +1,265 @@
+"""Reproducible load suite for the API, with a JSON baseline to catch regressions.
+
+Seeds a fresh database (SQLite in a temp file, or whatever DATABASE_URL points at,
+e.g. a local Postgres) with realistic volumes, then drives the real
+``app.main:app`` through the in-process ASGI client and/or a uvicorn server,
+running each scenario for a fixed number of requests:
+
+    login           POST /login/ with a seeded user's password (bcrypt included)
+    catalog         product listing pages, product detail and search
+    order_create    POST /orders/orders/ with 1-3 random products
+    order_list      GET /users/{id}/orders for the requesting user
+    status_update   admin PUT /orders/orders/{id}/status on seeded orders
+
+Throughput and p50/p95/p99 latency are printed per transport and scenario, and
+can be saved and compared against an earlier run:
+
+    python -m benchmarks.suite --transport both --output baseline.json
+    python -m benchmarks.suite --transport both --baseline baseline.json --max-regression 15
+
+With ``--baseline``, the exit status is 1 when any scenario lost more than
+``--max-regression`` percent of throughput or gained as much p95 latency.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import time
+
+from benchmarks.common import asgi_client, configure_env, run_concurrent, summarize
+
+configure_env("bench_suite")
+# One client address drives every login: lift the login throttles so the scenario
+# measures authentication, not the 429 path.
+for name in ("LOGIN_USERNAME_BURST", "LOGIN_IP_BURST", "LOGIN_MAX_CONCURRENT_VERIFICATIONS"):
+    os.environ.setdefault(name, "1000000")
+# Under write load SQLite statements wait on the database lock; keep those out of the report.
+os.environ.setdefault("SLOW_QUERY_MS", "0")
+
+import httpx
+
+from app.main import app
+from benchmarks.seed import PASSWORD, SeededData, Volumes, seed
+
+SEARCH_TERMS = ("product 1", "number 42", "product", "benchmark 7")
+
+
+class Scenario:
+    """Builds one request per call; ``expected`` is the status code counted as success."""
+
+    expected = 200
+
+    def __init__(self, data: SeededData, rng: random.Random):
+        self.data = data
+        self.rng = rng
+
+    def _user(self) -> tuple:
+        index = self.rng.randrange(len(self.data.user_tokens))
+        return self.data.user_ids[index], {"Authorization": f"Bearer {self.data.user_tokens[index]}"}
+
+    async def request(self, client: httpx.AsyncClient) -> httpx.Response:
+        raise NotImplementedError
+
+
+class Login(Scenario):
+    async def request(self, client):
+        username = self.rng.choice(self.data.usernames)
+        return await client.post("/login/", data={"username": username, "password": PASSWORD})
+
+
+class Catalog(Scenario):
+    async def request(self, client):
+        choice = self.rng.random()
+        if choice < 0.5:
+            skip = self.rng.randrange(0, max(len(self.data.product_ids) - 20, 1))
+            return await client.get("/products/products", params={"skip": skip, "limit": 20})
+        if choice < 0.85:
+            return await client.get(f"/products/products/{self.rng.choice(self.data.product_ids)}")
+        return await client.get("/products/products/search", params={"q": self.rng.choice(SEARCH_TERMS)})
+
+
+class OrderCreate(Scenario):
+    expected = 201
+
+    async def request(self, client):
+        _, headers = self._user()
+        products = self.rng.sample(self.data.product_ids, self.rng.randint(1, 3))
+        body = {"products": [{"product_id": str(product_id), "quantity": 1} for product_id in products]}
+        return await client.post("/orders/orders/", json=body, headers=headers)
+
+
+class OrderList(Scenario):
+    async def request(self, client):
+        user_id, headers = self._user()
+        return await client.get(f"/users/{user_id}/orders", params={"limit": 20}, headers=headers)
+
+
+class StatusUpdate(Scenario):
+    async def request(self, client):
+        order_id = self.rng.choice(self.data.order_ids)
+        return await client.put(
+            f"/orders/orders/{order_id}/status",
+            json={"status": self.rng.choice(self.data.statuses)},
+            headers={"Authorization": f"Bearer {self.data.admin_token}"},
+        )
+
+
+SCENARIOS = {
+    "login": Login,
+    "catalog": Catalog,
+    "order_create": OrderCreate,
+    "order_list": OrderList,
+    "status_update": StatusUpdate,
+}
+
+
+async def run_scenario(client, scenario: Scenario, label: str, requests: int, concurrency: int) -> dict:
+    errors: dict[int, int] = {}
+
+    async def call():
+        response = await scenario.request(client)
+        if response.status_code != scenario.expected:
+            errors[response.status_code] = errors.get(response.status_code, 0) + 1
+
+    # A few unmeasured requests first, so one-off costs (caches, connections) stay out of the numbers.
+    for _ in range(min(concurrency, 10)):
+        await call()
+    errors.clear()
+    latencies, elapsed = await run_concurrent(call, requests, concurrency)
+    result = summarize(label, latencies, elapsed)
+    result["errors"] = sum(errors.values())
+    if errors:
+        print(f"{'':<32} unexpected status codes: {dict(sorted(errors.items()))}")
+    return result
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def start_uvicorn(workers: int) -> tuple[subprocess.Popen, str]:
+    port = _free_port()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--workers", str(workers), "--log-level", "warning", "--no-access-log"],
+        env=os.environ.copy(),
+    )
+    base_url = f"http://127.0.0.1:{port}/api/v1"
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        deadline = time.monotonic() + 30
+        while time.monotonic() < deadline:
+            if server.poll() is not None:
+                raise RuntimeError(f"uvicorn exited with status {server.returncode}")
+            try:
+                if (await client.get("/products/products", params={"limit": 1})).status_code == 200:
+                    return server, base_url
+            except httpx.TransportError:
+                pass
+            await asyncio.sleep(0.2)
+    server.terminate()
+    raise RuntimeError("uvicorn did not start within 30 seconds")
+
+
+async def run_transport(client, transport: str, data: SeededData, args) -> dict:
+    results = {}
+    for name in args.scenarios:
+        # Logins are bcrypt-bound; a tenth of the requests is enough for stable percentiles.
+        requests = max(args.requests // 10, 10) if name == "login" else args.requests
+        scenario = SCENARIOS[name](data, random.Random(f"{args.seed}:{name}"))
+        results[f"{transport}:{name}"] = await run_scenario(
+            client, scenario, f"{transport} {name}", requests, args.concurrency
+        )
+    return results
+
+
+def compare(results: dict, baseline: dict, max_regression: float) -> list[str]:
+    """Print the change against ``baseline`` per scenario; return the regressed ones."""
+    regressions = []
+    print(f"\n{'vs baseline':<32} {'req/s':>16} {'p95 ms':>18}")
+    for key, result in results.items():
+        before = baseline.get(key)
+        if before is None:
+            print(f"{key:<32} {'(not in baseline)':>16}")
+            continue
+        throughput = _change(before["throughput_rps"], result["throughput_rps"])
+        p95 = _change(before["p95_ms"], result["p95_ms"])
+        regressed = throughput < -max_regression or p95 > max_regression
+        print(f"{key:<32} {throughput:>+15.1f}% {p95:>+17.1f}%{'  REGRESSION' if regressed else ''}")
+        if regressed:
+            regressions.append(key)
+    return regressions
+
+
+def _change(before: float, after: float) -> float:
+    return (after - before) / before * 100 if before else 0.0
+
+
+async def main(args):
+    results = {}
+    async with app.router.lifespan_context(app):
+        started = time.perf_counter()
+        volumes = Volumes(args.users, args.products, args.orders)
+        data = await seed(volumes, args.seed)
+        print(f"seeded {volumes} in {time.perf_counter() - started:.1f}s\n")
+
+        if args.transport in ("asgi", "both"):
+            async with asgi_client(app) as client:
+                results.update(await run_transport(client, "asgi", data, args))
+
+        if args.transport in ("uvicorn", "both"):
+            server, base_url = await start_uvicorn(args.workers)
+            try:
+                limits = httpx.Limits(max_connections=args.concurrency)
+                async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+                    results.update(await run_transport(client, "uvicorn", data, args))
+            finally:
+                server.terminate()
+                server.wait()
+
+    report = {
+        "meta": {
+            "database": os.environ["DATABASE_URL"].split(":", 1)[0],
+            "volumes": vars(volumes),
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "uvicorn_workers": args.workers,
+            "seed": args.seed,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump(report, output, indent=2)
+        print(f"\nwrote {args.output}")
+    if args.baseline:
+        with open(args.baseline) as baseline:
+            regressions = compare(results, json.load(baseline)["results"], args.max_regression)
+        if regressions:
+            raise SystemExit(f"{len(regressions)} scenario(s) regressed by more than {args.max_regression}%")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--transport", choices=("asgi", "uvicorn", "both"), default="asgi")
+    parser.add_argument("--scenarios", nargs="+", choices=list(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument("--requests", type=int, default=500, help="requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes")
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--products", type=int, default=2000)
+    parser.add_argument("--orders", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="write the results as JSON")
+    parser.add_argument("--baseline", help="compare against results written by --output")
+    parser.add_argument("--max-regression", type=float, default=15.0,
+                        help="percent of throughput lost or p95 gained that fails a --baseline run")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,99 @@
+"""Tests run the app in-process against a throwaway SQLite database.
+
+They need nothing beyond the app requirements and pytest: each test drives its
+coroutine with ``asyncio.run`` inside the app's lifespan, so no async plugin is used.
+"""
+import asyncio
+import os
+import tempfile
+
+# Must be set before anything imports app.settings.
+os.environ.setdefault("SECRET_KEY", "test-secret")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'test.db')}"
+
+import httpx
+import pytest
+from decimal import Decimal
+from uuid import UUID, uuid4
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.database import engine
+from app.main import app
+from app.models import Order, OrderProduct, OrderStatus, Product, User
+from app.utils.security import create_access_token
+
+
+@pytest.fixture
+def run_in_app():
+    """Run ``test(session)`` inside the app's lifespan (schema migrated, caches loaded)."""
+    def run(test):
+        async def main():
+            async with app.router.lifespan_context(app):
+                async with AsyncSession(engine, expire_on_commit=False) as session:
+                    return await test(session)
+        return asyncio.run(main())
+    return run
+
+
+@pytest.fixture
+def api_client():
+    """Factory for an httpx client calling the app in-process; use it inside ``run_in_app``."""
+    def client(user_id: UUID | None = None, **kwargs) -> httpx.AsyncClient:
+        headers = kwargs.pop("headers", {})
+        if user_id is not None:
+            headers["Authorization"] = f"Bearer {create_access_token({'sub': str(user_id)})}"
+        return httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app), base_url="http://test/api/v1", headers=headers, **kwargs
+        )
+    return client
+
+
+@pytest.fixture
+def create_user():
+    return _create_user
+
+
+async def _create_user(session: AsyncSession, is_admin: bool = False) -> UUID:
+    suffix = uuid4().hex[:12]
+    user = User(
+        username=f"user-{suffix}", email=f"user-{suffix}@example.com", hashed_password="x", is_admin=is_admin
+    )
+    session.add(user)
+    await session.commit()
+    return user.id
+
+
+@pytest.fixture
+def create_product():
+    return _create_product
+
+
+async def _create_product(session: AsyncSession, stock: int = 100) -> Product:
+    """A product that can be ordered: also makes sure the "pending" order status exists."""
+    if (await session.exec(select(OrderStatus).where(OrderStatus.name == "pending"))).first() is None:
+        session.add(OrderStatus(name="pending"))
+    product = Product(name=f"Product {uuid4().hex[:12]}", price=Decimal("2.50"), stock=stock)
+    session.add(product)
+    await session.commit()
+    return product
+
+
+@pytest.fixture
+def create_user_orders():
+    return _create_user_orders
+
+
+async def _create_user_orders(session: AsyncSession, orders: int, lines: int = 2) -> UUID:
+    """A new user with ``orders`` orders of ``lines`` products each; returns the user id."""
+    suffix = uuid4().hex[:12]
+    user = User(username=f"user-{suffix}", email=f"user-{suffix}@example.com", hashed_password="x")
+    status = OrderStatus(name=f"status-{suffix}")
+    products = [Product(name=f"Product {i}", price=Decimal("9.99"), stock=100) for i in range(lines)]
+    session.add_all([user, status, *products])
+    for _ in range(orders):
+        order = Order(user_id=user.id, status_id=status.id, total_price=Decimal("9.99") * lines)
+        session.add(order)
+        session.add_all(OrderProduct(order_id=order.id, product_id=product.id) for product in products)
+    await session.commit()
+    return user.id
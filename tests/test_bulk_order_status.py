@@ -0,0 +1,45 @@
+from uuid import uuid4
+
+import pytest
+from fastapi import HTTPException
+from sqlmodel import select
+
+from app.models import Order, OrderStatus
+from app.services.order_service import OrderService
+
+
+def test_bulk_status_reports_each_order(run_in_app, create_user_orders):
+    async def test(session):
+        user_id = await create_user_orders(session, orders=3, lines=1)
+        shipped = OrderStatus(name=f"shipped-{uuid4().hex[:12]}")
+        session.add(shipped)
+        await session.commit()
+        first, second, third = (await session.exec(select(Order).where(Order.user_id == user_id))).all()
+        third.status_id = shipped.id
+        await session.commit()
+        missing = uuid4()
+
+        result = await OrderService(session).bulk_update_order_status(
+            [first.id, missing, second.id, third.id, first.id], shipped.name
+        )
+
+        assert (result.updated, result.unchanged, result.not_found) == (2, 1, 1)
+        assert [(item.order_id, item.result) for item in result.results] == [
+            (first.id, "updated"), (missing, "not_found"), (second.id, "updated"), (third.id, "unchanged"),
+        ]
+        session.expunge_all()
+        statuses = (await session.exec(select(Order.status_id).where(Order.user_id == user_id))).all()
+        assert statuses == [shipped.id] * 3
+
+    run_in_app(test)
+
+
+def test_bulk_status_rejects_an_unknown_status(run_in_app, create_user_orders):
+    async def test(session):
+        user_id = await create_user_orders(session, orders=1, lines=1)
+        order_id = (await session.exec(select(Order.id).where(Order.user_id == user_id))).one()
+        with pytest.raises(HTTPException) as invalid:
+            await OrderService(session).bulk_update_order_status([order_id], f"missing-{uuid4().hex}")
+        assert invalid.value.status_code == 400
+
+    run_in_app(test)
@@ -0,0 +1,49 @@
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import pytest
+
+from app.models import Product
+
+
+@pytest.fixture
+def local_timezone(monkeypatch):
+    """Run with the process clock well behind UTC, so local timestamps would show up."""
+    monkeypatch.setenv("TZ", "America/New_York")
+    time.tzset()
+    yield
+    monkeypatch.undo()
+    time.tzset()
+
+
+def test_product_etag_and_last_modified_round_trip(run_in_app, api_client, create_user, local_timezone):
+    async def test(session):
+        admin_id = await create_user(session, is_admin=True)
+        product = Product(
+            name="Cached product", price=Decimal("3.00"), stock=5,
+            created_at=datetime.utcnow() - timedelta(minutes=10),
+        )
+        session.add(product)
+        await session.commit()
+
+        async with api_client(admin_id) as client:
+            url = f"/products/products/{product.id}"
+            first = await client.get(url)
+            assert first.status_code == 200
+            etag, last_modified = first.headers["ETag"], first.headers["Last-Modified"]
+
+            assert (await client.get(url, headers={"If-None-Match": etag})).status_code == 304
+            assert (await client.get(url, headers={"If-Modified-Since": last_modified})).status_code == 304
+
+            updated = await client.put(url, json={"price": "4.00"})
+            assert updated.status_code == 200
+
+            after = await client.get(url, headers={"If-None-Match": etag})
+            assert after.status_code == 200
+            assert after.headers["ETag"] != etag
+            assert after.json()["price"] == 4.0
+            assert (await client.get(url, headers={"If-Modified-Since": last_modified})).status_code == 200
+            assert (await client.get(url, headers={"If-None-Match": after.headers["ETag"]})).status_code == 304
+
+    run_in_app(test)
@@ -0,0 +1,105 @@
+import asyncio
+from uuid import uuid4
+
+import pytest
+from fastapi import HTTPException
+from sqlmodel import func, select
+
+from app.models import Order
+from app.utils.idempotency import IdempotencyStore, InMemoryIdempotencyBackend
+
+
+def new_store(wait_timeout: float = 1.0) -> IdempotencyStore:
+    return IdempotencyStore(InMemoryIdempotencyBackend(maxsize=100, ttl=60), wait_timeout)
+
+
+class Call:
+    """A request handler that counts its runs and can be held until ``done`` is set."""
+
+    def __init__(self, held: bool = False):
+        self.runs = 0
+        self.started = asyncio.Event()
+        self.done = asyncio.Event()
+        if not held:
+            self.done.set()
+
+    async def __call__(self):
+        self.runs += 1
+        self.started.set()
+        await self.done.wait()
+        return {"run": self.runs}
+
+
+def test_concurrent_duplicate_waits_and_replays():
+    async def main():
+        store, call = new_store(), Call(held=True)
+        first = asyncio.create_task(store.run("k", "fp", call, status_code=201))
+        await call.started.wait()
+        duplicate = asyncio.create_task(store.run("k", "fp", call, status_code=201))
+        await asyncio.sleep(0.01)
+        assert not duplicate.done()
+        call.done.set()
+        (stored, replayed), (again, duplicate_replayed) = await asyncio.gather(first, duplicate)
+        assert (stored.body, stored.status_code, replayed) == ({"run": 1}, 201, False)
+        assert (again, duplicate_replayed) == (stored, True)
+        assert call.runs == 1
+
+    asyncio.run(main())
+
+
+def test_duplicate_gives_up_with_409_while_the_first_is_running():
+    async def main():
+        store, call = new_store(wait_timeout=0.01), Call(held=True)
+        first = asyncio.create_task(store.run("k", "fp", call))
+        await call.started.wait()
+        with pytest.raises(HTTPException) as conflict:
+            await store.run("k", "fp", call)
+        assert conflict.value.status_code == 409
+        assert conflict.value.headers == {"Retry-After": "1"}
+        call.done.set()
+        await first
+
+    asyncio.run(main())
+
+
+def test_key_is_released_after_a_failed_request():
+    async def main():
+        store, runs = new_store(), 0
+
+        async def flaky():
+            nonlocal runs
+            runs += 1
+            if runs == 1:
+                raise RuntimeError("database unavailable")
+            return {"run": runs}
+
+        with pytest.raises(RuntimeError):
+            await store.run("k", "fp", flaky)
+        stored, replayed = await store.run("k", "fp", flaky)
+        assert (stored.body, replayed) == ({"run": 2}, False)
+
+    asyncio.run(main())
+
+
+def test_order_key_replays_and_rejects_a_different_body(run_in_app, api_client, create_user, create_product):
+    async def test(session):
+        user_id = await create_user(session)
+        product = await create_product(session)
+        body = {"products": [{"product_id": str(product.id), "quantity": 1}]}
+
+        async with api_client(user_id, headers={"Idempotency-Key": uuid4().hex}) as client:
+            first = await client.post("/orders/orders/", json=body)
+            retry = await client.post("/orders/orders/", json=body)
+            assert first.status_code == retry.status_code == 201
+            assert "Idempotent-Replayed" not in first.headers
+            assert retry.headers["Idempotent-Replayed"] == "true"
+            assert retry.json() == first.json()
+
+            body["products"][0]["quantity"] = 2
+            mismatch = await client.post("/orders/orders/", json=body)
+            assert mismatch.status_code == 422
+
+        orders = await session.exec(select(func.count()).select_from(Order).where(Order.user_id == user_id))
+        assert orders.one() == 1
+
+    run_in_app(test)
@@ -0,0 +1,48 @@
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import event
+
+from app.database import engine
+from app.services.order_service import OrderService
+
+
+@contextmanager
+def count_statements():
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+
+
+@pytest.mark.parametrize("orders", [1, 5, 20])
+def test_user_orders_listing_runs_two_queries(run_in_app, create_user_orders, orders):
+    async def test(session):
+        user_id = await create_user_orders(session, orders, lines=3)
+        with count_statements() as statements:
+            listed = await OrderService(session).get_orders_by_user(user_id)
+        assert len(listed) == orders
+        assert all(len(order.products) == 3 for order in listed)
+        # Orders joined to their status, then every line of the page in one SELECT ... IN.
+        assert len(statements) == 2, statements
+
+    run_in_app(test)
+
+
+@pytest.mark.parametrize("orders", [1, 5, 20])
+def test_user_orders_page_runs_two_queries(run_in_app, create_user_orders, orders):
+    async def test(session):
+        user_id = await create_user_orders(session, orders, lines=3)
+        with count_statements() as statements:
+            listed, next_cursor = await OrderService(session).get_orders_by_user_page(user_id, limit=10)
+        assert len(listed) == min(orders, 10)
+        assert (next_cursor is not None) == (orders > 10)
+        assert len(statements) == 2, statements
+
+    run_in_app(test)
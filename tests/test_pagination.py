@@ -0,0 +1,65 @@
+import base64
+from datetime import datetime
+from uuid import uuid4
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import update
+from sqlmodel import select
+
+from app.models import Order
+from app.services.order_service import OrderService
+from app.utils.pagination import decode_cursor, encode_cursor
+
+
+def test_cursor_round_trip():
+    created_at, id = datetime(2024, 5, 6, 7, 8, 9, 123456), uuid4()
+    cursor = encode_cursor(created_at, id)
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == (created_at, id)
+
+
+@pytest.mark.parametrize("cursor", [
+    "not a cursor!",
+    base64.urlsafe_b64encode(b"{not json").decode(),
+    base64.urlsafe_b64encode(b'["2024-05-06T07:08:09"]').decode(),
+    base64.urlsafe_b64encode(b'["yesterday", "00000000-0000-0000-0000-000000000000"]').decode(),
+    base64.urlsafe_b64encode(b'["2024-05-06T07:08:09", "not-a-uuid"]').decode(),
+    base64.urlsafe_b64encode(b'[1, 2]').decode(),
+])
+def test_invalid_cursor_is_a_400(cursor):
+    with pytest.raises(HTTPException) as invalid:
+        decode_cursor(cursor)
+    assert invalid.value.status_code == 400
+
+
+def test_invalid_cursor_is_a_400_on_the_listings(run_in_app, api_client, create_user):
+    async def test(session):
+        admin_id = await create_user(session, is_admin=True)
+        async with api_client(admin_id) as client:
+            for url in ("/products/products", "/users/", f"/users/{admin_id}/orders"):
+                response = await client.get(url, params={"cursor": "garbage"})
+                assert response.status_code == 400, url
+                assert response.json() == {"detail": "Invalid cursor"}
+
+    run_in_app(test)
+
+
+def test_pages_break_created_at_ties_by_id(run_in_app, create_user_orders):
+    async def test(session):
+        user_id = await create_user_orders(session, orders=5, lines=1)
+        await session.execute(
+            update(Order).where(Order.user_id == user_id).values(created_at=datetime(2020, 1, 1))
+        )
+        await session.commit()
+        ids = sorted((await session.exec(select(Order.id).where(Order.user_id == user_id))).all())
+
+        service, seen, cursor = OrderService(session), [], None
+        while True:
+            page, cursor = await service.get_orders_by_user_page(user_id, limit=2, cursor=cursor)
+            seen += [order.id for order in page]
+            if cursor is None:
+                break
+        assert seen == ids
+
+    run_in_app(test)
@@ -0,0 +1,54 @@
+import io
+from uuid import uuid4
+
+from app.services.product_services import ProductService, iter_import_rows
+
+
+def import_upload(run_in_app, data: bytes, fmt: str) -> dict:
+    async def test(session):
+        return await ProductService(session).import_products(iter_import_rows(io.BytesIO(data), fmt))
+
+    return run_in_app(test)
+
+
+def test_csv_rows_with_extra_fields_are_reported(run_in_app):
+    prefix = uuid4().hex[:8]
+    data = (
+        "name,description,price,stock\n"
+        f"{prefix} ok,first,1.50,3\n"
+        f"{prefix} ragged,second,2.00,4,surplus\n"
+        f"{prefix} also ok,,3.00,5\n"
+        f"{prefix} big,{'x' * 200_000},1,1\n"
+    ).encode()
+
+    report = import_upload(run_in_app, data, "csv")
+
+    assert report["total_rows"] == 4
+    assert report["imported"] == 2
+    assert report["errors"] == [
+        {"row": 2, "error": "More fields than the header"},
+        {"row": 4, "error": "Invalid CSV: field larger than field limit (131072)"},
+    ]
+
+
+def test_invalid_utf8_rows_are_reported(run_in_app):
+    prefix = uuid4().hex[:8]
+    csv_data = (
+        b"name,price,stock\n"
+        + f"{prefix} latin,1,1\n".encode().replace(b"latin", b"caf\xe9")
+        + f"{prefix} plain,1,1\n".encode()
+    )
+    report = import_upload(run_in_app, csv_data, "csv")
+    assert report["imported"] == 1
+    assert report["errors"] == [{"row": 1, "error": "Invalid UTF-8"}]
+
+    ndjson_data = (
+        f'{{"name": "{prefix} caf\\u00e9", "price": 1, "stock": 1}}\n'.encode()
+        + b'{"name": "caf\xe9", "price": 1, "stock": 1}\n'
+        + b"not json\n"
+    )
+    report = import_upload(run_in_app, ndjson_data, "ndjson")
+    assert report["imported"] == 1
+    assert [error["row"] for error in report["errors"]] == [2, 3]
+    assert report["errors"][0]["error"] == "Invalid UTF-8"
+    assert report["errors"][1]["error"].startswith("Invalid JSON")
@@ -0,0 +1,87 @@
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+from fastapi import HTTPException
+
+from app.api.routes import login
+from app.utils import rate_limit
+from app.utils.rate_limit import ConcurrencyCap, TokenBucketLimiter
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = SimpleNamespace(now=1000.0)
+    monkeypatch.setattr(rate_limit, "time", SimpleNamespace(monotonic=lambda: clock.now))
+    return clock
+
+
+def test_token_bucket_refills_at_its_rate(clock):
+    limiter = TokenBucketLimiter(burst=2, per_minute=30, maxsize=10)
+    assert limiter.acquire("a") == 0
+    assert limiter.acquire("a") == 0
+    assert limiter.acquire("a") == pytest.approx(2.0)
+    # Other keys have buckets of their own.
+    assert limiter.acquire("b") == 0
+
+    clock.now += 1
+    assert limiter.acquire("a") == pytest.approx(1.0)
+    clock.now += 1
+    assert limiter.acquire("a") == 0
+    assert limiter.acquire("a") == pytest.approx(2.0)
+
+    # A bucket that refilled completely is dropped.
+    clock.now += 10
+    limiter.acquire("c")
+    assert len(limiter) == 1
+
+
+def test_concurrency_cap_rejects_beyond_its_limit():
+    cap = ConcurrencyCap(1, "Busy")
+    with cap.slot():
+        with pytest.raises(HTTPException) as rejected:
+            with cap.slot():
+                pass
+    assert rejected.value.status_code == 429
+    assert rejected.value.headers == {"Retry-After": "1"}
+
+    # A slot is released when the work inside it fails.
+    with pytest.raises(RuntimeError):
+        with cap.slot():
+            raise RuntimeError
+    assert cap.active == 0
+    with cap.slot():
+        assert cap.active == 1
+
+
+def test_login_is_limited_per_forwarded_client(run_in_app, api_client, monkeypatch):
+    monkeypatch.setattr(login, "ip_limiter", TokenBucketLimiter(2, 1, 100))
+    monkeypatch.setattr(login.settings, "trusted_proxy_count", 1)
+
+    async def test(session):
+        async def attempt(forwarded_for: str):
+            form = {"username": f"nobody-{uuid4().hex[:8]}", "password": "wrong"}
+            return await client.post("/login/", data=form, headers={"X-Forwarded-For": forwarded_for})
+
+        async with api_client() as client:
+            assert (await attempt("203.0.113.7")).status_code == 401
+            # Entries left of the one the trusted proxy wrote are the client's own.
+            assert (await attempt("198.51.100.1, 203.0.113.7")).status_code == 401
+            limited = await attempt("203.0.113.7")
+            assert limited.status_code == 429
+            assert limited.headers["Retry-After"] == "60"
+            assert (await attempt("203.0.113.8")).status_code == 401
+
+    run_in_app(test)
+
+
+def test_client_address_counts_trusted_proxies_from_the_right():
+    request = SimpleNamespace(
+        client=SimpleNamespace(host="10.0.0.5"),
+        headers=SimpleNamespace(getlist=lambda name: ["198.51.100.1, 203.0.113.7"]),
+    )
+    assert rate_limit.client_address(request, "X-Forwarded-For", 0) == "10.0.0.5"
+    assert rate_limit.client_address(request, "X-Forwarded-For", 1) == "203.0.113.7"
+    assert rate_limit.client_address(request, "X-Forwarded-For", 2) == "198.51.100.1"
+    # Fewer entries than proxies: the request skipped a proxy, so the peer is used.
+    assert rate_limit.client_address(request, "X-Forwarded-For", 3) == "10.0.0.5"
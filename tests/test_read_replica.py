@@ -0,0 +1,97 @@
+import asyncio
+import sqlite3
+from decimal import Decimal
+
+import pytest
+from fastapi.routing import APIRoute
+
+from app import database
+from app.api.dependencies import get_current_admin, get_current_user
+from app.database import ReadReplica, _replica_engine, engine, get_read_session, to_async_url
+from app.main import app
+from app.models import Product
+
+
+@pytest.fixture
+def use_replica(monkeypatch):
+    """Route reads to a replica at ``path``, a SQLite file; the app's shutdown disposes it."""
+    def use(path, sticky_seconds: float = 0.3, retry_seconds: float = 0.3) -> ReadReplica:
+        if database.read_replica is not None:
+            database.read_replica.stop_tracking()
+        replica = ReadReplica(_replica_engine(to_async_url(f"sqlite:///{path}")), sticky_seconds, retry_seconds)
+        replica.track_writes()
+        monkeypatch.setattr(database, "read_replica", replica)
+        return replica
+
+    yield use
+    if database.read_replica is not None:
+        database.read_replica.stop_tracking()
+
+
+def copy_primary(path):
+    """Snapshot the primary; writes after this stand in for replication lag."""
+    with sqlite3.connect(engine.url.database) as primary, sqlite3.connect(path) as replica:
+        primary.backup(replica)
+
+
+def test_replica_reads_with_stickiness_and_fallback(
+    run_in_app, api_client, create_user, create_product, use_replica, tmp_path
+):
+    async def test(session):
+        user_id = await create_user(session)
+        product = await create_product(session)
+        copy_primary(tmp_path / "replica.db")
+        replica = use_replica(tmp_path / "replica.db")
+        late = Product(name="Primary-only product", price=Decimal("1.00"), stock=1)
+        session.add(late)
+        await session.commit()
+
+        async with api_client() as anonymous:
+            assert (await anonymous.get(f"/products/products/{late.id}")).status_code == 404
+
+        async def as_user():
+            async with api_client(user_id) as client:
+                orders_url = f"/users/{user_id}/orders"
+                assert (await client.get(orders_url)).json() == []
+                created = await client.post(
+                    "/orders/orders/", json={"products": [{"product_id": str(product.id), "quantity": 1}]}
+                )
+                assert created.status_code == 201
+                # The user's own write is visible right away: their reads stick to the primary...
+                assert len((await client.get(orders_url)).json()) == 1
+                # ...until the sticky window runs out and the lagging replica answers again.
+                await asyncio.sleep(0.4)
+                assert (await client.get(orders_url)).json() == []
+
+        # The in-process transport runs the app in the caller's task; a task of its own keeps
+        # the authenticated user out of this context, as a server's per-request task would.
+        await asyncio.create_task(as_user())
+
+        await replica.engine.dispose()
+        (tmp_path / "down").mkdir()
+        use_replica(tmp_path / "down" / "missing" / "replica.db")
+        async with api_client() as anonymous:
+            # The replica cannot connect, so the primary serves the read.
+            assert (await anonymous.get(f"/products/products/{late.id}")).status_code == 200
+            (tmp_path / "down" / "missing").mkdir()
+            copy_primary(tmp_path / "down" / "missing" / "replica.db")
+            assert (await anonymous.get(f"/products/products/{late.id}")).status_code == 200
+            await asyncio.sleep(0.4)
+            # Retried after the retry window; the copy has that product too, so write past it.
+            newer = Product(name="Newer product", price=Decimal("1.00"), stock=1)
+            session.add(newer)
+            await session.commit()
+            assert (await anonymous.get(f"/products/products/{newer.id}")).status_code == 404
+
+    run_in_app(test)
+
+
+def test_read_sessions_are_opened_after_authentication():
+    """The replica is chosen when the session opens, so the user must be known by then."""
+    for route in app.routes:
+        if not isinstance(route, APIRoute):
+            continue
+        calls = [dependency.call for dependency in route.dependant.dependencies]
+        if get_read_session in calls:
+            auth = [i for i, call in enumerate(calls) if call in (get_current_user, get_current_admin)]
+            assert all(i < calls.index(get_read_session) for i in auth), route.path
@@ -0,0 +1,66 @@
+from datetime import date, datetime
+from decimal import Decimal
+from types import SimpleNamespace
+from uuid import uuid4
+
+from sqlalchemy import func
+from sqlmodel import select
+
+from app.models import DailySales, OrderStatus, Product, ProductSales
+from app.services.report_service import ReportService, SalesRollups
+
+
+def test_daily_sales_slots_add_up_in_the_revenue_report(run_in_app):
+    async def test(session):
+        suffix = uuid4().hex[:8]
+        pending, shipped = OrderStatus(name=f"pending-{suffix}"), OrderStatus(name=f"shipped-{suffix}")
+        session.add_all([pending, shipped])
+        await session.commit()
+        day = date(2001, 2, 3)
+        orders = [
+            SimpleNamespace(created_at=datetime(2001, 2, 3, 12), status_id=pending.id,
+                            total_price=Decimal("10.50"), order_products=[])
+            for _ in range(6)
+        ]
+        # Orders land in different slots, and move status from yet another one.
+        for number, order in enumerate(orders):
+            rollups = SalesRollups(session)
+            rollups.slot = number % 3
+            await rollups.order_created(order, {})
+        mover = SalesRollups(session)
+        mover.slot = 7
+        await mover.orders_moved(orders[:2], shipped.id)
+        await session.commit()
+
+        rows = (await session.exec(select(func.count()).select_from(DailySales).where(DailySales.day == day))).one()
+        assert rows > 2
+        report = {row["status"]: row for row in await ReportService(session).revenue_by_day(day, day)}
+        assert report[pending.name]["order_count"] == 4
+        assert report[pending.name]["revenue"] == Decimal("42.00")
+        assert report[shipped.name]["order_count"] == 2
+        assert report[shipped.name]["revenue"] == Decimal("21.00")
+
+    run_in_app(test)
+
+
+def test_product_sales_slots_add_up_in_top_products(run_in_app):
+    async def test(session):
+        hot = Product(name=f"Hot {uuid4().hex[:8]}", price=Decimal("1.00"), stock=0)
+        session.add(hot)
+        await session.commit()
+        # Far more sold than anything else in the test database, so it ranks first.
+        order = SimpleNamespace(created_at=datetime.utcnow(), status_id=None, total_price=Decimal(0))
+        for slot in range(4):
+            rollups = SalesRollups(session)
+            rollups.slot = slot
+            await rollups.order_created(order, {hot.id: 250_000})
+        await session.commit()
+
+        rows = (await session.exec(
+            select(func.count()).select_from(ProductSales).where(ProductSales.product_id == hot.id)
+        )).one()
+        assert rows == 4
+        top = (await ReportService(session).top_products(limit=1))[0]
+        assert top == {"product_id": hot.id, "name": hot.name, "quantity_sold": 1_000_000, "order_count": 4}
+
+    run_in_app(test)
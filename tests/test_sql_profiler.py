@@ -0,0 +1,80 @@
+import pytest
+from sqlalchemy import exc, text
+from sqlmodel import select
+
+from app.database import engine
+from app.models import Order, OrderProduct
+from app.services.order_service import OrderService
+from app.utils.metrics import RequestDbStats, current_db_stats, instrument_engine
+from app.utils.sql_profiler import assert_max_queries, normalize_sql, profile_engine
+
+
+def test_normalize_sql_ignores_parameters():
+    assert normalize_sql("SELECT * FROM t WHERE id = 5 AND name = 'x'") == "SELECT * FROM t WHERE id = ? AND name = ?"
+    assert normalize_sql("SELECT * FROM t WHERE id IN (?, ?, ?)") == normalize_sql("SELECT * FROM t WHERE id IN (?)")
+
+
+async def list_orders_n_plus_one(session, user_id):
+    # One query for the orders, then one more per order for its lines.
+    orders = (await session.exec(select(Order).where(Order.user_id == user_id))).all()
+    for order in orders:
+        await session.exec(select(OrderProduct).where(OrderProduct.order_id == order.id))
+
+
+def test_assert_max_queries_fails_on_n_plus_one(run_in_app, create_user_orders):
+    async def test(session):
+        user_id = await create_user_orders(session, orders=6)
+        with pytest.raises(AssertionError, match=r"Expected at most 2 queries, got 7 queries"):
+            with assert_max_queries(2):
+                await list_orders_n_plus_one(session, user_id)
+        # Within the budget, the repeated shape still fails.
+        with pytest.raises(AssertionError, match=r"Possible N\+1: 6x SELECT"):
+            with assert_max_queries(10):
+                await list_orders_n_plus_one(session, user_id)
+
+    run_in_app(test)
+
+
+def test_assert_max_queries_passes_on_eager_listing(run_in_app, create_user_orders):
+    async def test(session):
+        user_id = await create_user_orders(session, orders=6)
+        with assert_max_queries(2) as profile:
+            await OrderService(session).get_orders_by_user(user_id)
+        assert profile.count == 2
+
+    run_in_app(test)
+
+
+def test_failed_statements_leave_no_start_time(run_in_app):
+    async def test(session):
+        async with engine.connect() as conn:
+            with assert_max_queries(5):
+                for _ in range(3):
+                    with pytest.raises(exc.DBAPIError):
+                        await conn.execute(text("SELECT * FROM missing_table"))
+            raw = await conn.get_raw_connection()
+            assert "query_started" not in raw.info
+
+    run_in_app(test)
+
+
+def test_metrics_and_profiler_share_one_timing_hook(run_in_app):
+    async def test(session):
+        sync_engine = engine.sync_engine
+        for _ in range(2):
+            instrument_engine(sync_engine)
+            profile_engine(sync_engine)
+        assert len(sync_engine.dispatch.after_cursor_execute) == 1
+
+        stats = RequestDbStats()
+        token = current_db_stats.set(stats)
+        try:
+            with assert_max_queries(2) as profile:
+                await session.exec(select(Order).limit(1))
+                await session.exec(select(OrderProduct).limit(1))
+        finally:
+            current_db_stats.reset(token)
+        assert stats.queries == profile.count == 2
+        assert stats.seconds == profile.seconds
+
+    run_in_app(test)
@@ -0,0 +1,31 @@
+from decimal import Decimal
+
+from app.models import Product
+from app.services.inventory_service import InventoryService
+from app.services.product_services import ProductService
+from app.services.report_service import ReportService
+
+
+def test_sharded_stock_reads_follow_bucket_decrements(run_in_app):
+    async def test(session):
+        product = Product(name="Sharded product", price=Decimal("5.00"), stock=12)
+        session.add(product)
+        await session.commit()
+        inventory = InventoryService(session)
+        await inventory.set_stock_buckets(product.id, 4)
+        before = (await ProductService(session).get_product_by_id(product.id)).version
+
+        assert await inventory.reserve({product.id: product}, {product.id: 5})
+        await session.commit()
+        session.expunge_all()
+
+        read = await ProductService(session).get_product_by_id(product.id)
+        assert read.stock == 7
+        assert read.version > before
+        listed = {item.id: item for item in await ProductService(session).get_all_products(limit=100)}
+        assert listed[product.id].stock == 7
+        low = await ReportService(session).low_stock(threshold=7)
+        assert {"product_id": product.id, "name": "Sharded product", "stock": 7, "is_available": True} in low
+        assert not session.dirty
+
+    run_in_app(test)